@@ -11,6 +11,7 @@ from sectionFiberMain import circleSection,polygonSection
 from sectionFiberMain import circleSection
 from Material import Material
 from MCAnalysis import MC
+from sectionBundle import saveSection
 
 #Define section
 outD = 2  # the diameter of the outside circle
@@ -33,7 +34,7 @@ coreParameter = material.coreParameterCircular("C40", "Spiral", outD, coverThick
 D = 2 #length of the outer section in x direction
 kx = 2.213*barParameter[0]/barParameter[2]/D
 ky =kx
-np.savetxt("CircularPier/yieldCurvature.txt", [kx, ky],  fmt="%0.6f")
+saveSection("CircularPier", yieldCurvature=[kx, ky])
 
 ##Estimate the yield curvature of rectangular section
 #lx = 2 #length of the outer section in x direction
@@ -0,0 +1,240 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : FiberSection.py
+# @Software : PyCharm
+
+import numpy as np
+
+
+def concrete04(strain, fc, ec, ecu, Ec):
+	"""
+	Monotonic envelope of OpenSees Concrete04 (Popovics curve, no tensile strength)
+	:param strain: fiber strains (array)
+	:param fc: concrete compressive strength (negative)
+	:param ec: strain at maximum strength (negative)
+	:param ecu: strain at crushing strength (negative)
+	:param Ec: initial stiffness
+	:return: stress and tangent arrays
+	"""
+	n = Ec / (Ec - fc / ec)
+	x = np.clip(strain / ec, 0.0, None)
+	xn = x ** n
+	denominator = n - 1 + xn
+	stress = fc * n * x / denominator
+	tangent = fc / ec * n * (n - 1) * (1 - xn) / denominator ** 2
+	inactive = (strain > 0.0) | (strain < ecu)
+	stress[inactive] = 0.0
+	tangent[inactive] = 0.0
+	return stress, tangent
+
+
+def reinforcingSteel(strain, fy, fu, Es, Esh, esh, eult):
+	"""
+	Monotonic backbone of OpenSees ReinforcingSteel (symmetric in tension and compression)
+	:param strain: fiber strains (array)
+	:param fy: yield stress in tension
+	:param fu: ultimate stress in tension
+	:param Es: initial elastic tangent
+	:param Esh: tangent at initial strain hardening
+	:param esh: strain corresponding to initial strain hardening
+	:param eult: strain at peak stress
+	:return: stress and tangent arrays
+	"""
+	ey = fy / Es
+	p = Esh * (eult - esh) / (fu - fy)
+	absStrain = np.abs(strain)
+	sign = np.sign(strain)
+	ratio = np.clip((eult - absStrain) / (eult - esh), 0.0, 1.0)
+	stress = np.where(absStrain <= ey, Es * strain, sign * fy)
+	tangent = np.where(absStrain <= ey, Es, 0.0)
+	hardening = (absStrain > esh) & (absStrain <= eult)
+	stress = np.where(hardening, sign * (fu + (fy - fu) * ratio ** p), stress)
+	tangent = np.where(hardening, (fu - fy) * p / (eult - esh) * ratio ** max(p - 1, 0.0), tangent)
+	stress = np.where(absStrain > eult, sign * fu, stress)
+	return stress, tangent
+
+
+class FiberSection():
+	def __init__(self, coverFiber, coreFiber, barFiber, coverParameter, coreParameter, barParameter):
+		"""
+		Fiber section state determination with vectorized constitutive laws
+		:param coverFiber: cover concrete fibers [(y1,z1,area1),...]
+		:param coreFiber: core concrete fibers [(y1,z1,area1),...]
+		:param barFiber: bar fibers [(y1,z1,area1),...]
+		:param coverParameter: Concrete04 parameters of cover concrete [fc, ec, ecu, Ec]
+		:param coreParameter: Concrete04 parameters of core concrete [fc, ec, ecu, Ec]
+		:param barParameter: ReinforcingSteel parameters [fy, fu, Es, Esh, esh, eult]
+		"""
+		fibers = [np.atleast_2d(np.asarray(each, dtype=np.float64)) for each in (coverFiber, coreFiber, barFiber)]
+		self.nCover, self.nCore, self.nBar = [len(each) for each in fibers]
+		allFiber = np.vstack(fibers)
+		self.y, self.z, self.area = allFiber[:, 0], allFiber[:, 1], allFiber[:, 2]
+		self.coverParameter = [float(each) for each in coverParameter]
+		self.coreParameter = [float(each) for each in coreParameter]
+		self.barParameter = [float(each) for each in barParameter]
+		self.coverSlice = slice(0, self.nCover)
+		self.coreSlice = slice(self.nCover, self.nCover+self.nCore)
+		self.barSlice = slice(self.nCover+self.nCore, len(allFiber))
+		self.setDirection('X')
+		self.revertToStart()
+
+	def setDirection(self, direction):
+		"""
+		Select the bending direction, the fiber strain is e0-u*kappa+v*kappaOther
+		:param direction: 'X' (curvature about local z) or 'Y' (curvature about local y)
+		"""
+		if direction == 'X':
+			self.u, self.v = self.y, self.z
+		else:
+			self.u, self.v = -self.z, -self.y
+
+	def revertToStart(self):
+		"""
+		Reset the section to the unstressed state
+		"""
+		nFiber = len(self.area)
+		self.strain = np.zeros(nFiber)
+		self.stress = np.zeros(nFiber)
+		self.minStrain = np.zeros(nFiber)  # committed maximum compressive strain, crushed concrete carries no stress
+		self.e0 = 0.0
+		self.kappaOther = 0.0
+		self.kappa = 0.0
+		self.moment = 0.0
+
+	def fiberState(self, strain):
+		"""
+		Stress and tangent of all fibers for a given strain field
+		:param strain: fiber strains
+		:return: stress and tangent arrays
+		"""
+		stress = np.empty_like(strain)
+		tangent = np.empty_like(strain)
+		for fiberSlice, parameter in ((self.coverSlice, self.coverParameter), (self.coreSlice, self.coreParameter)):
+			stress[fiberSlice], tangent[fiberSlice] = concrete04(strain[fiberSlice], *parameter)
+			crushed = self.minStrain[fiberSlice] < parameter[2]
+			stress[fiberSlice][crushed] = 0.0
+			tangent[fiberSlice][crushed] = 0.0
+		stress[self.barSlice], tangent[self.barSlice] = reinforcingSteel(strain[self.barSlice], *self.barParameter)
+		return stress, tangent
+
+	def solveStep(self, kappa, axialLoad, moment, tol=1e-9, maxIter=50):
+		"""
+		Solve the axial force and orthogonal moment equilibrium at an imposed curvature with Newton iterations
+		:param kappa: imposed curvature
+		:param axialLoad: axial load (compression positive)
+		:param moment: moment in the other direction
+		:param tol: relative tolerance of the unbalanced forces
+		:param maxIter: maximum number of iterations
+		:return: True if the step converged
+		"""
+		A, u, v = self.area, self.u, self.v
+		forceScale = max(np.sum(A)*abs(self.coreParameter[0]), 1.0)
+		momentScale = forceScale*max(np.max(np.abs(v)), 1e-3)
+		x = np.array([self.e0, self.kappaOther])
+		initialTangent = np.concatenate((np.full(self.nCover, self.coverParameter[3]),
+										 np.full(self.nCore, self.coreParameter[3]),
+										 np.full(self.nBar, self.barParameter[2])))
+		for i in range(maxIter):
+			strain = x[0]-u*kappa+v*x[1]
+			stress, tangent = self.fiberState(strain)
+			residual = np.array([np.sum(stress*A)+axialLoad, np.sum(stress*A*v)-moment])
+			if abs(residual[0]) < tol*forceScale and abs(residual[1]) < tol*momentScale:
+				self.strain, self.stress = strain, stress
+				self.e0, self.kappaOther, self.kappa = x[0], x[1], kappa
+				self.moment = -np.sum(stress*A*u)
+				return True
+			for eachTangent in (tangent, initialTangent):
+				EA = eachTangent*A
+				jacobian = np.array([[np.sum(EA), np.sum(EA*v)], [np.sum(EA*v), np.sum(EA*v*v)]])
+				if abs(np.linalg.det(jacobian)) > 1e-12*abs(jacobian[0, 0]*jacobian[1, 1]):
+					break
+			else:
+				jacobian[1, 1] = max(jacobian[1, 1], 1.0)
+			x = x-np.linalg.solve(jacobian, residual)
+		# crushing of concrete fibers makes the axial force discontinuous, fall back to bracketing the axial strain
+		return self._bisectAxialStrain(kappa, axialLoad, moment, tol*forceScale, tol*momentScale)
+
+	def _bisectAxialStrain(self, kappa, axialLoad, moment, forceTol, momentTol, strainTol=1e-12, maxIter=200):
+		"""
+		Bracket and bisect the axial strain with the orthogonal curvature held at its last converged value
+		:param kappa: imposed curvature
+		:param axialLoad: axial load (compression positive)
+		:param moment: moment in the other direction
+		:param forceTol: tolerance of the unbalanced axial force
+		:param momentTol: tolerance of the unbalanced orthogonal moment
+		:param strainTol: width of the final bracket in strain
+		:param maxIter: maximum number of search and bisection steps
+		:return: True if the axial force and the orthogonal moment are both in equilibrium, a bracket that only
+			closes on a jump of the axial force is not a converged state and leaves the section unchanged
+		"""
+		A, u, v = self.area, self.u, self.v
+		fixedStrain = -u*kappa+v*self.kappaOther
+
+		def unbalance(e0):
+			return np.sum(self.fiberState(e0+fixedStrain)[0]*A)+axialLoad
+
+		low = high = self.e0
+		fLow = fHigh = unbalance(self.e0)
+		step = 1e-4
+		for i in range(maxIter):
+			if fLow*fHigh <= 0:
+				break
+			low, high = low-step, high+step
+			fLow, fHigh = unbalance(low), unbalance(high)
+			step *= 2.0
+		else:
+			return False
+		# the unbalanced force decreases with the axial strain on the compression side
+		if fLow > 0:
+			low, high = high, low
+		for i in range(maxIter):
+			mid = 0.5*(low+high)
+			fMid = unbalance(mid)
+			if abs(fMid) < forceTol or abs(high-low) < strainTol:
+				break
+			if fMid < 0:
+				low = mid
+			else:
+				high = mid
+		strain = mid+fixedStrain
+		stress = self.fiberState(strain)[0]
+		if abs(fMid) >= forceTol or abs(np.sum(stress*A*v)-moment) >= momentTol:
+			return False
+		self.strain, self.stress = strain, stress
+		self.e0, self.kappa = mid, kappa
+		self.moment = -np.sum(stress*A*u)
+		return True
+
+	def commit(self):
+		"""
+		Commit the current state (crushing history of the concrete fibers)
+		"""
+		self.minStrain = np.minimum(self.minStrain, self.strain)
+
+	def MCAnalysis(self, axialLoad, moment, direction, dK, numIncr):
+		"""
+		Moment curvature analysis with constant axial load and orthogonal moment
+		:param axialLoad: axial load (compression positive)
+		:param moment: moment in the other direction
+		:param direction: 'X' or 'Y'
+		:param dK: curvature increment
+		:param numIncr: number of analysis increments
+		:return: [moment, curvature] of every step and the fiber [stress, strain] of every step
+			(steps x fibers x 2, fibers ordered as cover, core, bar)
+		"""
+		self.setDirection(direction)
+		self.revertToStart()
+		momentCurvature = np.zeros((numIncr+1, 2))
+		stressStrain = np.zeros((numIncr+1, len(self.area), 2))
+		for i in range(numIncr+1):
+			if not self.solveStep(i*dK, axialLoad, moment):
+				print('FiberSection: equilibrium is not satisfied at step', i)
+				return momentCurvature[:i], stressStrain[:i]
+			self.commit()
+			# the first step only applies the axial load, as the LoadControl step of the opensees model
+			momentCurvature[i] = [self.moment if i > 0 else 0.0, self.kappa]
+			stressStrain[i, :, 0] = self.stress
+			stressStrain[i, :, 1] = self.strain
+		return momentCurvature, stressStrain
@@ -5,118 +5,558 @@
 # @File     : MCAnalysis_X.py
 # @Software : PyCharm
 
-from openseespy.opensees import *
 import numpy as np
 import os
-import matplotlib.pyplot as plt
 import shutil
+from FiberSection import FiberSection
+from bilinearIdealization import bilinearIdealize
+from sectionBundle import loadSection
+from fiberLumping import lumpSection, extremeFibers
+from figureRender import submitFigure, drawMomentCurvature
+from stageProfiler import StageProfiler, profiled
+
+
+def _opensees():
+	"""
+	openseespy.opensees, imported when the opensees backend runs so that the other backends and the result
+	processing do not load it
+	"""
+	import openseespy.opensees as ops
+	return ops
+
+
+def firstExceedance(strain, limits):
+	"""
+	First step at which any fiber passes each strain limit, computed from the strain envelope of all fibers
+	:param strain: fiber strain histories (steps x fibers)
+	:param limits: strain limits, positive values are checked in tension and negative values in compression
+	:return: first exceedance step of every limit (-1 if the limit is not reached)
+	"""
+	limits = np.atleast_1d(limits)
+	maxStrain = strain.max(axis=1)[:, None]
+	minStrain = strain.min(axis=1)[:, None]
+	exceeded = np.where(limits >= 0, maxStrain >= limits, minStrain <= limits)
+	return np.where(exceeded.any(axis=0), exceeded.argmax(axis=0), -1)
+
+
+def rotateFibers(fibers, angle):
+	"""
+	Rotate the fiber coordinates so that bending at the given angle becomes bending in the 'X' direction
+	:param fibers: fibers [(y1,z1,area1),...]
+	:param angle: angle (degree) of the bending direction measured from 'X' towards 'Y'
+	:return: rotated fibers, 90 degrees gives the same fiber strains as the 'Y' direction
+	"""
+	fibers = np.atleast_2d(np.array(fibers, dtype=np.float64))
+	theta = np.radians(float(angle))
+	y, z = fibers[:, 0].copy(), fibers[:, 1].copy()
+	fibers[:, 0] = y*np.cos(theta)-z*np.sin(theta)
+	fibers[:, 1] = y*np.sin(theta)+z*np.cos(theta)
+	return fibers
 
 
 class MC():
-	def __init__(self, sectName, direction):
+	def __init__(self, sectName, direction, sectPath=None, profile=False, profileLog=None):
 		"""
 		:param sectName: section name
-		:param direction: calculated direction ('X' or 'Y')
+		:param direction: calculated direction ('X' or 'Y'), or the angle (degree) of the bending direction measured
+			from 'X' towards 'Y', the fibers are then rotated and the section is bent in the rotated 'X' direction
+		:param sectPath: folder of the section files (default: sectName in the working directory)
+		:param profile: record the wall time, CPU time and peak memory of the stages of every MCAnalysis and MCCurve
+			call in self.profileReport (see stageProfiler.StageProfiler)
+		:param profileLog: JSON-lines file the profile reports are appended to (implies profile=True)
 		"""
 		self.sectName = sectName
+		self.sectPath = sectName if sectPath is None else sectPath
 		self.direction = direction
+		self.momentCurvature = None  # in-memory [moment, curvature] history
+		self.coreResponse = None  # in-memory core fiber history (steps x fibers x [stress, strain])
+		self.barResponse = None  # in-memory bar fiber history (steps x fibers x [stress, strain])
+		self.lumpReport = None  # fiber reduction of the strip lumping (see fiberLumping.lumpSection)
+		self.trackFibers = 'all'  # fiber tracking mode of the last analysis
+		self.trackedFibers = None  # {'core': indices, 'bar': indices} of the tracked fibers in each group
+		self.trackingCheck = None  # first exceedance steps {limit state: (all fibers, tracked fibers)} with 'verify'
+		self.profiler = StageProfiler(profileLog) if profile or profileLog is not None else None
+		self.profileReport = []  # one stage report per profiled call
+
+	def profileContext(self):
+		"""
+		Values stored with every profile report
+		"""
+		return {'sectName': self.sectName, 'direction': str(self.direction)}
+
+	def _lap(self, stage):
+		"""
+		Start the next stage of a profiled call
+		"""
+		if self.profiler is not None:
+			self.profiler.lap(stage)
 
-	def MCAnalysis(self, axialLoad, moment, maxMu=30, numIncr=100):
+	@profiled
+	def MCAnalysis(self, axialLoad, moment, maxMu=30, numIncr=100, recordMode='file', backend='opensees', lumpTol=None,
+				   stepControl='fixed', untilUltimate=False, maxExtension=4.0, recovery=True, trackFibers='all'):
 		"""
 		Moment curvature analysis for definded section
 		:param axialLoad: axial load
 		:param moment: moment in the other direction
 		:param maxMu: target ductility for analysis
 		:param numIncr: number of analysis increments
+		:param recordMode: 'file' writes MomentCurvature.txt and one recorder file per core/bar fiber,
+			'memory' captures the fiber stress/strain of every step into numpy arrays without any file
+		:param backend: 'opensees' runs a zeroLengthSection model in openseespy, 'numpy' uses the vectorized
+			FiberSection engine with the same material laws and the same outputs
+		:param lumpTol: lump the concrete fibers into strips perpendicular to the bending direction, with this
+			relative tolerance on the second moment (None keeps every fiber). Intended for uniaxial bending,
+			the reduction is reported in self.lumpReport and the core/bar responses refer to the lumped fibers.
+			The extreme concrete fibers are not lumped, so the limit states are still checked at the outermost
+			fibers; the lumped strips only shift the neutral axis slightly (about 2% on the extreme strains and one
+			curvature step on the ultimate point of CircularPier with lumpTol=1e-3)
+		:param stepControl: 'fixed' uses numIncr equal curvature increments, 'adaptive' refines the increment
+			before first yield and where the moment deviates from the tangent, and grows it up to twice the fixed
+			increment on the post-yield plateau (see _stepAnalysis). First yield falls on a step, so the yield point is
+			much closer to a fine analysis than with fixed steps. The effective point is of similar accuracy, although
+			longer steps on the plateau can bring the moment drop at cover crushing forward. The number of steps is of
+			the same order as numIncr, fewer on a long plateau and more where the moment softens under a high axial load
+		:param untilUltimate: check the bar strain against eult and the core strain against ecu after every step,
+			stop at the step where the first of them is passed and extend the curvature range beyond maxMu
+			(by maxMu at a time) while neither is reached; self.ultimateReached tells whether it was found
+		:param maxExtension: largest ductility of the extended range, as a multiple of maxMu
+		:param recovery: recover non-converged increments in place (halved steps, other solution algorithms,
+			relaxed tolerance), the actions are logged in self.recoveryLog. A fixed-step analysis still runs in one
+			call with the recorders and is only run again step by step with recovery when it fails; adaptive and
+			untilUltimate analyses recover during their steps. With recovery=False a failure is only reported
+		:param trackFibers: 'all' records every core and bar fiber, 'extreme' only the core and bar fibers at the
+			extreme coordinates along the bending direction (see extremeFibers), which govern the strain limit
+			states under uniaxial bending; the columns of the core/bar responses are then the fibers in
+			self.trackedFibers. With an orthogonal moment or an angled direction it falls back to 'all' with a
+			warning. 'verify' records every fiber and MCCurve checks that the extreme fibers give the
+			same limit states (self.trackingCheck)
 		"""
-		if self.direction == 'X':
-			flagx = 1
-			flagy = 0
-		else:
+		if recordMode not in ('file', 'memory'):
+			raise ValueError("recordMode should be 'file' or 'memory'")
+		if stepControl not in ('fixed', 'adaptive'):
+			raise ValueError("stepControl should be 'fixed' or 'adaptive'")
+		if backend not in ('opensees', 'numpy'):
+			raise ValueError("backend should be 'opensees' or 'numpy'")
+		if trackFibers not in ('all', 'extreme', 'verify'):
+			raise ValueError("trackFibers should be 'all', 'extreme' or 'verify'")
+		if self.direction == 'Y':
 			flagx = 0
 			flagy = 1
+		else:
+			flagx = 1
+			flagy = 0
+		bendDirection = 'Y' if self.direction == 'Y' else 'X'
 
-		wipe()
-		model('basic', '-ndm', 3, '-ndf', 6)
-
-		node(1, 0.0, 0.0, 0.0)
-		node(2, 0.0, 0.0, 0.0)
-
-		fix(1, 1, 1, 1, 1, 1, 1)
-		fix(2, 0, 1, 1, 1, 0, 0)
-
-		coverParameter = np.loadtxt(self.sectName+"/coverParameter.txt")
-		uniaxialMaterial('Concrete04', 1, coverParameter[0], coverParameter[1], coverParameter[2], coverParameter[3])
-		coreParameter = np.loadtxt(self.sectName+"/coreParameter.txt")
-		uniaxialMaterial('Concrete04', 2, coreParameter[0], coreParameter[1], coreParameter[2], coreParameter[3])
-		barParameter = np.loadtxt(self.sectName+"/barParameter.txt")
-		uniaxialMaterial('ReinforcingSteel', 3, barParameter[0], barParameter[1], barParameter[2], barParameter[3], barParameter[4], barParameter[5])
-
-		section('Fiber', 1, '-GJ', 1E10)
-		coverfibers = np.loadtxt(self.sectName+"/coverDivide.txt")
-		for coverfiber in coverfibers:
-			fiber(coverfiber[0], coverfiber[1], coverfiber[2], 1)
-		corefibers = np.loadtxt(self.sectName+"/coreDivide.txt")
-		for corefiber in corefibers:
-			fiber(corefiber[0], corefiber[1], corefiber[2], 2)
-		barfibers = np.loadtxt(self.sectName+"/barDivide.txt")
-		for barfiber in barfibers:
-			fiber(barfiber[0], barfiber[1], barfiber[2], 3)
-
-		element('zeroLengthSection', 1, 1, 2, 1, '-oirent', 1, 0, 0, 0, 1, 0)
-
-		if os.path.exists('coreRecorder'):
-			shutil.rmtree('coreRecorder')
-		if os.path.exists('barRecorder'):
-			shutil.rmtree('barRecorder')
-		os.makedirs('coreRecorder')
-		os.makedirs('barRecorder')
-
-		setMaxOpenFiles(2000)
-		recorder('Node','-file','MomentCurvature.txt','-time','-node',2,'-dof',6-flagy,'disp')
-		for i in range(len(corefibers)):
-			recorder('Element','-file','coreRecorder/'+str(i+1)+'.txt','-time','-ele',1,'section','fiber',str(corefibers[i,0]),str(corefibers[i,1]),'stressStrain')
-		for j in range(len(barfibers)):
-			recorder('Element','-file','barRecorder/'+str(j+1)+'.txt','-time','-ele',1,'section','fiber',str(barfibers[j,0]),str(barfibers[j,1]),'stressStrain')
-
-		# Define constant axial load
-		timeSeries('Constant', 1)
-		pattern('Plain', 1, 1)
-		load(2, -axialLoad, 0.0, 0.0, 0.0, moment*flagx, moment*flagy)
-
-		# Define analysis parameters
-		integrator('LoadControl', 0.0)
-		system('SparseGeneral', '-piv')
-		test('NormUnbalance', 1e-9, 10)
-		numberer('Plain')
-		constraints('Plain')
-		algorithm('Newton')
-		analysis('Static')
-
-		# Do one analysis for constant axial load
-		analyze(1)
-		loadConst('-time', 0.0)
-
-		# Define reference moment
-		timeSeries('Linear', 2)
-		pattern('Plain', 2, 2)
-		load(2, 0.0, 0.0, 0.0, 0.0, flagy, flagx)
+		self._lap('loadSection')
+		section = loadSection(self.sectPath)
+		coverParameter = section['coverParameter']
+		coreParameter = section['coreParameter']
+		barParameter = section['barParameter']
+		coverfibers = section['coverFiber']
+		corefibers = section['coreFiber']
+		barfibers = section['barFiber']
 
 		# Compute curvature increment
+		yieldCurvature = section['yieldCurvature']
 		if self.direction == 'X':
-			ky = np.loadtxt(self.sectName+"/yieldCurvature.txt")[0]
+			ky = yieldCurvature[0]
+		elif self.direction == 'Y':
+			ky = yieldCurvature[1]
 		else:
-			ky = np.loadtxt(self.sectName + "/yieldCurvature.txt")[1]
+			angle = np.radians(float(self.direction))
+			ky = np.hypot(yieldCurvature[0]*np.cos(angle), yieldCurvature[1]*np.sin(angle))
+			coverfibers, corefibers, barfibers = [rotateFibers(each, self.direction) for each in (coverfibers, corefibers, barfibers)]
+		self.lumpReport = None
+		if lumpTol is not None:
+			coverfibers, corefibers, barfibers, self.lumpReport = lumpSection(coverfibers, corefibers, barfibers,
+																			  1 if bendDirection == 'Y' else 0, lumpTol)
+			print('Fiber lumping:', self.lumpReport['fibers'][0], '->', self.lumpReport['fibers'][1],
+				  'fibers, second moment error', '%.2e' % self.lumpReport['secondMomentError'])
 		maxK = ky*maxMu
 		dK = maxK / numIncr
 
-		# Use displacement control at node 2 for section analysis
-		integrator('DisplacementControl', 2, 6-flagy, dK)
-
-		# Do the section analysis
-		analyze(numIncr)
-		wipe()
-		print('MomentCurvature is OK!')
+		self.recordMode = recordMode
+		self.momentCurvature = None
+		self.coreResponse = None
+		self.barResponse = None
+		nCover, nCore, nBar = len(coverfibers), len(corefibers), len(barfibers)
+		coreSlice = slice(nCover, nCover+nCore)
+		barSlice = slice(nCover+nCore, nCover+nCore+nBar)
+		stepOptions = {'yieldStrain': barParameter[0]/barParameter[2], 'coreSlice': coreSlice, 'barSlice': barSlice,
+					   'adaptive': stepControl == 'adaptive', 'ultimateStrain': (barParameter[5], coreParameter[2]),
+					   'untilUltimate': untilUltimate, 'maxExtension': maxExtension}
+		# the extreme fibers along one axis govern the strains only under uniaxial bending, an orthogonal moment or an
+		# angled direction turns the neutral axis
+		if trackFibers == 'extreme' and (moment != 0 or self.direction not in ('X', 'Y')):
+			print("Warning: trackFibers='extreme' needs uniaxial bending in 'X' or 'Y' without an orthogonal moment,",
+				  "all fibers are recorded")
+			trackFibers = 'all'
+		# recorded fibers, local indices of each group and positions in the fiber arrays (cover, core, bar)
+		axis = 1 if bendDirection == 'Y' else 0
+		self.trackFibers = trackFibers
+		self.trackingCheck = None
+		if trackFibers == 'all':
+			self.trackedFibers = {'core': np.arange(nCore), 'bar': np.arange(nBar)}
+		else:
+			self.trackedFibers = {'core': extremeFibers(corefibers, axis), 'bar': extremeFibers(barfibers, axis)}
+		recordCore = self.trackedFibers['core'] if trackFibers == 'extreme' else np.arange(nCore)
+		recordBar = self.trackedFibers['bar'] if trackFibers == 'extreme' else np.arange(nBar)
+		coreTrack, barTrack = nCover+recordCore, nCover+nCore+recordBar
+		if trackFibers == 'extreme':
+			print('Extreme fiber tracking:', len(recordCore)+len(recordBar), 'of', nCore+nBar, 'core and bar fibers')
+			# the extreme cover fibers are kept for the strain increments of the adaptive steps
+			coverTrack = extremeFibers(coverfibers, axis)
+			nTracked = [len(coverTrack), len(coverTrack)+len(coreTrack), len(coverTrack)+len(coreTrack)+len(barTrack)]
+			stepOptions.update({'trackIndex': np.concatenate((coverTrack, coreTrack, barTrack)),
+								'coreSlice': slice(nTracked[0], nTracked[1]), 'barSlice': slice(nTracked[1], nTracked[2])})
+		# the step-by-step driver is used when the steps change or are checked during the analysis, and to recover a
+		# failed fixed-step analysis
+		stepped = stepControl == 'adaptive' or untilUltimate
+		self.ultimateReached = None
+		self.recoveryLog = []
+		if backend == 'numpy':
+			self._lap('modelBuild')
+			sectionSolver = FiberSection(coverfibers, corefibers, barfibers, coverParameter, coreParameter, barParameter)
+			if not stepped:
+				self._lap('analyze')
+				momentCurvature, stressStrain = sectionSolver.MCAnalysis(axialLoad, moment, bendDirection, dK, numIncr)
+				# a failed fixed-step analysis is run again increment by increment with recovery
+				if len(momentCurvature) == numIncr+1 or not recovery:
+					self._lap('storeResponse')
+					self._storeResponse(momentCurvature, stressStrain[:, coreTrack], stressStrain[:, barTrack])
+					print('MomentCurvature is OK!')
+					return
+				print('The fixed-step analysis is run again increment by increment with recovery')
+			sectionSolver.setDirection(bendDirection)
+			sectionSolver.revertToStart()
+			solverTol = [1e-9]
+
+			def applyStep(kappa):
+				converged = sectionSolver.solveStep(kappa, axialLoad, moment, tol=solverTol[0])
+				if converged:
+					sectionSolver.commit()
+				return converged
+
+			def stepState():
+				return sectionSolver.moment, sectionSolver.kappa, np.column_stack((sectionSolver.stress, sectionSolver.strain))
+
+			def relaxTolerance():
+				solverTol[0] = 1e-6
+
+			def restoreDefaults():
+				solverTol[0] = 1e-9
+
+			if recovery:
+				stepOptions['recoveryActions'] = [('relaxed tolerance 1e-6', relaxTolerance)]
+				stepOptions['restoreDefaults'] = restoreDefaults
+			self._lap('analyze')
+			applyStep(0.0)
+			self._stepAnalysis(applyStep, stepState, maxK, dK, **stepOptions)
+			print('MomentCurvature is OK!')
+			return
+
+		ops = _opensees()
+		# the fixed-step analysis runs in one call, when it fails and recovery is on the model is built again and
+		# the increments are run one by one with recovery
+		for stepped in ([stepped, True] if recovery and not stepped else [stepped]):
+			self._lap('modelBuild')
+			ops.wipe()
+			ops.model('basic', '-ndm', 3, '-ndf', 6)
+
+			ops.node(1, 0.0, 0.0, 0.0)
+			ops.node(2, 0.0, 0.0, 0.0)
+
+			ops.fix(1, 1, 1, 1, 1, 1, 1)
+			ops.fix(2, 0, 1, 1, 1, 0, 0)
+
+			ops.uniaxialMaterial('Concrete04', 1, coverParameter[0], coverParameter[1], coverParameter[2], coverParameter[3])
+			ops.uniaxialMaterial('Concrete04', 2, coreParameter[0], coreParameter[1], coreParameter[2], coreParameter[3])
+			ops.uniaxialMaterial('ReinforcingSteel', 3, barParameter[0], barParameter[1], barParameter[2], barParameter[3], barParameter[4], barParameter[5])
+
+			ops.section('Fiber', 1, '-GJ', 1E10)
+			for coverfiber in coverfibers:
+				ops.fiber(coverfiber[0], coverfiber[1], coverfiber[2], 1)
+			for corefiber in corefibers:
+				ops.fiber(corefiber[0], corefiber[1], corefiber[2], 2)
+			for barfiber in barfibers:
+				ops.fiber(barfiber[0], barfiber[1], barfiber[2], 3)
+
+			ops.element('zeroLengthSection', 1, 1, 2, 1, '-oirent', 1, 0, 0, 0, 1, 0)
+
+			self._lap('recorderSetup')
+			if stepped:
+				pass
+			elif recordMode == 'file':
+				if os.path.exists('coreRecorder'):
+					shutil.rmtree('coreRecorder')
+				if os.path.exists('barRecorder'):
+					shutil.rmtree('barRecorder')
+				os.makedirs('coreRecorder')
+				os.makedirs('barRecorder')
+
+				ops.setMaxOpenFiles(2000)
+				ops.recorder('Node','-file','MomentCurvature.txt','-time','-node',2,'-dof',6-flagy,'disp')
+				for k, i in enumerate(recordCore):
+					ops.recorder('Element','-file','coreRecorder/'+str(k+1)+'.txt','-time','-ele',1,'section','fiber',str(corefibers[i,0]),str(corefibers[i,1]),'stressStrain')
+				for k, j in enumerate(recordBar):
+					ops.recorder('Element','-file','barRecorder/'+str(k+1)+'.txt','-time','-ele',1,'section','fiber',str(barfibers[j,0]),str(barfibers[j,1]),'stressStrain')
+			else:
+				# fibers are stored in the section as cover, core, bar (definition order)
+				self._coreSlice = coreTrack
+				self._barSlice = barTrack
+				self.momentCurvature = np.zeros((numIncr+1, 2))
+				self.coreResponse = np.zeros((numIncr+1, len(coreTrack), 2))
+				self.barResponse = np.zeros((numIncr+1, len(barTrack), 2))
+
+			self._lap('analyze')
+			# Define constant axial load
+			ops.timeSeries('Constant', 1)
+			ops.pattern('Plain', 1, 1)
+			ops.load(2, -axialLoad, 0.0, 0.0, 0.0, moment*flagx, moment*flagy)
+
+			# Define analysis parameters
+			ops.integrator('LoadControl', 0.0)
+			ops.system('SparseGeneral', '-piv')
+			ops.test('NormUnbalance', 1e-9, 10)
+			ops.numberer('Plain')
+			ops.constraints('Plain')
+			ops.algorithm('Newton')
+			ops.analysis('Static')
+
+			# Do one analysis for constant axial load
+			ops.analyze(1)
+			if recordMode == 'memory' and not stepped:
+				self._captureStep(0, 6-flagy)
+			ops.loadConst('-time', 0.0)
+
+			# Define reference moment
+			ops.timeSeries('Linear', 2)
+			ops.pattern('Plain', 2, 2)
+			ops.load(2, 0.0, 0.0, 0.0, 0.0, flagy, flagx)
+
+			if stepped:
+				def applyStep(kappa):
+					ops.integrator('DisplacementControl', 2, 6-flagy, kappa-ops.nodeDisp(2, 6-flagy))
+					return ops.analyze(1) == 0
+
+				def stepState():
+					# fiberData returns (y, z, area, stress, strain) for every fiber of the section
+					fiberData = np.array(ops.eleResponse(1, 'section', 'fiberData')).reshape(-1, 5)
+					return ops.getTime(), ops.nodeDisp(2, 6-flagy), fiberData[:, 3:5]
+
+				def restoreDefaults():
+					ops.algorithm('Newton')
+					ops.test('NormUnbalance', 1e-9, 10)
+
+				if recovery:
+					stepOptions['recoveryActions'] = [
+						('algorithm ModifiedNewton', lambda: ops.algorithm('ModifiedNewton')),
+						('algorithm KrylovNewton', lambda: ops.algorithm('KrylovNewton')),
+						('algorithm NewtonLineSearch', lambda: ops.algorithm('NewtonLineSearch')),
+						('relaxed tolerance NormUnbalance 1e-6, 50 iterations', lambda: (ops.algorithm('Newton'), ops.test('NormUnbalance', 1e-6, 50)))]
+					stepOptions['restoreDefaults'] = restoreDefaults
+				self._stepAnalysis(applyStep, stepState, maxK, dK, **stepOptions)
+				ops.wipe()
+				print('MomentCurvature is OK!')
+				return
+
+			# Use displacement control at node 2 for section analysis
+			ops.integrator('DisplacementControl', 2, 6-flagy, dK)
+
+			# Do the section analysis
+			failed = False
+			if recordMode == 'file':
+				if ops.analyze(numIncr) != 0:
+					failed = True
+					print('Warning: the analysis failed before', numIncr, 'increments, the curve is truncated')
+			else:
+				for i in range(numIncr):
+					if ops.analyze(1) != 0:
+						failed = True
+						print('Warning: the analysis failed at increment', i+1, 'the curve is truncated')
+						self.momentCurvature = self.momentCurvature[:i+1]
+						self.coreResponse = self.coreResponse[:i+1]
+						self.barResponse = self.barResponse[:i+1]
+						break
+					self._captureStep(i+1, 6-flagy)
+			ops.wipe()
+			if not failed or not recovery:
+				print('MomentCurvature is OK!')
+				return
+			print('The fixed-step analysis is run again increment by increment with recovery')
+
+	def _stepAnalysis(self, applyStep, stepState, maxK, dK, yieldStrain, coreSlice, barSlice, adaptive=True,
+					  ultimateStrain=None, untilUltimate=False, maxExtension=4.0, recoveryActions=None,
+					  restoreDefaults=None, maxHalving=4, trackIndex=None, momentTol=0.005, minRatio=0.1, maxRatio=2.0):
+		"""
+		Step-by-step curvature driver of both backends.
+		With adaptive steps the next increment is scaled by the deviation of the moment from the tangent
+		extrapolation of the previous step (a change of the tangent stiffness, relative to the largest moment so far)
+		and, while the bars are elastic, by the largest fiber strain increment (relative to the bar yield strain).
+		The knee at yield and the peak moment are therefore resolved with small steps while the increment grows up
+		to maxRatio*dK on the post-yield plateau. First bar yield is approached so that it falls on a step, the bar
+		rupture and core crushing strains by halving the predicted distance, and the range ends with an increment of
+		at most dK. Otherwise every increment is dK.
+		A failed increment is recovered in place when restoreDefaults is given: the remaining increment is
+		subdivided by halving (up to maxHalving times), first with the default solver settings and then with each
+		recovery action, and the defaults are restored once the target curvature is reached. Every action is logged
+		in self.recoveryLog as (curvature, action, succeeded).
+		:param applyStep: function(kappa) imposing the total curvature kappa, returns True if converged
+		:param stepState: function() returning (moment, curvature, fiber [stress, strain] of all fibers)
+		:param maxK: final curvature
+		:param dK: nominal curvature increment
+		:param yieldStrain: bar yield strain
+		:param coreSlice: core fibers in the fiber arrays
+		:param barSlice: bar fibers in the fiber arrays
+		:param adaptive: adaptive or constant increments
+		:param ultimateStrain: (bar rupture strain eult, core crushing strain ecu) checked after every step
+		:param untilUltimate: stop once an ultimate strain is passed, extend maxK while none is reached
+		:param maxExtension: largest extended curvature as a multiple of maxK
+		:param recoveryActions: [(description, function changing the solver settings)] tried after halving fails
+		:param restoreDefaults: function restoring the default solver settings, None disables the recovery
+		:param maxHalving: number of step halvings tried with every solver setting
+		:param trackIndex: fibers kept from the stepState arrays (None keeps all), coreSlice and barSlice then refer
+			to the kept fibers
+		:param momentTol: target deviation from the tangent extrapolation per step, relative to the largest moment
+		:param minRatio: smallest adaptive increment relative to dK
+		:param maxRatio: largest adaptive increment relative to dK
+		"""
+		moments, curvatures, responses = [], [], []
+
+		def record():
+			stepMoment, stepCurvature, stressStrain = stepState()
+			moments.append(stepMoment)
+			curvatures.append(stepCurvature)
+			stressStrain = np.array(stressStrain, dtype=np.float64)
+			responses.append(stressStrain if trackIndex is None else stressStrain[trackIndex])
+
+		def log(curvature, action, succeeded):
+			self.recoveryLog.append((curvature, action, succeeded))
+			print('Step recovery at curvature', curvature, ':', action, '->', 'converged' if succeeded else 'failed')
+
+		def recoverStep(start, target):
+			current = start
+			for action, setSolver in [('default settings', None)]+list(recoveryActions or []):
+				if setSolver is not None:
+					setSolver()
+				subStep = 0.5*(target-current)
+				halving = 1
+				while halving <= maxHalving:
+					converged = applyStep(min(current+subStep, target))
+					log(current, action+', step '+'%.3g' % subStep, converged)
+					if converged:
+						record()
+						current = curvatures[-1]
+						if current >= target*(1.0-1e-12):
+							restoreDefaults()
+							log(current, 'restore default settings', True)
+							return True
+					else:
+						subStep *= 0.5
+						halving += 1
+			restoreDefaults()
+			return False
+
+		record()
+		moments[0] = 0.0
+		# start with the smallest increment, the first steps have no curvature estimate of the M-phi curve
+		kappa, step = curvatures[0], (minRatio*dK if adaptive else dK)
+		previousTangent = None
+		rangeK, finalK = maxK, maxK*maxExtension
+		ultimateReached = False
+		while True:
+			if kappa >= maxK*(1.0-1e-9):
+				if not untilUltimate or maxK >= finalK*(1.0-1e-9):
+					break
+				maxK = min(maxK+rangeK, finalK)
+				print('Ultimate limit not reached, curvature range extended to', maxK)
+			step = min(step, maxK-kappa)
+			if applyStep(kappa+step):
+				record()
+			elif restoreDefaults is None or not recoverStep(kappa, kappa+step):
+				print('Step control: analysis failed at curvature', kappa+step, 'the curve is truncated')
+				break
+			kappa = curvatures[-1]
+			if ultimateStrain is not None:
+				strain = responses[-1][:, 1]
+				ultimateReached = np.max(strain[barSlice], initial=-np.inf) >= ultimateStrain[0] or \
+								  np.min(strain[coreSlice], initial=np.inf) <= ultimateStrain[1]
+				if ultimateReached and untilUltimate:
+					print('Ultimate limit reached at curvature', kappa)
+					break
+			if not adaptive:
+				continue
+			increment = curvatures[-1]-curvatures[-2]
+			tangent = (moments[-1]-moments[-2])/increment
+			strain, previousStrain = responses[-1][:, 1], responses[-2][:, 1]
+			barStrain = np.max(np.abs(strain[barSlice]), initial=0.0)
+			# the fiber strain increments are limited while the bars are elastic, after yield the moment deviation
+			# alone sets the steps, so that they grow on the post-yield plateau
+			indicator = np.max(np.abs(strain-previousStrain))/yieldStrain if barStrain < yieldStrain else 0.0
+			if previousTangent is not None:
+				deviation = abs(moments[-1]-moments[-2]-previousTangent*increment)
+				indicator = max(indicator, deviation/(momentTol*max(np.max(np.abs(moments)), 1e-12)))
+			previousTangent = tangent
+			step = increment*min(max(0.9/np.sqrt(max(indicator, 1e-12)), 0.5), 2.0)
+			step = min(max(step, minRatio*dK), maxRatio*dK)
+			# approach first yield of the bars so that it falls on a step, and the ultimate strains by halving the
+			# predicted distance, so that the step crossing them is small even when the strains grow faster than
+			# the curvature: (current value, previous value, limit, fraction of the distance, smallest step) of the
+			# bar strain magnitude, the bar tension and the core compression
+			approaches = [(barStrain, np.max(np.abs(previousStrain[barSlice]), initial=0.0), yieldStrain, 1.0,
+						   0.1*minRatio*dK)]
+			if ultimateStrain is not None:
+				approaches += [(np.max(strain[barSlice], initial=0.0), np.max(previousStrain[barSlice], initial=0.0),
+								ultimateStrain[0], 0.5, minRatio*dK),
+							   (-np.min(strain[coreSlice], initial=0.0), -np.min(previousStrain[coreSlice], initial=0.0),
+								-ultimateStrain[1], 0.5, minRatio*dK)]
+			for value, previousValue, limit, fraction, smallest in approaches:
+				rate = (value-previousValue)/increment
+				if value < limit and rate > 0:
+					step = min(step, max(fraction*(limit-value)/rate, smallest))
+			# end the range with an increment of at most dK, MCCurve leaves the last segment out of the area
+			step = min(step, max(maxK-kappa-dK, dK))
+		self.ultimateReached = ultimateReached
+		momentCurvature = np.column_stack((moments, curvatures))
+		stressStrain = np.array(responses)
+		self._lap('storeResponse')
+		self._storeResponse(momentCurvature, stressStrain[:, coreSlice], stressStrain[:, barSlice])
+
+	def _captureStep(self, stepIndex, dof):
+		"""
+		Store the moment, curvature and fiber stress/strain of the current step in the in-memory arrays
+		:param stepIndex: row of the response arrays
+		:param dof: controlled degree of freedom of node 2
+		"""
+		ops = _opensees()
+		self.momentCurvature[stepIndex, 0] = ops.getTime()
+		self.momentCurvature[stepIndex, 1] = ops.nodeDisp(2, dof)
+		# fiberData returns (y, z, area, stress, strain) for every fiber of the section
+		fiberData = np.array(ops.eleResponse(1, 'section', 'fiberData')).reshape(-1, 5)
+		self.coreResponse[stepIndex] = fiberData[self._coreSlice, 3:5]
+		self.barResponse[stepIndex] = fiberData[self._barSlice, 3:5]
+
+	def _storeResponse(self, momentCurvature, coreStressStrain, barStressStrain):
+		"""
+		Store the responses computed by the numpy backend in memory or in the recorder file layout
+		:param momentCurvature: [moment, curvature] of every step
+		:param coreStressStrain: core fiber [stress, strain] of every step (steps x fibers x 2)
+		:param barStressStrain: bar fiber [stress, strain] of every step (steps x fibers x 2)
+		"""
+		if self.recordMode == 'memory':
+			self.momentCurvature = momentCurvature
+			self.coreResponse = coreStressStrain
+			self.barResponse = barStressStrain
+			return
+		for folder in ('coreRecorder', 'barRecorder'):
+			if os.path.exists(folder):
+				shutil.rmtree(folder)
+			os.makedirs(folder)
+		np.savetxt('MomentCurvature.txt', momentCurvature)
+		timeColumn = momentCurvature[:, [0]]
+		for folder, stressStrain in (('coreRecorder', coreStressStrain), ('barRecorder', barStressStrain)):
+			for i in range(stressStrain.shape[1]):
+				np.savetxt(folder+'/'+str(i+1)+'.txt', np.hstack((timeColumn, stressStrain[:, i])))
 
 	def mmToInches (self, mm):
 		#mm transform to inches
@@ -124,135 +564,113 @@ class MC():
 		return inches
 
 	def plotLinearRegre (self,x1,y1,x2,y2,xyield,yyield,xmax,ymax):
-		#plot moment-curvature curve
-		xscat=np.array(x1)
-		yscat=np.array(y1)
-		xliner=np.array(x2)
-		yliner=np.array(y2)
+		#plot moment-curvature curve, rendered in the mode of figureRender.setRenderMode
 		width=self.mmToInches(90)
 		height=self.mmToInches(55)
-		plt.figure(1, figsize=(width, height))
-		plt.subplot(111)
-		p1=plt.plot(xscat,yscat)
-		p2=plt.plot(xliner,yliner)
-		p3=plt.plot(xyield,yyield,"o")
-		p4=plt.plot(xmax,ymax,"o")
-
-		plt.setp(p1, linewidth=1,color='g')
-		plt.setp(p2, color='r',linestyle='--',linewidth=1)
-
-		if not os.path.exists('MCFig'):
-			os.makedirs('MCFig')
-
-		plt.grid(c='k',linestyle='--',linewidth=0.3)
-		plt.xlabel("curvature")
-		plt.ylabel("moment(kN.m)")
-		plt.xlim(0.0, 1.01*max(xscat))
-		plt.ylim(3, 1.3*max(yscat))
-		plt.title(self.sectName+'-'+self.direction+'-'+str(int(yliner[2])))
-		plt.savefig('MCFig/'+self.sectName+'-'+self.direction+'-'+str(int(yliner[2]))+".png",dpi = 600,bbox_inches="tight")
-		plt.show()
-
-	def MCCurve(self):
-
-		fsy = np.loadtxt(self.sectName + "/barParameter.txt")[0]
-		Es = np.loadtxt(self.sectName + "/barParameter.txt")[2]
-		ey = fsy/Es
-		esu = np.loadtxt(self.sectName + "/barParameter.txt")[5]
-		ecu = np.loadtxt(self.sectName + "/coreParameter.txt")[2]
+		title=self.sectName+'-'+str(self.direction)+'-'+str(int(np.array(y2)[2]))
+		return submitFigure(drawMomentCurvature,(np.array(x1),np.array(y1),np.array(x2),np.array(y2),xyield,yyield,\
+							xmax,ymax,title),'MCFig/'+title,(width,height),('png',),600,"tight")
 
+	def _strainHistory(self):
+		"""
+		Moment-curvature history and all core/bar fiber strain histories, loaded once.
+		Raises FileNotFoundError when neither the memory nor the working directory holds the analysis results.
+		:return: momentCurvature (steps x 2), coreStrain (steps x core fibers), barStrain (steps x bar fibers)
+		"""
+		if self.coreResponse is not None:
+			# in-memory capture: strain histories are already stored as arrays
+			return self.momentCurvature, self.coreResponse[:, :, 1], self.barResponse[:, :, 1]
 		try:
-			barDir =  os.listdir('barRecorder/')
-			coreDir =  os.listdir('coreRecorder/')
-		except:
-			print("Please road MC Analysis")
+			# recorder files are numbered in fiber order
+			barDir = sorted(os.listdir('barRecorder/'), key=lambda name: int(name.split('.')[0]))
+			coreDir = sorted(os.listdir('coreRecorder/'), key=lambda name: int(name.split('.')[0]))
+			momentCurvature = np.loadtxt("MomentCurvature.txt", ndmin=2)
+		except FileNotFoundError as error:
+			raise FileNotFoundError("No moment curvature results in "+os.getcwd()+", run MCAnalysis first") from error
+		if not barDir or not coreDir or len(momentCurvature) == 0:
+			raise ValueError("The moment curvature results in "+os.getcwd()+" are empty, run MCAnalysis again")
+		barStrain = np.column_stack([np.loadtxt('barRecorder/'+eachFile, ndmin=2)[:,2] for eachFile in barDir])
+		coreStrain = np.column_stack([np.loadtxt('coreRecorder/'+eachFile, ndmin=2)[:,2] for eachFile in coreDir])
+		return momentCurvature, coreStrain, barStrain
+
+	@profiled
+	def MCCurve(self, limitStates=None, plot=True):
+		"""
+		Find the limit states and the equivalent bilinear curve of the moment-curvature analysis
+		:param limitStates: additional strain limit states {name: (group, strain)}, group is 'core' or 'bar',
+			a positive strain is checked in tension (strain >= limit) and a negative one in compression
+			(strain <= limit), e.g. {'coverSpalling': ('core', -0.005), 'barBuckling': ('bar', -0.02)}.
+			The first exceedance index of every limit state is stored in self.limitStateIndex (None if not reached)
+		:param plot: plot and save the moment-curvature curve or not
+		:return: equivalent yield moment
+		"""
+		self._lap('loadSection')
+		section = loadSection(self.sectPath)
+		fsy, Es, esu = section['barParameter'][[0, 2, 5]]
+		ey = fsy/Es
+		ecu = section['coreParameter'][2]
 
-		momentCurvature=np.loadtxt("MomentCurvature.txt")
+		self._lap('readResponse')
+		momentCurvature, coreStrain, barStrain = self._strainHistory()
+		self._lap('limitStates')
 		sectCurvature=momentCurvature[:, 1]
 		sectMoment = momentCurvature[:, 0]
-		barYieldIndexList=[]
+
+		#钢筋首次屈服、纵筋达到极限应变、核心混凝土压溃以及用户指定的极限状态
+		allLimitStates = {'barYield': ('bar', ey), 'barRupture': ('bar', esu), 'coreCrush': ('core', ecu)}
+		if limitStates is not None:
+			allLimitStates.update(limitStates)
+		names = list(allLimitStates.keys())
+		indexArray = np.full(len(names), -1)
+		trackedIndex = np.full(len(names), -1)
+		for group, strain in (('core', coreStrain), ('bar', barStrain)):
+			groupIndex = [i for i, name in enumerate(names) if allLimitStates[name][0] == group]
+			if groupIndex:
+				limits = np.array([allLimitStates[names[i]][1] for i in groupIndex], dtype=float)
+				indexArray[groupIndex] = firstExceedance(strain, limits)
+				if self.trackFibers == 'verify':
+					trackedIndex[groupIndex] = firstExceedance(strain[:, self.trackedFibers[group]], limits)
+		if self.trackFibers == 'verify':
+			self.trackingCheck = {name: (int(full), int(tracked)) for name, full, tracked in zip(names, indexArray, trackedIndex)}
+			mismatch = [name for name, (full, tracked) in self.trackingCheck.items() if full != tracked]
+			print('Extreme fiber tracking verified' if not mismatch else
+				  'Warning: the extreme fibers miss the limit states '+', '.join(mismatch))
+		self.limitStateIndex = {name: (int(index) if index >= 0 else None) for name, index in zip(names, indexArray)}
 
 		#寻找钢筋首次屈服点
-		for eachFilePath in barDir:
-			barStressStrain=np.loadtxt('barRecorder/'+eachFilePath)
-			barStrain=barStressStrain[:,2]
-			try:
-				indexNum=np.where(barStrain>=ey)[0][0]
-				barYieldIndexList.append(indexNum)
-			except:
-				pass
-		barYieldIndex=min(barYieldIndexList)
+		barYieldIndex = self.limitStateIndex['barYield']
+		if barYieldIndex is None:
+			raise ValueError("The bars do not yield, a larger mu is required")
 		barYieldCurvature=sectCurvature[barYieldIndex]
 		barYieldMoment=sectMoment[barYieldIndex]
 		print('yieldM,yielde',barYieldMoment,barYieldCurvature)
 
 		#寻找核心混凝土压溃或者纵筋达到极限应变的点
-		barCrackIndex = len(sectMoment)-1
-		barCrackIndexList = []
-		for eachFilePath in barDir:
-			barStressStrain=np.loadtxt('barRecorder/'+eachFilePath)
-			barStrain=barStressStrain[:,2]
-			try:
-				indexNum=np.where(barStrain>esu)[0][0]
-				barCrackIndexList.append(indexNum)
-			except:
-				pass
-		try:
-			barCrackIndex=min(barCrackIndexList)
-		except:
-			pass
-
-		coreCrackIndex = len(sectMoment)-1
-
-		coreCrackIndexList = []
-		for eachFile1 in coreDir:
-			coreStressStrain=np.loadtxt('coreRecorder/'+eachFile1)
-			coreStain=coreStressStrain[:,2]
-			try:
-				indexNum=np.where(coreStain < ecu)[0][0]
-				coreCrackIndexList.append(indexNum)
-			except:
-				pass
-		try:
-			coreCrackIndex=min(coreCrackIndexList)
-		except:
-			pass
-		crackIndex = min(barCrackIndex, coreCrackIndex)
-		if crackIndex == len(sectMoment)-1:
+		crackIndexList = [self.limitStateIndex[name] for name in ('barRupture', 'coreCrush')
+						  if self.limitStateIndex[name] is not None]
+		if crackIndexList:
+			crackIndex = min(crackIndexList)
+		else:
+			crackIndex = len(sectMoment)-1
 			print("A larger mu is required")
 
-		ultimateMoment = sectMoment[crackIndex]
-		ultimateCurvature = sectCurvature[crackIndex]
+		#寻找截面弯矩达到最大点并计算等效屈服弯矩和曲率
+		self._lap('bilinearIdealize')
+		self.curveResult = bilinearIdealize(sectCurvature, sectMoment, barYieldIndex, crackIndex)
+		ultimateMoment = self.curveResult['ultimateMoment']
+		ultimateCurvature = self.curveResult['ultimateCurvature']
 		print('ultM,ulte：',ultimateMoment,ultimateCurvature)
-
-		#寻找截面弯矩达到最大点
-		momentMaxMoment = max(sectMoment[:crackIndex+1])
-		momentMaxIndex = np.where(sectMoment[:crackIndex+1] == momentMaxMoment)[0][0]
-		momentMaxCurvature = sectCurvature[:crackIndex+1][momentMaxIndex]
+		momentMaxMoment = self.curveResult['maxMoment']
+		momentMaxCurvature = self.curveResult['maxCurvature']
 		print('maxM, maxe：',momentMaxMoment,momentMaxCurvature)
-
-		#计算等效屈服弯矩和曲率
-		totArea=np.trapz(sectMoment[:crackIndex], sectCurvature[:crackIndex])
-		barYieldX=barYieldCurvature
-		barYieldY=barYieldMoment
-		tanXY=barYieldY/barYieldX
-
-		epsilon=0.001*totArea
-		low=0.0
-		high=momentMaxMoment
-		momentEffictive=(low+high)/2.0
-		while abs(momentEffictive*ultimateCurvature-momentEffictive*0.5*momentEffictive/float(tanXY)-totArea)>=epsilon:
-			if momentEffictive*ultimateCurvature-momentEffictive/float(tanXY)*momentEffictive*0.5<totArea:
-				low=momentEffictive
-			else:
-				high=momentEffictive
-			momentEffictive=(high+low)/2.0
-
-		curvatureEffective=momentEffictive/float(tanXY)
+		momentEffictive = self.curveResult['effectiveMoment']
+		curvatureEffective = self.curveResult['effectiveCurvature']
 		blinerX=[0,curvatureEffective,ultimateCurvature]
 		blinerY=[0,momentEffictive,momentEffictive]
 		print('effM, effe：', momentEffictive, curvatureEffective)
 
-		self.plotLinearRegre(sectCurvature[:crackIndex],sectMoment[:crackIndex],blinerX,blinerY,\
-		                 barYieldCurvature,barYieldMoment,momentMaxCurvature,momentMaxMoment)
+		if plot:
+			self._lap('plot')
+			self.plotLinearRegre(sectCurvature[:crackIndex],sectMoment[:crackIndex],blinerX,blinerY,\
+			                 barYieldCurvature,barYieldMoment,momentMaxCurvature,momentMaxMoment)
 		return momentEffictive
@@ -6,71 +6,205 @@
 # @Software : PyCharm
 
 import math
-from decimal import Decimal, getcontext
+import os
+import zipfile
+import tempfile
+import numpy as np
+import meshCache
+
+# 约束应力比-强度提高系数插值表的存储位置(None时存于meshCache的用户缓存目录)及内存缓存
+tableFile = None
+_tableCache = {}
+
+
+def _tableFileName():
+	"""
+	插值表文件的路径
+	"""
+	return tableFile if tableFile is not None else os.path.join(meshCache.cacheDir, 'confinedStrengthRatioTable.npz')
+
+
+def _catmullRom(t):
+	"""
+	Cubic (Catmull-Rom) interpolation weights of the four neighbouring grid points
+	:param t: local coordinate in [0, 1] between the second and third point
+	"""
+	return np.array([(-t**3+2*t**2-t)/2, (3*t**3-5*t**2+2)/2, (-3*t**3+4*t**2+t)/2, (t**3-t**2)/2])
+
+
+def brent(fun, a, b, xtol=1e-12, maxIter=100):
+	"""
+	Brent's method for a root bracketed in [a, b], terminates after at most maxIter iterations
+	:param fun: scalar function
+	:param a: one end of the bracket
+	:param b: other end of the bracket
+	:param xtol: absolute tolerance of the root
+	:param maxIter: maximum number of iterations
+	:return: root
+	"""
+	fa, fb = fun(a), fun(b)
+	if fa == 0:
+		return a
+	if fb == 0:
+		return b
+	if fa*fb > 0:
+		raise ValueError("The root is not bracketed in [%g, %g]" % (a, b))
+	c, fc = a, fa
+	d = e = b-a
+	for i in range(maxIter):
+		if fb*fc > 0:
+			c, fc = a, fa
+			d = e = b-a
+		if abs(fc) < abs(fb):
+			a, b, c = b, c, b
+			fa, fb, fc = fb, fc, fb
+		tol = 2.0*np.finfo(float).eps*abs(b)+0.5*xtol
+		m = 0.5*(c-b)
+		if abs(m) <= tol or fb == 0:
+			return b
+		if abs(e) >= tol and abs(fa) > abs(fb):
+			# inverse quadratic interpolation or secant step
+			s = fb/fa
+			if a == c:
+				p = 2.0*m*s
+				q = 1.0-s
+			else:
+				q, r = fa/fc, fb/fc
+				p = s*(2.0*m*q*(q-r)-(b-a)*(r-1.0))
+				q = (q-1.0)*(r-1.0)*(s-1.0)
+			if p > 0:
+				q = -q
+			else:
+				p = -p
+			if 2.0*p < min(3.0*m*q-abs(tol*q), abs(e*q)):
+				e, d = d, p/q
+			else:
+				d = e = m
+		else:
+			d = e = m
+		a, fa = b, fb
+		b += d if abs(d) > tol else (tol if m > 0 else -tol)
+		fb = fun(b)
+	return b
 
 
 class Mander():
 	def __init__ (self):
 		self.eco = 0.002 #无约束混凝土最大应力时的应变
 		self.esu = 0.09 #箍筋拉断应变
+		self.stressTol = 1e-4 #约束混凝土强度的求解精度(MPa)
+		self.useTable = True #矩形截面是否采用插值表计算强度提高系数
+		self.tableStep = 0.0025 #插值表的约束应力比间距
+		self.tableMax = 0.3 #插值表的最大约束应力比
 
 	def william_warnke(self, sigma1, sigma2, sigma3):
 		"""
-		William-Warnke混凝土五参数模型确定的破坏面
+		William-Warnke混凝土五参数模型确定的破坏面(float64,支持numpy数组)
 		:param sigma1: 第一主应力
 		:param sigma2: 第二主应力
 		:param sigma3: 第三主应力
 		:return: 破坏面函数值
 		"""
-		getcontext().prec = 30
-		sigma1, sigma2, sigma3 = Decimal(sigma1), Decimal(sigma2), Decimal(sigma3)
-		sigmaa = (sigma1 + sigma2 + sigma3) / Decimal(3)
-		taoa = ((sigma1 - sigma2) ** Decimal(2) + (sigma2 - sigma3) ** Decimal(2) + (sigma3 - sigma1) ** Decimal(2)) ** Decimal(0.5) / Decimal(15) ** Decimal(0.5)
+		sigma1, sigma2, sigma3 = [np.asarray(each, dtype=np.float64) for each in (sigma1, sigma2, sigma3)]
+		sigmaa = (sigma1 + sigma2 + sigma3) / 3.0
+		squares = (sigma1 - sigma2) ** 2 + (sigma2 - sigma3) ** 2 + (sigma3 - sigma1) ** 2
+		taoa = np.sqrt(squares / 15.0)
 
 		#若根据实验数据对破坏面进行标定，则按如下公式取值
-		#alphat, alphac, kexi, rou1, rou2=Decimal(0.15),Decimal(1.8),Decimal(3.67),Decimal(1.5),Decimal(1.94)
-		#a2 = Decimal(9)*(Decimal(1.2)**Decimal(0.5)*kexi*(alphat-alphac)-Decimal(1.2)**Decimal(0.5)*alphat*alphac+rou1*(Decimal(2)*alphac+alphat))/((Decimal(2)*alphac+alphat)*(Decimal(3)*kexi-Decimal(2)*alphac)*(Decimal(3)*kexi+alphat))
-		#a1 = (Decimal(2)*alphac-alphat)*a2/Decimal(3)+Decimal(1.2)**Decimal(0.5)*(alphat-alphac)/(Decimal(2)*alphac+alphat)
-		#a0 = Decimal(2)*alphac*a1/Decimal(3)-Decimal(4)*alphac**Decimal(2)*a2/Decimal(9)+(Decimal(2)/Decimal(15))**Decimal(0.5)*alphac
-		#kexi0 = (-a1-(a1**2-Decimal(4)*a0*a2)**Decimal(0.5))/(Decimal(2)*a2)
-		#b2 = Decimal(9)*(rou2*(kexi0+Decimal(1)/Decimal(3))-(Decimal(2)/Decimal(15))**Decimal(0.5)*(kexi0+kexi))/((kexi+kexi0)*(Decimal(3)*kexi-Decimal(1))*(Decimal(3)*kexi0+Decimal(1)))
-		#b1 = (kexi+Decimal(1)/Decimal(3))*b2+(Decimal(1.2)**Decimal(0.5)-Decimal(3)*rou2)/(Decimal(3)*kexi-Decimal(1))
-		#b0 = -kexi0*b1-kexi0**Decimal(2)*b2
-		#r1 = a0+a1*sigmaa+a2*sigmaa**Decimal(2)
-		#r2 = b0+b1*sigmaa+b2*sigmaa**Decimal(2)
+		#alphat, alphac, kexi, rou1, rou2 = 0.15, 1.8, 3.67, 1.5, 1.94
+		#a2 = 9*(1.2**0.5*kexi*(alphat-alphac)-1.2**0.5*alphat*alphac+rou1*(2*alphac+alphat))/((2*alphac+alphat)*(3*kexi-2*alphac)*(3*kexi+alphat))
+		#a1 = (2*alphac-alphat)*a2/3+1.2**0.5*(alphat-alphac)/(2*alphac+alphat)
+		#a0 = 2*alphac*a1/3-4*alphac**2*a2/9+(2/15)**0.5*alphac
+		#kexi0 = (-a1-(a1**2-4*a0*a2)**0.5)/(2*a2)
+		#b2 = 9*(rou2*(kexi0+1/3)-(2/15)**0.5*(kexi0+kexi))/((kexi+kexi0)*(3*kexi-1)*(3*kexi0+1))
+		#b1 = (kexi+1/3)*b2+(1.2**0.5-3*rou2)/(3*kexi-1)
+		#b0 = -kexi0*b1-kexi0**2*b2
+		#r1 = a0+a1*sigmaa+a2*sigmaa**2
+		#r2 = b0+b1*sigmaa+b2*sigmaa**2
 
 		# 参考Schickert-Winkler的实验数据得到的结果
-		r1 = Decimal(0.053627)-Decimal(0.512079)*sigmaa-Decimal(0.038226)*sigmaa**Decimal(2)
-		r2 = Decimal(0.095248)-Decimal(0.891175)*sigmaa-Decimal(0.244420)*sigmaa**Decimal(2)
+		r1 = 0.053627 - 0.512079 * sigmaa - 0.038226 * sigmaa ** 2
+		r2 = 0.095248 - 0.891175 * sigmaa - 0.244420 * sigmaa ** 2
 
-		r21 = r2**Decimal(2)-r1**Decimal(2)
-		cosxita = (Decimal(2)*sigma1-sigma2-sigma3)/(Decimal(2)**Decimal(0.5)*((sigma1-sigma2)**Decimal(2)+(sigma2-sigma3)**Decimal(2)+(sigma3-sigma1)**Decimal(2))**Decimal(0.5))
-		rxita = (Decimal(2)*r2*r21*cosxita+r2*(Decimal(2)*r1-r2)*(Decimal(4)*r21*cosxita**Decimal(2)+Decimal(5)*r1**Decimal(2)-Decimal(4)*r1*r2)**Decimal(0.5))/(Decimal(4)*r21*cosxita**Decimal(2)+(r2-Decimal(2)*r1)**Decimal(2))
-		return taoa/rxita-1
+		r21 = r2 ** 2 - r1 ** 2
+		cosxita = (2 * sigma1 - sigma2 - sigma3) / (np.sqrt(2.0) * np.sqrt(squares))
+		rxita = (2 * r2 * r21 * cosxita + r2 * (2 * r1 - r2) * np.sqrt(4 * r21 * cosxita ** 2 + 5 * r1 ** 2 - 4 * r1 * r2)) \
+				/ (4 * r21 * cosxita ** 2 + (r2 - 2 * r1) ** 2)
+		result = taoa / rxita - 1
+		return float(result) if result.ndim == 0 else result
 
-	def confinedStrengthRatio(self, confiningStrengthRatio1, confiningStrengthRatio2):
+	def confinedStrengthRatio(self, confiningStrengthRatio1, confiningStrengthRatio2, tol=1e-6):
 		"""
 		根据两个方向的约束应力比计算核心混凝土的强度提高系数
 		:param confiningStrengthRatio1: x方向的约束应力比
 		:param confiningStrengthRatio2: y方向的约束应力比
+		:param tol: 强度提高系数的求解精度(以fco为单位的应力)
 		:return: 核心混凝土强度提高系数
 		"""
 		sigma1 = -min(confiningStrengthRatio1, confiningStrengthRatio2)
 		sigma2 = -max(confiningStrengthRatio1, confiningStrengthRatio2)
-		sigma3Min = -4
-		sigma3Max = -1
-		while True:
-			sigma3Mid = (sigma3Min + sigma3Max) / 2
-			fun_min = self.william_warnke(sigma1, sigma2, sigma3Min)
-			fun_max = self.william_warnke(sigma1, sigma2, sigma3Max)
-			fun_mid = self.william_warnke(sigma1, sigma2, sigma3Mid)
-			if abs(fun_mid) < 0.001:   # 当误差小于设定范围时，输出值
-				return -sigma3Mid
-				break
-			elif fun_min * fun_mid < 0:
-				sigma3Max = sigma3Mid
-			elif fun_max * fun_mid < 0:
-				sigma3Min = sigma3Mid
+		# 破坏面在sigma3为-4与-1之间有根，Brent法保证在有限次迭代内收敛
+		sigma3 = brent(lambda sigma3: self.william_warnke(sigma1, sigma2, sigma3), -4.0, -1.0, xtol=tol)
+		return -sigma3
+
+	def confinedStrengthRatioTable(self):
+		"""
+		强度提高系数插值表，首次使用时计算并保存至tableFile，之后直接读取，目录不可写时只保存在内存中
+		表格坐标为较小的约束应力比s及两个约束应力比之差d，在该坐标下强度提高系数为光滑函数
+		:return: 坐标网格grid, 强度提高系数table[i, j](s=grid[i], d=grid[j])
+		"""
+		key = (self.tableStep, self.tableMax)
+		if key in _tableCache:
+			return _tableCache[key][:2]
+		grid = np.arange(0.0, self.tableMax+0.5*self.tableStep, self.tableStep)
+		table = None
+		fileName = _tableFileName()
+		if os.path.exists(fileName):
+			# 表格文件损坏或网格不一致时重新计算
+			try:
+				with np.load(fileName) as data:
+					if np.array_equal(data['grid'], grid) and data['table'].shape == (len(grid), len(grid)):
+						table = data['table']
+			except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+				table = None
+		if table is None:
+			table = np.array([[self.confinedStrengthRatio(s, s+d, 1e-10) for d in grid] for s in grid])
+			# 写入唯一的临时文件后原子替换，多个进程同时计算时不会读到不完整的表格
+			tempName = None
+			try:
+				os.makedirs(os.path.dirname(fileName), exist_ok=True)
+				handle, tempName = tempfile.mkstemp(dir=os.path.dirname(fileName), suffix='.npz.tmp')
+				with os.fdopen(handle, 'wb') as f:
+					np.savez(f, grid=grid, table=table)
+				os.replace(tempName, fileName)
+			except OSError as error:
+				print('Confined strength ratio table is kept in memory only:', error)
+				if tempName is not None and os.path.exists(tempName):
+					os.remove(tempName)
+		# 边界外一排点按奇对称延拓，以使用四点插值
+		_tableCache[key] = (grid, table, np.pad(table, 1, mode='reflect', reflect_type='odd'))
+		return grid, table
+
+	def lookupConfinedStrengthRatio(self, confiningStrengthRatio1, confiningStrengthRatio2, tol=1e-6):
+		"""
+		由插值表三次插值得到核心混凝土的强度提高系数，超出表格范围时采用confinedStrengthRatio直接求解
+		:param confiningStrengthRatio1: x方向的约束应力比
+		:param confiningStrengthRatio2: y方向的约束应力比
+		:param tol: 超出表格范围时直接求解的精度(以fco为单位的应力)
+		:return: 核心混凝土强度提高系数
+		"""
+		s = min(confiningStrengthRatio1, confiningStrengthRatio2)
+		d = max(confiningStrengthRatio1, confiningStrengthRatio2) - s
+		if s < 0 or s > self.tableMax or d > self.tableMax:
+			return self.confinedStrengthRatio(confiningStrengthRatio1, confiningStrengthRatio2, tol)
+		grid, table = self.confinedStrengthRatioTable()
+		padded = _tableCache[(self.tableStep, self.tableMax)][2]
+		n = len(grid)
+		i = min(int(s / self.tableStep), n - 2)
+		j = min(int(d / self.tableStep), n - 2)
+		weightS = _catmullRom(s / self.tableStep - i)
+		weightD = _catmullRom(d / self.tableStep - j)
+		return float(weightS @ padded[i:i+4, j:j+4] @ weightD)
 
 	def circular(self, hoop, d, coverThick, roucc, s, ds, fyh, fco):
 		"""
@@ -120,7 +254,10 @@ class Mander():
 		ke = (1-nsl*sl**2/6)*(1-0.5*st/lxe)*(1-0.5*st/lye)/(1-roucc)
 		flxe = ke * roux * fyh
 		flye = ke * rouy * fyh
-		fcc = fco *self.confinedStrengthRatio(flxe/fco, flye/fco)
+		if self.useTable:
+			fcc = fco *self.lookupConfinedStrengthRatio(flxe/fco, flye/fco, self.stressTol/fco)
+		else:
+			fcc = fco *self.confinedStrengthRatio(flxe/fco, flye/fco, self.stressTol/fco)
 		ecc = self.eco*(1+5*(fcc/fco-1))
 		ecu = 0.004+1.4*(roux+rouy)*fyh*self.esu/fcc
 		return -fcc, -ecc, -ecu
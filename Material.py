@@ -6,7 +6,7 @@
 # @Software : PyCharm
 import math
 from Mander import Mander
-import numpy as np
+from sectionBundle import saveSection
 
 class Material():
 	def __init__ (self, sectName):
@@ -29,7 +29,7 @@ class Material():
 		eult = 0.1
 		fu = 0.01*Es*(eult-esh)+fy
 		barPara = [fy, fu, Es, Esh, esh, eult]
-		np.savetxt(self.sectName + "/barParameter.txt", barPara, fmt="%0.6f")
+		saveSection(self.sectName, {'steelTag': steelTag}, barParameter=barPara)
 		return barPara
 
 	def coverParameter(self, concreteTag):
@@ -60,7 +60,7 @@ class Material():
 		ecu = -0.004
 		Ec = math.sqrt(-fc/1000)*5e6
 		coverPara = [fc, ec, ecu, Ec]
-		np.savetxt(self.sectName + "/coverParameter.txt", coverPara, fmt="%0.6f")
+		saveSection(self.sectName, {'concreteTag': concreteTag}, coverParameter=coverPara)
 		return coverPara
 
 	def coreParameterCircular(self, concreteTag, hoop, d, coverThick, roucc, s, ds, fyh):
@@ -79,7 +79,8 @@ class Material():
 		confinedConcrete = Mander()
 		fc, ec, ecu = confinedConcrete.circular(hoop, d, coverThick, roucc, s, ds, fyh, -fco/1000)
 		corePara = [1000*fc, ec, ecu, Ec]
-		np.savetxt(self.sectName + "/coreParameter.txt", corePara, fmt="%0.6f")
+		saveSection(self.sectName, {'concreteTag': concreteTag, 'hoop': hoop, 'd': d, 'coverThick': coverThick,
+									'roucc': roucc, 's': s, 'ds': ds, 'fyh': fyh}, coreParameter=corePara)
 		return corePara
 
 	def coreParameterRectangular(self, concreteTag, lx, ly, coverThick, roucc, sl, dsl, roux, rouy, st, dst, fyh):
@@ -102,7 +103,9 @@ class Material():
 		confinedConcrete = Mander()
 		fc, ec, ecu = confinedConcrete.rectangular(lx, ly, coverThick, roucc, sl, dsl, roux, rouy, st, dst, fyh, -fco/1000)
 		corePara = [1000*fc, ec, ecu, Ec]
-		np.savetxt(self.sectName + "/coreParameter.txt", corePara, fmt="%0.6f")
+		saveSection(self.sectName, {'concreteTag': concreteTag, 'lx': lx, 'ly': ly, 'coverThick': coverThick,
+									'roucc': roucc, 'sl': sl, 'dsl': dsl, 'roux': roux, 'rouy': rouy, 'st': st,
+									'dst': dst, 'fyh': fyh}, coreParameter=corePara)
 		return corePara
 
 
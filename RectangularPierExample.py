@@ -12,6 +12,7 @@ from sectionFiberMain import circleSection,polygonSection
 from sectionFiberMain import circleSection
 from Material import Material
 from MCAnalysis import MC
+from sectionBundle import saveSection
 
 #Define section
 sectName = 'RectangularPier'
@@ -51,7 +52,7 @@ coreParameter = material.coreParameterRectangular("C40", lx, ly, coverThick, rou
 #Estimate the yield curvature of rectangular section
 kx = 1.957*barParameter[0]/barParameter[2]/lx
 ky = 1.957*barParameter[0]/barParameter[2]/lx
-np.savetxt(sectName+"/yieldCurvature.txt", [kx, ky],  fmt="%0.6f")
+saveSection(sectName, yieldCurvature=[kx, ky])
 
 #Moment curvature analysis
 mcInstance = MC('RectangularPier', 'X')
@@ -0,0 +1,406 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : batchRunner.py
+# @Software : PyCharm
+
+"""
+Moment curvature analyses of a table of sections:
+	python batchRunner.py sections.csv [--output batchResults.csv] [--workDir batchRuns] [--workers 8]
+Every row of the CSV/JSON table is one section (see sectionDefaults for the columns). The sections are meshed and
+their materials generated in worker processes, then every (section, axial load) analysis runs in its own working
+directory workDir/name/direction-axialLoad, and the results of all analyses are written to one table.
+Every unit is recorded in the job journal workDir/journal.jsonl, a restarted batch skips the finished units and
+runs the failed or interrupted ones again, up to --maxAttempts attempts.
+"""
+
+import os
+import csv
+import json
+import argparse
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from jobJournal import JobJournal, inputsHash
+
+# columns of the section table and their defaults, None marks optional inputs and required inputs without a default.
+# type 'circle' needs outD, 'rectangle' needs lx (extent along y) and ly (extent along z), 'polygon' needs
+# outSideNode [[y1,z1],...] and optionally inSideNode [[[y1,z1],...],...]; all types need outBarD and outBarDist.
+# axialLoads is a list (in a CSV cell a JSON list or values separated by ';')
+sectionDefaults = {'name': None, 'type': 'circle', 'direction': 'X', 'axialLoads': [0.0], 'moment': 0.0,
+				   'outD': None, 'inD': None, 'lx': None, 'ly': None, 'outSideNode': None, 'inSideNode': None,
+				   'coverThick': 0.06, 'coreSize': 0.2, 'coverSize': 0.2, 'mesher': 'gmsh',
+				   'outBarD': None, 'outBarDist': None, 'inBarD': None, 'inBarDist': None,
+				   'barGrade': 'HRB400', 'concreteGrade': 'C40',
+				   'hoop': 'Spiral', 's': 0.1, 'ds': 0.014, 'fyh': 400,
+				   'roux': 0.005, 'rouy': 0.005, 'st': 0.15, 'dst': 0.012,
+				   'maxMu': 30, 'numIncr': 100, 'backend': 'opensees', 'stepControl': 'fixed'}
+sectionTypes = ('circle', 'rectangle', 'polygon')
+# columns of the output table, the curve results are those of MC.curveResult
+curveColumns = ['yieldCurvature', 'yieldMoment', 'effectiveCurvature', 'effectiveMoment', 'ultimateCurvature',
+				'ultimateMoment', 'maxCurvature', 'maxMoment']
+resultColumns = ['name', 'axialLoad', 'direction', 'status']+curveColumns+['resultDir', 'error']
+
+
+def _parseValue(text):
+	"""
+	Value of a CSV cell: empty cells are None, numbers and JSON lists are decoded, anything else is a string
+	"""
+	if text is None or text.strip() == '':
+		return None
+	try:
+		return json.loads(text)
+	except ValueError:
+		return text.strip()
+
+
+def readTable(fileName):
+	"""
+	Read a section table
+	:param fileName: .csv file with a header row, or .json file with a list of sections (or {'sections': [...]})
+	:return: list of section dicts completed with sectionDefaults
+	"""
+	if fileName.lower().endswith('.json'):
+		with open(fileName) as f:
+			rows = json.load(f)
+		if isinstance(rows, dict):
+			rows = rows['sections']
+	else:
+		with open(fileName, newline='') as f:
+			rows = [{key.strip(): _parseValue(value) for key, value in row.items() if key is not None}
+					for row in csv.DictReader(f)]
+	table = []
+	for i, row in enumerate(rows):
+		unknown = set(row)-set(sectionDefaults)
+		if unknown:
+			raise ValueError("Unknown columns in "+fileName+": "+", ".join(sorted(unknown)))
+		spec = dict(sectionDefaults)
+		spec.update({key: value for key, value in row.items() if value is not None})
+		if spec['name'] is None:
+			raise ValueError("Row "+str(i+1)+" of "+fileName+" has no name")
+		spec['name'] = str(spec['name'])
+		if spec['type'] not in sectionTypes:
+			raise ValueError("Section "+spec['name']+": type should be one of "+", ".join(sectionTypes))
+		loads = spec['axialLoads']
+		if isinstance(loads, str):
+			loads = [float(each) for each in loads.replace(',', ';').split(';') if each.strip()]
+		spec['axialLoads'] = [float(each) for each in np.atleast_1d(loads)]
+		table.append(spec)
+	names = [spec['name'] for spec in table]
+	if len(set(names)) != len(names):
+		raise ValueError("Section names in "+fileName+" are not unique")
+	return table
+
+
+def _required(spec, *keys):
+	missing = [key for key in keys if spec[key] is None]
+	if missing:
+		raise ValueError("Section "+spec['name']+" ("+spec['type']+") needs "+", ".join(missing))
+
+
+def buildSection(spec, workDir, plot=False):
+	"""
+	Mesh the section, generate its materials and estimate its yield curvature in workDir/name
+	:param spec: section dict of readTable
+	:param workDir: folder of the batch
+	:param plot: save the section figure (headless rendering in the calling process)
+	:return: folder of the section (workDir/name/name)
+	"""
+	import figureRender
+	from sectionFiberMain import circleSection, polygonSection
+	from Material import Material
+	from sectionBundle import saveSection
+	figureRender.setRenderMode('headless' if plot else 'off', workers=0)
+	name = spec['name']
+	sectionDir = os.path.join(os.path.abspath(workDir), name)
+	if not os.path.exists(sectionDir):
+		os.makedirs(sectionDir, exist_ok=True)
+	currentDir = os.getcwd()
+	os.chdir(sectionDir)
+	try:
+		_required(spec, 'outBarD', 'outBarDist')
+		if spec['type'] == 'circle':
+			_required(spec, 'outD')
+			coreFiber, coverFiber, barFiber = circleSection(name, spec['outD'], spec['coverThick'], spec['outBarD'],
+				spec['outBarDist'], spec['coreSize'], spec['coverSize'], plot, spec['inD'], spec['inBarD'],
+				spec['inBarDist'], mesher=spec['mesher'])
+		else:
+			if spec['type'] == 'rectangle':
+				_required(spec, 'lx', 'ly')
+				halfY, halfZ = 0.5*spec['lx'], 0.5*spec['ly']
+				outline = [[halfY, halfZ], [-halfY, halfZ], [-halfY, -halfZ], [halfY, -halfZ]]
+			else:
+				_required(spec, 'outSideNode')
+				outline = spec['outSideNode']
+			outSideNode = {i+1: tuple(each) for i, each in enumerate(outline)}
+			outSideEle = {i+1: (i+1, (i+1) % len(outline)+1) for i in range(len(outline))}
+			inSideNode, inSideEle = None, None
+			if spec['inSideNode']:
+				inSideNode = [{i+1: tuple(each) for i, each in enumerate(hole)} for hole in spec['inSideNode']]
+				inSideEle = [{i+1: (i+1, (i+1) % len(hole)+1) for i in range(len(hole))} for hole in spec['inSideNode']]
+			coreFiber, coverFiber, barFiber = polygonSection(name, outSideNode, outSideEle, spec['coverThick'],
+				spec['coreSize'], spec['coverSize'], spec['outBarD'], spec['outBarDist'], plot, True, None, None,
+				inSideNode, inSideEle, spec['inBarD'], spec['inBarDist'], mesher=spec['mesher'])
+
+		material = Material(name)
+		barParameter = material.barParameter(spec['barGrade'])
+		material.coverParameter(spec['concreteGrade'])
+		ey = barParameter[0]/barParameter[2]
+		if spec['type'] == 'circle':
+			roucc = np.sum(barFiber[:, 2])/(np.sum(coverFiber[:, 2])+np.sum(coreFiber[:, 2]))
+			material.coreParameterCircular(spec['concreteGrade'], spec['hoop'], spec['outD'], spec['coverThick'], roucc,
+										   spec['s'], spec['ds'], spec['fyh'])
+			kx = ky = 2.213*ey/spec['outD']
+		else:
+			roucc = np.sum(barFiber[:, 2])/np.sum(coreFiber[:, 2])
+			outline = np.array(list(outSideNode.values()), dtype=float)
+			lengthY, lengthZ = np.ptp(outline[:, 0]), np.ptp(outline[:, 1])
+			material.coreParameterRectangular(spec['concreteGrade'], lengthY, lengthZ, spec['coverThick'], roucc,
+											  spec['outBarDist'], spec['outBarD'], spec['roux'], spec['rouy'],
+											  spec['st'], spec['dst'], spec['fyh'])
+			kx, ky = 1.957*ey/lengthY, 1.957*ey/lengthZ
+		saveSection(name, yieldCurvature=[kx, ky])
+		return os.path.join(sectionDir, name)
+	finally:
+		os.chdir(currentDir)
+
+
+def _sectionJob(task):
+	"""
+	Build one section in a worker process
+	:param task: (spec, workDir, plot)
+	:return: (name, section folder or None, error message or None)
+	"""
+	spec, workDir, plot = task
+	try:
+		return spec['name'], buildSection(spec, workDir, plot), None
+	except Exception as error:
+		return spec['name'], None, type(error).__name__+': '+str(error)
+
+
+def _loadLabel(axialLoad):
+	"""
+	Axial load in folder names and journal keys, the shortest text that gives the same float back, so that close
+	loads do not share a folder or a journal record ('%g' keeps only 6 significant digits)
+	"""
+	return repr(float(axialLoad))
+
+
+def unitDir(workDir, name, direction, axialLoad):
+	"""
+	Working directory of one (section, axial load, direction) analysis
+	"""
+	return os.path.join(os.path.abspath(workDir), name, str(direction)+'-'+_loadLabel(axialLoad))
+
+
+def _analysisJob(task):
+	"""
+	Moment curvature analysis of one section at one axial load in its own working directory (runs in a worker
+	process). The moment curvature history and the curve results are saved in that directory.
+	:param task: (spec, sectPath, axialLoad, workDir, plot)
+	:return: one row of the result table (dict of resultColumns)
+	"""
+	spec, sectPath, axialLoad, workDir, plot = task
+	import figureRender
+	from MCAnalysis import MC
+	figureRender.setRenderMode('headless' if plot else 'off', workers=0)
+	resultDir = unitDir(workDir, spec['name'], spec['direction'], axialLoad)
+	row = {'name': spec['name'], 'axialLoad': axialLoad, 'direction': spec['direction'], 'resultDir': resultDir}
+	if not os.path.exists(resultDir):
+		os.makedirs(resultDir, exist_ok=True)
+	currentDir = os.getcwd()
+	os.chdir(resultDir)
+	try:
+		mcInstance = MC(spec['name'], spec['direction'], sectPath)
+		mcInstance.MCAnalysis(axialLoad, spec['moment'], spec['maxMu'], spec['numIncr'], recordMode='memory',
+							  backend=spec['backend'], stepControl=spec['stepControl'])
+		mcInstance.MCCurve(plot=plot)
+		np.savetxt('MomentCurvature.txt', mcInstance.momentCurvature)
+		row.update({key: float(mcInstance.curveResult[key]) for key in curveColumns})
+		row['status'] = 'finished'
+		with open('result.json', 'w') as f:
+			json.dump(row, f, indent=1)
+	except Exception as error:
+		row.update({'status': 'failed', 'error': type(error).__name__+': '+str(error)})
+	finally:
+		os.chdir(currentDir)
+	return row
+
+
+def unitKey(name, direction=None, axialLoad=None):
+	"""
+	Journal key of a section build (name only) or of one (section, axial load, direction) analysis
+	"""
+	if axialLoad is None:
+		return name+'|section'
+	return name+'|'+str(direction)+'|'+_loadLabel(axialLoad)
+
+
+def runBatch(table, workDir='batchRuns', nWorkers=None, plot=False, journal=None):
+	"""
+	Build all sections and run all their analyses in a process pool. The analyses of a section start as soon
+	as the section is built.
+	With a journal (see jobJournal.JobJournal) every section build and analysis is recorded when it starts and
+	ends. Units that finished with the same inputs are taken from the journal, and failed or interrupted ones run
+	again until journal.maxAttempts. A worker killed by the system (abort, out of memory) breaks the pool and
+	every unit in flight with it. Those units are recorded as interrupted, which does not use up an attempt, and
+	run again one at a time in a new pool, so that only a unit that breaks the pool on its own is charged.
+	On Windows call it under if __name__ == "__main__":
+	:param table: sections of readTable
+	:param workDir: folder of the sections and of the analysis working directories
+	:param nWorkers: number of worker processes (default: number of CPUs)
+	:param plot: save the section and moment-curvature figures
+	:param journal: JobJournal of the batch, None runs every unit
+	:return: result rows (dicts of resultColumns) in table order
+	"""
+	rows = {}
+	jobs = {}  # future: (unit, pool, runs alone)
+	requeued = []  # units interrupted by a broken pool, run one at a time
+	waiting = []  # units held back while the requeued units run
+	pools = [ProcessPoolExecutor(max_workers=nWorkers)]
+
+	def fail(spec, axialLoads, error):
+		for axialLoad in axialLoads:
+			rows[(spec['name'], axialLoad)] = {'name': spec['name'], 'axialLoad': axialLoad,
+											   'direction': spec['direction'], 'status': 'failed', 'error': error}
+			print(spec['name'], axialLoad, 'failed', error)
+
+	def submit(unit, alone=False):
+		# unit: (function, task, key, inputs, spec, axialLoad), axialLoad None for a section build
+		function, task, key, inputs, spec, axialLoad = unit
+		if journal is not None and not journal.canRun(key, inputs):
+			last = journal.last(key)
+			fail(spec, spec['axialLoads'] if axialLoad is None else [axialLoad],
+				 'given up after '+str(journal.attempts[key])+' attempts: '+str(last.get('error')))
+			return
+		if not alone and (requeued or any(each[2] for each in jobs.values())):
+			waiting.append(unit)
+			return
+		try:
+			future = pools[-1].submit(function, task)
+		except BrokenProcessPool:
+			# the pool broke before its failed futures were collected
+			pools.append(ProcessPoolExecutor(max_workers=nWorkers))
+			future = pools[-1].submit(function, task)
+		except RuntimeError as error:
+			fail(spec, spec['axialLoads'] if axialLoad is None else [axialLoad], 'not run: '+str(error))
+			return
+		if journal is not None:
+			journal.record(key, 'started', inputs)
+		jobs[future] = (unit, pools[-1], alone)
+
+	def startAnalyses(spec, sectPath):
+		for axialLoad in spec['axialLoads']:
+			key = unitKey(spec['name'], spec['direction'], axialLoad)
+			# the other axial loads of the section are not inputs of the analysis
+			inputs = inputsHash([dict(spec, axialLoads=None), sectPath, axialLoad])
+			if journal is not None and journal.isFinished(key, inputs):
+				rows[(spec['name'], axialLoad)] = journal.last(key)['result']
+				continue
+			submit((_analysisJob, (spec, sectPath, axialLoad, workDir, plot), key, inputs, spec, axialLoad))
+
+	try:
+		for spec in table:
+			key = unitKey(spec['name'])
+			inputs = inputsHash(dict(spec, axialLoads=None))
+			if journal is not None and journal.isFinished(key, inputs) and os.path.exists(journal.last(key)['sectPath']):
+				startAnalyses(spec, journal.last(key)['sectPath'])
+			else:
+				submit((_sectionJob, (spec, workDir, plot), key, inputs, spec, None))
+		while jobs or requeued or waiting:
+			if not jobs:
+				if requeued:
+					submit(requeued.pop(0), alone=True)
+				else:
+					held, waiting[:] = list(waiting), []
+					for unit in held:
+						submit(unit)
+				continue
+			done = wait(list(jobs), return_when=FIRST_COMPLETED)[0]
+			for future in done:
+				unit, pool, alone = jobs.pop(future)
+				function, task, key, inputs, spec, axialLoad = unit
+				try:
+					result = future.result()
+				except BrokenProcessPool as error:
+					if pool is pools[-1]:
+						pools.append(ProcessPoolExecutor(max_workers=nWorkers))
+					if not alone:
+						# a worker died, not necessarily the one of this unit
+						if journal is not None:
+							journal.record(key, 'interrupted', inputs)
+						requeued.append(unit)
+						continue
+					message = 'worker stopped: '+type(error).__name__+': '+str(error)
+					if journal is not None:
+						journal.record(key, 'failed', inputs, error=message)
+					fail(spec, spec['axialLoads'] if axialLoad is None else [axialLoad], message)
+					continue
+				except Exception as error:
+					# the unit raised outside of the job function, e.g. its task could not be sent to the worker
+					message = 'not run: '+type(error).__name__+': '+str(error)
+					if journal is not None:
+						journal.record(key, 'failed', inputs, error=message)
+					fail(spec, spec['axialLoads'] if axialLoad is None else [axialLoad], message)
+					continue
+				if isinstance(result, dict):
+					rows[(result['name'], result['axialLoad'])] = result
+					if journal is not None:
+						journal.record(key, result['status'], inputs, resultDir=result['resultDir'], result=result,
+									   error=result.get('error'))
+					print(result['name'], result['axialLoad'], result['status'], result.get('error') or '')
+					continue
+				name, sectPath, error = result
+				if journal is not None:
+					journal.record(key, 'finished' if sectPath is not None else 'failed', inputs, sectPath=sectPath,
+								   error=error)
+				if sectPath is None:
+					fail(spec, spec['axialLoads'], 'section failed: '+error)
+					continue
+				startAnalyses(spec, sectPath)
+	finally:
+		for pool in pools:
+			pool.shutdown()
+	return [rows[(spec['name'], axialLoad)] for spec in table for axialLoad in spec['axialLoads']]
+
+
+def writeTable(rows, fileName):
+	"""
+	Write the result rows as .csv or .json
+	"""
+	if fileName.lower().endswith('.json'):
+		with open(fileName, 'w') as f:
+			json.dump(rows, f, indent=1)
+		return
+	with open(fileName, 'w', newline='') as f:
+		writer = csv.DictWriter(f, fieldnames=resultColumns, restval='')
+		writer.writeheader()
+		for row in rows:
+			writer.writerow({key: row.get(key, '') for key in resultColumns})
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Moment curvature analyses of a table of sections')
+	parser.add_argument('table', help='CSV or JSON section table, columns as in batchRunner.sectionDefaults')
+	parser.add_argument('--output', default='batchResults.csv', help='result table (.csv or .json)')
+	parser.add_argument('--workDir', default='batchRuns', help='folder of the sections and analyses')
+	parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: CPUs)')
+	parser.add_argument('--plot', action='store_true', help='save the section and moment-curvature figures')
+	parser.add_argument('--journal', default=None, help='job journal (default: workDir/journal.jsonl)')
+	parser.add_argument('--maxAttempts', type=int, default=3, help='attempts of a failed unit over all restarts')
+	parser.add_argument('--fresh', action='store_true', help='ignore the journal and run every unit again')
+	args = parser.parse_args(argv)
+	journalFile = args.journal if args.journal is not None else os.path.join(args.workDir, 'journal.jsonl')
+	if args.fresh and os.path.exists(journalFile):
+		os.remove(journalFile)
+	journal = JobJournal(journalFile, args.maxAttempts)
+	rows = runBatch(readTable(args.table), args.workDir, args.workers, args.plot, journal)
+	writeTable(rows, args.output)
+	failed = sum(row['status'] != 'finished' for row in rows)
+	print(len(rows)-failed, 'analyses finished,', failed, 'failed, results in', args.output)
+	return 1 if failed else 0
+
+
+if __name__ == '__main__':
+	raise SystemExit(main())
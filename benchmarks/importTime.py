@@ -0,0 +1,77 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : importTime.py
+# @Software : PyCharm
+
+"""
+Import cost of the entry points, each measured in fresh interpreters:
+	python benchmarks/importTime.py [--repeat 5] [--json importTime.json] [module ...]
+"""
+
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+repoDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+entryPoints = ['Material', 'Mander', 'sectionBundle', 'meshCache', 'figureRender', 'fiberGenerate', 'sectionFiberMain',
+			   'FiberSection', 'MCAnalysis', 'interactionDiagram', 'capacitySurface']
+# dependencies that should only be loaded by the code paths that need them
+heavyModules = ['openseespy', 'matplotlib', 'scipy', 'pygmsh', 'meshio']
+
+_probe = '''
+import sys, time, json
+sys.path.insert(0, {repoDir!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter()-start
+print(json.dumps({{'time': elapsed, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+
+def importTime(module, repeat=5):
+	"""
+	Import time of one module in fresh interpreters
+	:param module: module name of the repository
+	:param repeat: number of interpreters
+	:return: {'module', 'min', 'median' (seconds), 'loaded': heavy dependencies loaded by the import} or
+		{'module', 'error'} if the import fails
+	"""
+	times = []
+	for i in range(repeat):
+		result = subprocess.run([sys.executable, '-c', _probe.format(repoDir=repoDir, module=module, heavy=heavyModules)],
+								capture_output=True, text=True, cwd=repoDir)
+		if result.returncode != 0:
+			return {'module': module, 'error': result.stderr.strip().splitlines()[-1]}
+		probe = json.loads(result.stdout.strip().splitlines()[-1])
+		times.append(probe['time'])
+	return {'module': module, 'min': float(np.min(times)), 'median': float(np.median(times)), 'loaded': probe['loaded']}
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Import cost of the MCAnalysis entry points')
+	parser.add_argument('modules', nargs='*', default=entryPoints, help='modules to import (default: all entry points)')
+	parser.add_argument('--repeat', type=int, default=5, help='number of fresh interpreters per module')
+	parser.add_argument('--json', help='write the results to this file')
+	args = parser.parse_args(argv)
+	results = []
+	print('%-20s %10s %10s  %s' % ('module', 'min (ms)', 'median (ms)', 'heavy dependencies loaded'))
+	for module in args.modules:
+		each = importTime(module, args.repeat)
+		results.append(each)
+		if 'error' in each:
+			print('%-20s %s' % (module, each['error']))
+		else:
+			print('%-20s %10.1f %10.1f  %s' % (module, 1e3*each['min'], 1e3*each['median'], ', '.join(each['loaded']) or '-'))
+	if args.json:
+		with open(args.json, 'w') as f:
+			json.dump({'python': sys.version.split()[0], 'results': results}, f, indent=1)
+	return results
+
+
+if __name__ == '__main__':
+	main()
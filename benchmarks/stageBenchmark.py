@@ -0,0 +1,187 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : stageBenchmark.py
+# @Software : PyCharm
+
+"""
+Stage benchmarks of the CircularPier and RectangularPier examples at several mesh densities:
+	python benchmarks/stageBenchmark.py [--repeat 3] [--densities coarse medium] [--backend numpy]
+		[--output results.json] [--baseline baseline.json] [--threshold 0.2]
+Every stage (section meshing, material parameters, MC.MCAnalysis, MC.MCCurve) is timed separately and the results
+are written as JSON. With --baseline the medians are compared with a stored result file, slower stages are flagged
+and the exit status is 1.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import numpy as np
+
+repoDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if repoDir not in sys.path:
+	sys.path.insert(0, repoDir)
+
+import figureRender
+from sectionFiberMain import circleSection, polygonSection
+from Material import Material
+from MCAnalysis import MC
+from sectionBundle import saveSection
+
+# core and cover fiber size (m) of each mesh density
+densities = {'coarse': 0.2, 'medium': 0.1, 'fine': 0.05}
+piers = ('CircularPier', 'RectangularPier')
+stages = ('mesh', 'material', 'MCAnalysis', 'MCCurve')
+
+
+def measure(function, repeat):
+	"""
+	Wall time of a function over several runs
+	:return: value of the last run, {'min', 'median' (seconds), 'repeat'}
+	"""
+	times = []
+	for i in range(repeat):
+		start = time.perf_counter()
+		value = function()
+		times.append(time.perf_counter()-start)
+	return value, {'min': float(np.min(times)), 'median': float(np.median(times)), 'repeat': repeat}
+
+
+def circularPier(size, mesher):
+	"""
+	Section of CircularPierExample.py with fibers of the given size
+	"""
+	return circleSection('CircularPier', 2, 0.06, 0.032, 0.119, size, size, False, cache=False,
+						 mesher='polar' if mesher == 'fast' else mesher)
+
+
+def circularMaterial(fibers):
+	coreFiber, coverFiber, barFiber = fibers
+	roucc = np.sum(barFiber, axis=0)[2]/(np.sum(coverFiber, axis=0)[2]+np.sum(coreFiber, axis=0)[2])
+	material = Material('CircularPier')
+	barParameter = material.barParameter("HRB400")
+	material.coverParameter("C40")
+	material.coreParameterCircular("C40", "Spiral", 2, 0.06, roucc, 0.1, 0.014, 400)
+	kx = 2.213*barParameter[0]/barParameter[2]/2
+	saveSection('CircularPier', yieldCurvature=[kx, kx])
+
+
+def rectangularPier(size, mesher):
+	"""
+	Section of RectangularPierExample.py with fibers of the given size
+	"""
+	outSideNode = {1: (0.8, 1.6), 2: (-0.8, 1.6), 3: (-0.8, -1.6), 4: (0.8, -1.6)}
+	outSideEle = {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 1)}
+	return polygonSection('RectangularPier', outSideNode, outSideEle, 0.06, size, 1.5*size, 0.028, 0.1846153846, False,
+						  True, cache=False, mesher='grid' if mesher == 'fast' else mesher)
+
+
+def rectangularMaterial(fibers):
+	coreFiber, coverFiber, barFiber = fibers
+	roucc = np.sum(barFiber, axis=0)[2]/np.sum(coreFiber, axis=0)[2]
+	material = Material('RectangularPier')
+	barParameter = material.barParameter("HRB400")
+	material.coverParameter("C40")
+	material.coreParameterRectangular("C40", 1.6, 3.2, 0.06, roucc, 0.1846153846, 0.028, 0.005, 0.005, 0.15, 0.012, 400)
+	kx = 1.957*barParameter[0]/barParameter[2]/1.6
+	saveSection('RectangularPier', yieldCurvature=[kx, kx])
+
+
+# section, material and analysis (direction, axial load) of each pier
+pierCases = {'CircularPier': (circularPier, circularMaterial, ('Y', 200)),
+			 'RectangularPier': (rectangularPier, rectangularMaterial, ('X', 23000))}
+
+
+def runBenchmarks(pierNames=piers, densityNames=tuple(densities), repeat=3, mesher='gmsh', backend='opensees',
+				  recordMode='memory'):
+	"""
+	Time every stage of every pier and mesh density in a scratch folder
+	:return: {'pier/density/stage': {'min', 'median', 'repeat', 'fibers'}}
+	"""
+	results = {}
+	currentDir = os.getcwd()
+	workDir = tempfile.mkdtemp(prefix='stageBenchmark-')
+	renderMode = figureRender.renderMode
+	figureRender.setRenderMode('off')
+	os.chdir(workDir)
+	try:
+		for pier in pierNames:
+			section, material, (direction, axialLoad) = pierCases[pier]
+			for density in densityNames:
+				name = pier+'/'+density+'/'
+				fibers, results[name+'mesh'] = measure(lambda: section(densities[density], mesher), repeat)
+				nFibers = sum(len(each) for each in fibers)
+				_, results[name+'material'] = measure(lambda: material(fibers), repeat)
+				mcInstance = MC(pier, direction)
+				_, results[name+'MCAnalysis'] = measure(
+					lambda: mcInstance.MCAnalysis(axialLoad, 0, recordMode=recordMode, backend=backend), repeat)
+				_, results[name+'MCCurve'] = measure(lambda: mcInstance.MCCurve(plot=False), repeat)
+				for stage in stages:
+					results[name+stage]['fibers'] = nFibers
+	finally:
+		os.chdir(currentDir)
+		figureRender.setRenderMode(renderMode)
+		shutil.rmtree(workDir, ignore_errors=True)
+	return results
+
+
+def compareBaseline(results, baseline, threshold=0.2):
+	"""
+	Stages whose median time grew by more than threshold compared with a baseline
+	:param results: results of runBenchmarks
+	:param baseline: results of an earlier run
+	:param threshold: allowed relative increase of the median time
+	:return: [(stage, baseline median, median, ratio)]
+	"""
+	regressions = []
+	for name, each in results.items():
+		if name in baseline and baseline[name]['median'] > 0:
+			ratio = each['median']/baseline[name]['median']
+			if ratio > 1.0+threshold:
+				regressions.append((name, baseline[name]['median'], each['median'], ratio))
+	return regressions
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Stage benchmarks of the CircularPier and RectangularPier examples')
+	parser.add_argument('--piers', nargs='+', default=list(piers), choices=piers)
+	parser.add_argument('--densities', nargs='+', default=list(densities), choices=list(densities))
+	parser.add_argument('--repeat', type=int, default=3, help='runs of every stage')
+	parser.add_argument('--mesher', default='gmsh', choices=('gmsh', 'fast'),
+						help="core mesher, 'fast' uses the polar (circle) and grid (polygon) meshers")
+	parser.add_argument('--backend', default='opensees', choices=('opensees', 'numpy'))
+	parser.add_argument('--recordMode', default='memory', choices=('memory', 'file'))
+	parser.add_argument('--output', default='stageBenchmark.json', help='result file')
+	parser.add_argument('--baseline', help='result file of an earlier run to compare with')
+	parser.add_argument('--threshold', type=float, default=0.2, help='allowed relative increase of the median time')
+	args = parser.parse_args(argv)
+
+	results = runBenchmarks(args.piers, args.densities, args.repeat, args.mesher, args.backend, args.recordMode)
+	print('%-36s %8s %10s %10s' % ('stage', 'fibers', 'min (s)', 'median (s)'))
+	for name, each in results.items():
+		print('%-36s %8d %10.4f %10.4f' % (name, each['fibers'], each['min'], each['median']))
+	report = {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+			  'options': vars(args), 'results': results}
+	with open(args.output, 'w') as f:
+		json.dump(report, f, indent=1)
+
+	if args.baseline:
+		with open(args.baseline) as f:
+			baseline = json.load(f)['results']
+		regressions = compareBaseline(results, baseline, args.threshold)
+		for name, before, after, ratio in regressions:
+			print('REGRESSION %s: %.4f s -> %.4f s (x%.2f)' % (name, before, after, ratio))
+		if regressions:
+			return 1
+		print('No stage is more than %d%% slower than the baseline' % round(100*args.threshold))
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
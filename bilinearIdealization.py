@@ -0,0 +1,83 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : bilinearIdealization.py
+# @Software : PyCharm
+
+import numpy as np
+
+
+def bilinearIdealize(curvature, moment, yieldIndex, ultimateIndex=None, tol=0.001, maxIter=200):
+	"""
+	Equivalent bilinear idealization of one or many moment-curvature curves.
+	The elastic branch passes through the first yield point and the equivalent yield moment Me makes the area
+	under the bilinear curve equal to the trapezoidal area under the curve over the steps before the ultimate
+	point: Me*ku - Me**2/(2*k) = area.
+	By default Me is found by the bisection of the former MC.MCCurve, run for all curves at once with the same
+	arithmetic, so the results are identical to it; tol=None solves the equation exactly for the smaller root.
+	:param curvature: curvature of each curve, (nSteps,) or (nCurves, nSteps), steps after the ultimate point are ignored
+	:param moment: moment of each curve, same shape as curvature
+	:param yieldIndex: step index of the first yield point of each curve
+	:param ultimateIndex: step index of the ultimate point of each curve (default: last step)
+	:param tol: bisection tolerance relative to the area, None for the closed-form root
+	:param maxIter: maximum number of bisection steps (the bisection stops earlier for any tol above the rounding
+		error of the area)
+	:return: dict of arrays (scalars for a single curve) -- yieldMoment, yieldCurvature, effectiveMoment,
+		effectiveCurvature, ultimateMoment, ultimateCurvature, maxMoment, maxCurvature
+	"""
+	curvature = np.asarray(curvature, dtype=np.float64)
+	moment = np.asarray(moment, dtype=np.float64)
+	single = curvature.ndim == 1
+	curvature, moment = np.atleast_2d(curvature), np.atleast_2d(moment)
+	nCurves, nSteps = curvature.shape
+	rows = np.arange(nCurves)
+	yieldIndex = np.broadcast_to(np.asarray(yieldIndex, dtype=int), (nCurves,))
+	if ultimateIndex is None:
+		ultimateIndex = nSteps-1
+	ultimateIndex = np.broadcast_to(np.asarray(ultimateIndex, dtype=int), (nCurves,))
+	steps = np.arange(nSteps)
+
+	yieldCurvature = curvature[rows, yieldIndex]
+	yieldMoment = moment[rows, yieldIndex]
+	ultimateCurvature = curvature[rows, ultimateIndex]
+	ultimateMoment = moment[rows, ultimateIndex]
+
+	# peak moment up to and including the ultimate point (first occurrence)
+	peakRange = np.where(steps[None, :] <= ultimateIndex[:, None], moment, -np.inf)
+	maxIndex = np.argmax(peakRange, axis=1)
+	maxMoment = moment[rows, maxIndex]
+	maxCurvature = curvature[rows, maxIndex]
+
+	# trapezoidal area of the steps before the ultimate point, np.trapz(moment[:ultimateIndex],
+	# curvature[:ultimateIndex]) of the former MCCurve; the segments are vectorized and every curve sums its own
+	# segments so that the rounding is the same
+	segmentArea = np.diff(curvature, axis=1)*(moment[:, 1:]+moment[:, :-1])/2.0
+	area = np.array([segmentArea[i, :max(ultimateIndex[i]-1, 0)].sum() for i in range(nCurves)])
+
+	stiffness = yieldMoment/yieldCurvature
+	if tol is None:
+		discriminant = np.clip(ultimateCurvature**2-2.0*area/stiffness, 0.0, None)
+		effectiveMoment = np.clip(stiffness*(ultimateCurvature-np.sqrt(discriminant)), 0.0, maxMoment)
+	else:
+		epsilon = tol*area
+		low = np.zeros(nCurves)
+		high = maxMoment.copy()
+		effectiveMoment = (low+high)/2.0
+		for i in range(maxIter):
+			active = abs(effectiveMoment*ultimateCurvature-effectiveMoment*0.5*effectiveMoment/stiffness-area) >= epsilon
+			if not active.any():
+				break
+			below = effectiveMoment*ultimateCurvature-effectiveMoment/stiffness*effectiveMoment*0.5 < area
+			low = np.where(active & below, effectiveMoment, low)
+			high = np.where(active & ~below, effectiveMoment, high)
+			effectiveMoment = np.where(active, (high+low)/2.0, effectiveMoment)
+	effectiveCurvature = effectiveMoment/stiffness
+
+	result = {'yieldMoment': yieldMoment, 'yieldCurvature': yieldCurvature,
+			  'effectiveMoment': effectiveMoment, 'effectiveCurvature': effectiveCurvature,
+			  'ultimateMoment': ultimateMoment, 'ultimateCurvature': ultimateCurvature,
+			  'maxMoment': maxMoment, 'maxCurvature': maxCurvature}
+	if single:
+		result = {key: value[0] for key, value in result.items()}
+	return result
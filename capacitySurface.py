@@ -0,0 +1,165 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : capacitySurface.py
+# @Software : PyCharm
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from interactionDiagram import PMColumns, _interactionPoint
+from sectionBundle import loadSection
+from jobJournal import inputsHash
+
+
+def _isMirrored(fibers, axis, tol):
+	"""
+	Check whether a fiber group is symmetric about a local axis
+	:param fibers: fibers [(y1,z1,area1),...]
+	:param axis: 0 mirrors y to -y, 1 mirrors z to -z
+	:param tol: tolerance of the coordinates and areas
+	"""
+	fibers = np.atleast_2d(fibers)
+	mirrored = fibers.copy()
+	mirrored[:, axis] = -mirrored[:, axis]
+	original = np.round(fibers/tol).astype(np.int64)
+	mirrored = np.round(mirrored/tol).astype(np.int64)
+	original = original[np.lexsort(original.T[::-1])]
+	mirrored = mirrored[np.lexsort(mirrored.T[::-1])]
+	return np.array_equal(original, mirrored)
+
+
+def sectionSymmetry(sectPath, tol=1e-6):
+	"""
+	Symmetry of the section fibers
+	:param sectPath: folder of the section files
+	:param tol: tolerance of the coordinates and areas
+	:return: (mirrorY, mirrorZ), mirrorY if the section is symmetric when y becomes -y, mirrorZ when z becomes -z
+	"""
+	section = loadSection(sectPath)
+	fibers = [section[name] for name in ("coverFiber", "coreFiber", "barFiber")]
+	mirrorY = all(_isMirrored(each, 0, tol) for each in fibers)
+	mirrorZ = all(_isMirrored(each, 1, tol) for each in fibers)
+	return mirrorY, mirrorZ
+
+
+def canonicalAngle(angle, mirrorY, mirrorZ):
+	"""
+	Representative bending direction of the directions that give the same moment capacity
+	:param angle: bending direction (degree) measured from 'X' towards 'Y'
+	:param mirrorY: section symmetric when y becomes -y (angle equivalent to 180-angle)
+	:param mirrorZ: section symmetric when z becomes -z (angle equivalent to -angle)
+	:return: smallest equivalent angle in [0, 360)
+	"""
+	candidates = [angle]
+	if mirrorY:
+		candidates.append(180.0-angle)
+	if mirrorZ:
+		candidates.append(-angle)
+	if mirrorY and mirrorZ:
+		candidates.append(180.0+angle)
+	return min(round(each % 360.0, 9) % 360.0 for each in candidates)
+
+
+def _key(axialLoad, angle, inputs):
+	"""
+	Dictionary key of one (axial load, bending direction) analysis with the given inputs hash
+	"""
+	return float(axialLoad), round(float(angle), 6), inputs
+
+
+def surfaceInputs(sectPath, capacity, maxMu, numIncr, backend):
+	"""
+	Hash of everything a stored point of the surface depends on: the analysis settings and all arrays of the
+	section bundle (fibers, material parameters, yield curvature)
+	"""
+	section = {key: value.tolist() for key, value in loadSection(sectPath).items()}
+	return inputsHash({'capacity': capacity, 'maxMu': maxMu, 'numIncr': numIncr, 'backend': backend,
+					   'section': section})
+
+
+def _readResults(resultFile):
+	"""
+	Inputs hash in the header and rows of a result file
+	"""
+	inputs = None
+	with open(resultFile) as f:
+		for line in f:
+			if not line.startswith('#'):
+				break
+			if line.startswith('# inputs '):
+				inputs = line.split()[2]
+	return inputs, np.loadtxt(resultFile, ndmin=2)
+
+
+def capacitySurface(sectName, axialLoads, nAngles=24, capacity='effectiveMoment', maxMu=30, numIncr=100,
+					backend='opensees', nWorkers=None, resume=True, symmetryTol=1e-6):
+	"""
+	Biaxial P-Mx-My capacity surface from moment curvature analyses over axial loads and bending directions.
+	The analyses run in parallel worker processes (see interactionDiagram), directions equivalent by the symmetry
+	of the section are analysed once, and every finished analysis is appended to sectName/capacitySurface.txt
+	so that an interrupted run resumes with the missing points only. The header of the file holds the hash of
+	the analysis settings and of the section bundle (see surfaceInputs), the stored points are only reused when
+	it matches, otherwise every point is analysed again.
+	On Windows call it under if __name__ == "__main__":
+	:param sectName: section name (folder generated by circleSection/polygonSection and Material)
+	:param axialLoads: axial loads (compression positive)
+	:param nAngles: number of bending directions evenly spaced over 360 degrees
+	:param capacity: moment capacity used for the surface, one of PMColumns (e.g. 'effectiveMoment', 'ultimateMoment')
+	:param maxMu: target ductility for analysis
+	:param numIncr: number of analysis increments
+	:param backend: 'opensees' or 'numpy', see MC.MCAnalysis
+	:param nWorkers: number of worker processes (default: number of CPUs)
+	:param resume: reuse the analyses already stored in sectName/capacitySurface.txt with the same inputs
+	:param symmetryTol: tolerance of the fiber coordinates for the symmetry check
+	:return: surface mesh (nLoads x nAngles x 3), the last axis is (axialLoad, Mx, My)
+	"""
+	sectPath = os.path.abspath(sectName)
+	resultFile = os.path.join(sectPath, 'capacitySurface.txt')
+	axialLoads = np.asarray(axialLoads, dtype=np.float64)
+	angles = np.arange(nAngles)*360.0/nAngles
+	mirrorY, mirrorZ = sectionSymmetry(sectPath, symmetryTol)
+	canonical = [canonicalAngle(angle, mirrorY, mirrorZ) for angle in angles]
+
+	inputs = surfaceInputs(sectPath, capacity, maxMu, numIncr, backend)
+
+	# finished analyses {(axialLoad, angle, inputs): row}
+	finished = {}
+	if resume and os.path.exists(resultFile):
+		fileInputs, rows = _readResults(resultFile)
+		if fileInputs == inputs:
+			for row in rows:
+				finished[_key(row[0], row[1], inputs)] = row
+		else:
+			print('The inputs of', resultFile, 'changed, all points are analysed again')
+	if not finished and os.path.exists(resultFile):
+		os.remove(resultFile)
+
+	tasks = [(sectName, sectPath, angle, axialLoad, 0, maxMu, numIncr, backend)
+			 for axialLoad in axialLoads for angle in sorted(set(canonical))
+			 if _key(axialLoad, angle, inputs) not in finished]
+	if tasks:
+		header = not os.path.exists(resultFile)
+		with ProcessPoolExecutor(max_workers=nWorkers) as pool, open(resultFile, 'a') as f:
+			if header:
+				f.write('# inputs '+inputs+'\n# axialLoad angle '+' '.join(PMColumns[1:])+'\n')
+				f.flush()
+			futures = {pool.submit(_interactionPoint, task): task for task in tasks}
+			for future in as_completed(futures):
+				task = futures[future]
+				row = future.result()
+				row = np.array([row[0], task[2]]+row[1:])
+				finished[_key(task[3], task[2], inputs)] = row
+				# failed analyses are not stored and are run again on resume
+				if not np.isnan(row[2:]).all():
+					f.write(' '.join('%.17g' % each for each in row)+'\n')
+					f.flush()
+
+	column = PMColumns.index(capacity)+1
+	surface = np.zeros((len(axialLoads), nAngles, 3))
+	for i, axialLoad in enumerate(axialLoads):
+		for j, angle in enumerate(angles):
+			capacityMoment = finished[_key(axialLoad, canonical[j], inputs)][column]
+			surface[i, j] = [axialLoad, capacityMoment*np.cos(np.radians(angle)), capacityMoment*np.sin(np.radians(angle))]
+	return surface
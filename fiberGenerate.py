@@ -6,17 +6,97 @@
 #  Environemet: Successfully excucted in python 3.6
 ######################################################################################
 # import necessary modules
-import matplotlib.pyplot as plt
+# matplotlib and pygmsh are imported in the functions that plot or mesh with gmsh
 import numpy as np
-from scipy.linalg import solve
 import math
-import time
-import pygmsh
-import meshio
-import matplotlib.tri as tri
-from pointInPolygon import is_in_2d_polygon
+from pointInPolygon import pointsInPolygon
 ########################################################################################################################
 ########################################################################################################################
+def fiberArray(fiberInfo):
+    """
+    Convert fiber information to a contiguous (n,3) float64 array [[y1,z1,area1],[y2,z2,area2],...]
+    """
+    return np.ascontiguousarray(fiberInfo, dtype=np.float64).reshape(-1, 3)
+########################################################################################################################
+def triangleFiber(points, triangles):
+    """
+    Area and centroid of all triangle elements computed with array operations
+    Input：points-vertex of triangel element[[x1,y1,Z1],[x2,y2,Z2]]
+         triangles-triangle element array[[I1,J1,K1],[I2,J2,K2]]
+    Output：
+        fiber element information array [[xc1,yc1,area1],[xc2,yc2,area2]]
+    """
+    points = np.asarray(points, dtype=np.float64)
+    triangles = np.asarray(triangles, dtype=np.int64)
+    x = points[:, 0][triangles]
+    y = points[:, 1][triangles]
+    x1, x2, x3 = x[:, 0], x[:, 1], x[:, 2]
+    y1, y2, y3 = y[:, 0], y[:, 1], y[:, 2]
+    fiberInfo = np.empty((len(triangles), 3))
+    fiberInfo[:, 0] = (x1 + x2 + x3) / 3.0
+    fiberInfo[:, 1] = (y1 + y2 + y3) / 3.0
+    fiberInfo[:, 2] = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
+    return fiberInfo
+########################################################################################################################
+def _clipHalfPlane(polygons, counts, axis, value, keepGreater):
+    """
+    Sutherland-Hodgman clipping of a batch of polygons by the half planes coordinate[axis]>=value (or <=value)
+    Input：polygons-vertices of each polygon (nPolygon,m,2), counts-number of vertices of each polygon
+         axis-0 for x, 1 for y, value-position of the clipping line of each polygon (nPolygon,)
+    Output：clipped polygons and their numbers of vertices
+    """
+    nPolygon, m, _ = polygons.shape
+    index = np.arange(m)
+    valid = index[None, :] < counts[:, None]
+    nextIndex = np.where(index[None, :] + 1 < counts[:, None], index[None, :] + 1, 0)
+    P = polygons
+    Q = np.take_along_axis(polygons, nextIndex[:, :, None].repeat(2, axis=2), axis=1)
+    sign = 1.0 if keepGreater else -1.0
+    dP = sign * (P[:, :, axis] - value[:, None])
+    dQ = sign * (Q[:, :, axis] - value[:, None])
+    inP, inQ = dP >= 0.0, dQ >= 0.0
+    denominator = dP - dQ
+    t = dP / np.where(denominator == 0.0, 1.0, denominator)
+    intersection = P + t[:, :, None] * (Q - P)
+    intersection[:, :, axis] = value[:, None]
+    # every edge P->Q emits P if P is inside and the intersection if the edge crosses the line
+    output = np.stack((P, intersection), axis=2).reshape(nPolygon, 2 * m, 2)
+    keep = np.stack((inP & valid, (inP != inQ) & valid), axis=2).reshape(nPolygon, 2 * m)
+    order = np.argsort(~keep, axis=1, kind="stable")
+    newCounts = np.sum(keep, axis=1)
+    width = max(int(newCounts.max()) if nPolygon else 0, 1)
+    output = np.take_along_axis(output, order[:, :width, None].repeat(2, axis=2), axis=1)
+    return output, newCounts
+########################################################################################################################
+def clipPolygonGrid(vertices, xEdges, yEdges):
+    """
+    Area and first moments of a polygon clipped by every cell of a structured grid
+    Input：vertices-polygon vertices [(x1,y1),(x2,y2),...] (either orientation, may be concave)
+         xEdges,yEdges-grid lines in x and y
+    Output：area-clipped area of each cell (nx*ny,), Sx,Sy-first moments of the clipped area about y and x,
+          polygons,counts-clipped polygons of each cell and their numbers of vertices
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)[:, :2]
+    x0, y0 = np.meshgrid(xEdges[:-1], yEdges[:-1], indexing="ij")
+    x1, y1 = np.meshgrid(xEdges[1:], yEdges[1:], indexing="ij")
+    x0, y0, x1, y1 = x0.ravel(), y0.ravel(), x1.ravel(), y1.ravel()
+    polygons = np.repeat(vertices[None, :, :], len(x0), axis=0)
+    counts = np.full(len(x0), len(vertices))
+    for axis, value, keepGreater in ((0, x0, True), (0, x1, False), (1, y0, True), (1, y1, False)):
+        polygons, counts = _clipHalfPlane(polygons, counts, axis, value, keepGreater)
+    index = np.arange(polygons.shape[1])
+    valid = index[None, :] < counts[:, None]
+    nextIndex = np.where(index[None, :] + 1 < counts[:, None], index[None, :] + 1, 0)
+    nextPoint = np.take_along_axis(polygons, nextIndex[:, :, None].repeat(2, axis=2), axis=1)
+    x, y, xn, yn = polygons[:, :, 0], polygons[:, :, 1], nextPoint[:, :, 0], nextPoint[:, :, 1]
+    cross = np.where(valid, x * yn - xn * y, 0.0)
+    # the clipped pieces keep the orientation of the polygon
+    orientation = np.sign(np.sum(vertices[:, 0] * np.roll(vertices[:, 1], -1) - np.roll(vertices[:, 0], -1) * vertices[:, 1]))
+    area = orientation * 0.5 * np.sum(cross, axis=1)
+    Sx = orientation * np.sum((x + xn) * cross, axis=1) / 6.0
+    Sy = orientation * np.sum((y + yn) * cross, axis=1) / 6.0
+    return area, Sx, Sy, polygons, counts
+########################################################################################################################
 class CircleSection():
     """
     Circle section fibers generate
@@ -96,30 +176,59 @@ class CircleSection():
         Input：points-vertex of triangel element[[x1,y1,Z1],[x2,y2,Z2]]
              triangles-triangle element list[[I1,J1,K1],[I2,J2,K2]]
         Output：
-			inFoList:fiber element information [(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        inFoList = []
-        for each in triangles:
-            I, J, K = each[0], each[1], each[2]
-            x1 = points[I][0]
-            y1 = points[I][1]
-            x2 = points[J][0]
-            y2 = points[J][1]
-            x3 = points[K][0]
-            y3 = points[K][1]
-            area = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
-            xc = (x1 + x2 + x3) / 3.0
-            yc = (y1 + y2 + y3) / 3.0
-            inFoList.append((xc, yc, area))
-        return inFoList
+			inFoList:fiber element information array [[xc1,yc1,area1],[xc2,yc2,area2]]
+        """
+        return triangleFiber(points, triangles)
     ####################################################
-    def coreMesh(self,eleSize):
+    def _polarMesh(self, innerRadius, outRadius, eleSize):
+        """
+        Ring-sector core fibers with exact areas and centroids
+        Input: innerRadius-inner radius of the core (0 for solid circle)
+             outRadius-outside radius of the core
+             eleSize-fiber element size, the radial and circumferential size of the cells
+        Output: coreFiberInfo-fiber element information array [[xc1,yc1,area1],[xc2,yc2,area2]]
+              points-cell corners [[x1,y1,0],...], triangles-two triangles of each cell for plotting
+        """
+        nRing = max(int(math.ceil((outRadius - innerRadius) / eleSize)), 1)
+        radius = np.linspace(innerRadius, outRadius, nRing + 1)
+        r1, r2 = radius[:-1], radius[1:]
+        nSector = np.maximum(np.ceil(np.pi * (r1 + r2) / eleSize).astype(int), 3)
+        ring = np.repeat(np.arange(nRing), nSector)
+        sector = np.arange(len(ring)) - np.repeat(np.cumsum(nSector) - nSector, nSector)
+        dTheta = 2.0 * np.pi / nSector[ring]
+        theta1 = sector * dTheta
+        theta2 = theta1 + dTheta
+        a, b = r1[ring], r2[ring]
+        area = 0.5 * dTheta * (b ** 2 - a ** 2)
+        # centroid of a ring sector: 2(b^3-a^3)/(3(b^2-a^2))*sin(dTheta/2)/(dTheta/2) at the middle angle
+        centroidRadius = 2.0 * (b ** 3 - a ** 3) / (3.0 * (b ** 2 - a ** 2)) * np.sinc(dTheta / (2.0 * np.pi))
+        middle = 0.5 * (theta1 + theta2)
+        coreFiberInfo = np.column_stack((centroidRadius * np.cos(middle), centroidRadius * np.sin(middle), area))
+        corners = np.stack((np.column_stack((a * np.cos(theta1), a * np.sin(theta1))),
+                            np.column_stack((b * np.cos(theta1), b * np.sin(theta1))),
+                            np.column_stack((b * np.cos(theta2), b * np.sin(theta2))),
+                            np.column_stack((a * np.cos(theta2), a * np.sin(theta2)))), axis=1)
+        points = np.zeros((4 * len(ring), 3))
+        points[:, :2] = corners.reshape(-1, 2)
+        first = 4 * np.arange(len(ring))[:, None]
+        triangles = np.vstack((first + [0, 1, 2], first + [0, 2, 3]))
+        return coreFiberInfo, points, triangles
+    ####################################################
+    def coreMesh(self,eleSize,mesher="gmsh"):
         """
         Core concrete fiber generate
         Input: eleSize- fiber element size
+             mesher-"gmsh" triangles meshed by pygmsh, "polar" ring-sector cells generated analytically
+                    (exact areas and centroids, no gmsh)
         Output: coreFiberInfo:core concrete fiber elment informaiton [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
         outDiameterNew = self.outDiameter - self.coverThick * 2.0
+        if mesher == "polar":
+            innerRadius = 0.0 if self.innerDiameter == None else self.innerDiameter / 2.0 + self.coverThick
+            return self._polarMesh(innerRadius, outDiameterNew / 2.0, eleSize)
+        elif mesher != "gmsh":
+            raise ValueError("mesher should be 'gmsh' or 'polar'")
+        import pygmsh
         if self.innerDiameter != None:
             innerDiameterNew = self.innerDiameter + self.coverThick * 2.0
             geom = pygmsh.opencascade.Geometry()
@@ -173,9 +282,10 @@ class CircleSection():
         fiberNCover = nCover
         fiberAngle = (2 * np.pi) / fiberNCover
         FiberRadius = (D + DNew) / 4.0
-        FiberXList = [FiberRadius * np.cos((2 * i3 - 1) * 0.5 * fiberAngle) for i3 in range(1, fiberNCover + 1)]
-        FiberYList = [FiberRadius * np.sin((2 * i4 - 1) * 0.5 * fiberAngle) for i4 in range(1, fiberNCover + 1)]
-        coverFiberInfo = [(xc, yc, coverArea) for xc, yc in zip(FiberXList, FiberYList)]
+        fiberAngles = (2 * np.arange(1, fiberNCover + 1) - 1) * 0.5 * fiberAngle
+        FiberXList = FiberRadius * np.cos(fiberAngles)
+        FiberYList = FiberRadius * np.sin(fiberAngles)
+        coverFiberInfo = np.column_stack((FiberXList, FiberYList, np.full(fiberNCover, coverArea)))
         return coverFiberInfo, FiberXList, FiberYList, NodeList, NewNodeList
     ####################################################
 
@@ -209,7 +319,7 @@ class CircleSection():
             inDNew = self.innerDiameter + 2.0 * self.coverThick
             inCoverFiberInfo, inFiberXList, inFiberYList, inNodeList, inNewNodeList \
                 = self._coverDivide(coverSize, pos="in")
-            coverFiberInfo = coverFiberInfo + inCoverFiberInfo
+            coverFiberInfo = np.vstack((coverFiberInfo, inCoverFiberInfo))
             borderInNodeList = inNewNodeList
             borderInNodeList.append(inNewNodeList[0])
             xBorderPlot.append([each3[0] for each3 in borderInNodeList])
@@ -237,9 +347,10 @@ class CircleSection():
         circumLength = 2 * np.pi * newR
         nBar = int(circumLength / barDist)
         angle = (2 * np.pi) / nBar
-        fiberXList = [newR * np.cos(angle * i1) for i1 in range(1, nBar + 1)]
-        fiberYList = [newR * np.sin(angle * i2) for i2 in range(1, nBar + 1)]
-        barFiberInfo = [(xb, yb, area) for xb, yb in zip(fiberXList, fiberYList)]
+        barAngles = angle * np.arange(1, nBar + 1)
+        fiberXList = newR * np.cos(barAngles)
+        fiberYList = newR * np.sin(barAngles)
+        barFiberInfo = np.column_stack((fiberXList, fiberYList, np.full(nBar, area)))
         return barFiberInfo, fiberXList, fiberYList
     ####################################################
     def barMesh(self, outBarD, outBarDist, inBarD=None, inBarDist=None):
@@ -262,7 +373,7 @@ class CircleSection():
         barYListPlot.append(outFiberYList)
         if self.innerDiameter != None:
             inFiberInfo, inFiberXList, inFiberYList = self._barDivide(inBarD, inBarDist, pos="in")
-            barFiberInfo = barFiberInfo + inFiberInfo
+            barFiberInfo = np.vstack((barFiberInfo, inFiberInfo))
             barXListPlot.append(inFiberXList)
             barYListPlot.append(inFiberYList)
         return barFiberInfo,barXListPlot,barYListPlot
@@ -459,7 +570,7 @@ class PolygonSection():
         a2,b2,c2=b,-a,c22
         A = np.array([[a1, b1], [a2, b2]])
         B = np.array([-c1, -c2])
-        newNode = list(solve(A, B))
+        newNode = list(np.linalg.solve(A, B))
         return newNode
     ####################################################
     def _interNodeCoord(self,nodeDict,coverThick,pos):
@@ -478,7 +589,8 @@ class PolygonSection():
         IterNode = []
         for i1 in range(len(nodeDict)):
             IterNode.append((NodeKeys[i1], NodeKeys[i1 + 1], NodeKeys[i1 + 2]))
-        NodeList = []
+        lineCoefficient = []
+        candidateNode = []
         for each1 in IterNode:
             nodeI = nodeDict[each1[0]]
             nodeJ = nodeDict[each1[1]]
@@ -497,10 +609,13 @@ class PolygonSection():
             c2_1 = c2 - math.sqrt(a2 ** 2 + b2 ** 2) * coverThick
             c2_2 = c2 + math.sqrt(a2 ** 2 + b2 ** 2) * coverThick
 
-            nodeD1_1=self._pointToLineD(a1,b1,c1_1,nodeIx,nodeIy,nodeJx,nodeJy)
-            D1_1Index=is_in_2d_polygon(nodeD1_1,closedNodeValues)
-            nodeD2_1 = self._pointToLineD(a2,b2,c2_1,nodeJx,nodeJy,nodeKx,nodeKy)
-            D2_1Index = is_in_2d_polygon(nodeD2_1, closedNodeValues)
+            lineCoefficient.append((a1, b1, c1_1, c1_2, a2, b2, c2_1, c2_2))
+            candidateNode.append(self._pointToLineD(a1,b1,c1_1,nodeIx,nodeIy,nodeJx,nodeJy))
+            candidateNode.append(self._pointToLineD(a2,b2,c2_1,nodeJx,nodeJy,nodeKx,nodeKy))
+        # 所有偏移候选点一次判断是否在多边形内
+        candidateIndex = pointsInPolygon(candidateNode, closedNodeValues).reshape(-1, 2)
+        NodeList = []
+        for (a1, b1, c1_1, c1_2, a2, b2, c2_1, c2_2), (D1_1Index, D2_1Index) in zip(lineCoefficient, candidateIndex):
             if pos == "outLine":
                 c11 = c1_1 if D1_1Index==True else c1_2
                 c22 = c2_1 if D2_1Index==True else c2_2
@@ -511,7 +626,7 @@ class PolygonSection():
                 print("Error!Please select outLine or innerLine mode!")
             A = np.array([[a1, b1], [a2, b2]])
             B = np.array([-c11, -c22])
-            newNode = list(solve(A, B))
+            newNode = list(np.linalg.solve(A, B))
             NodeList.append((newNode[0], newNode[1]))
         NodeList.insert(0, NodeList[-1])
         del NodeList[-1]
@@ -537,24 +652,45 @@ class PolygonSection():
             nodeNArray:节点坐标列表[[x1,y1],[x2,y2]]
             eleNArray:单元列表[[I1,J1,K1],[I2,J2,K2]
         返回：
-            inFoList:纤维单元信息列表[(xc1,yc1,area1),(xc2,yc2,area2)]
-        """
-        inFoList = []
-        for each in eleNArray:
-            I, J, K = each[0], each[1], each[2]
-            x1 = nodeNArray[I][0]
-            y1 = nodeNArray[I][1]
-            x2 = nodeNArray[J][0]
-            y2 = nodeNArray[J][1]
-            x3 = nodeNArray[K][0]
-            y3 = nodeNArray[K][1]
-            area = 0.5 * (x1 * y2 - x2 * y1 + x2 * y3 - x3 * y2 + x3 * y1 - x1 * y3)
-            xc = (x1 + x2 + x3) / 3.0
-            yc = (y1 + y2 + y3) / 3.0
-            inFoList.append((xc, yc, area))
-        return inFoList
+            inFoList:纤维单元信息数组[[xc1,yc1,area1],[xc2,yc2,area2]]
+        """
+        return triangleFiber(nodeNArray, eleNArray)
     ####################################################
-    def coreMesh(self, eleSize, outLineList, inLineList=None):
+    def _gridMesh(self, eleSize, outLineList, inLineList=None):
+        """
+        Structured grid over the core outline, the cells are clipped against the outline and the holes
+        Input:
+            eleSize: grid cell size
+            outLineList: border line intersect points between outside cover and core [(x1,y1),(x2,y2),...,(xn,yn)]
+            inLineList: border line intersect points between inner cover and core of each hole
+        Output:
+            coreFiberInfo: centroid and exact clipped area of the cells [[xc1,yc1,area1],[xc2,yc2,area2]]
+            points, triangles: fan triangles of the cells clipped by the outline for plotting
+        """
+        outline = np.asarray(outLineList, dtype=np.float64)[:, :2]
+        (xMin, yMin), (xMax, yMax) = outline.min(axis=0), outline.max(axis=0)
+        nx = max(int(math.ceil((xMax - xMin) / eleSize)), 1)
+        ny = max(int(math.ceil((yMax - yMin) / eleSize)), 1)
+        xEdges = np.linspace(xMin, xMax, nx + 1)
+        yEdges = np.linspace(yMin, yMax, ny + 1)
+        area, Sx, Sy, polygons, counts = clipPolygonGrid(outline, xEdges, yEdges)
+        for eachInner in (inLineList if inLineList != None else []):
+            holeArea, holeSx, holeSy = clipPolygonGrid(eachInner, xEdges, yEdges)[:3]
+            area, Sx, Sy = area - holeArea, Sx - holeSx, Sy - holeSy
+        cellArea = (xMax - xMin) * (yMax - yMin) / (nx * ny)
+        kept = area > 1e-9 * cellArea
+        coreFiberInfo = np.column_stack((Sx[kept] / area[kept], Sy[kept] / area[kept], area[kept]))
+        polygons, counts = polygons[kept], counts[kept]
+        m = polygons.shape[1]
+        points = np.zeros((len(polygons) * m, 3))
+        points[:, :2] = polygons.reshape(-1, 2)
+        first = m * np.arange(len(polygons))[:, None]
+        fan = np.arange(1, m - 1)[None, :]
+        triangles = np.stack((np.broadcast_to(first, (len(polygons), m - 2)), first + fan, first + fan + 1), axis=2)
+        triangles = triangles[fan + 1 < counts[:, None]].reshape(-1, 3)
+        return coreFiberInfo, points, triangles
+    ####################################################
+    def coreMesh(self, eleSize, outLineList, inLineList=None, mesher="gmsh"):
         """
         Core concrete mesh
         Input:
@@ -562,9 +698,16 @@ class PolygonSection():
             outLineList: border line intersect points between outside cover and core [(x1,y1),(x2,y2),...,(xn,yn)]
             inLineList:border line intersect points between inner cover and core[[(x1,y1),(x2,y2),...,(xn,yn)],
                        [(x1,y1),(x2,y2),...,(xn,yn)]]
+            mesher: "gmsh" triangles meshed by pygmsh, "grid" structured grid cells clipped against the outline
+                    and holes (exact areas and centroids, no gmsh)
         Output:
             triEleInfoList: core fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
+        if mesher == "grid":
+            return self._gridMesh(eleSize, outLineList, inLineList)
+        elif mesher != "gmsh":
+            raise ValueError("mesher should be 'gmsh' or 'grid'")
+        import pygmsh
         triEleInfoList = None
         outNOdeList=[[outLineList[i1][0],outLineList[i1][1],0] for i1 in range(len(outLineList))]
 
@@ -610,47 +753,24 @@ class PolygonSection():
         for i1 in range(1, nLine + 1):
             nodeI = eleDict[i1][0]
             nodeJ = eleDict[i1][1]
-            outNodeIx = outNodeDict[nodeI][0]
-            outNodeIy = outNodeDict[nodeI][1]
-            outNodeJx = outNodeDict[nodeJ][0]
-            outNodeJy = outNodeDict[nodeJ][1]
-            inNodeIx = inNodeDict[nodeI][0]
-            inNodeIy = inNodeDict[nodeI][1]
-            inNodeJx = inNodeDict[nodeJ][0]
-            inNodeJy = inNodeDict[nodeJ][1]
-            length = math.sqrt((outNodeJx - outNodeIx) ** 2 + (outNodeJy - outNodeIy) ** 2)
-            nEle = int(length /float(eleSize))
-            totalOutNodeList = []
-            totalInNodeList = []
-            totalOutNodeList.append((outNodeIx, outNodeIy))
-            totalInNodeList.append((inNodeIx, inNodeIy))
-            for i2 in range(1, nEle):
-                outxi = ((nEle - i2) * outNodeIx + i2 * outNodeJx) / nEle  # n等分点公式
-                outyi = ((nEle - i2) * outNodeIy + i2 * outNodeJy) / nEle
-                inxi = ((nEle - i2) * inNodeIx + i2 * inNodeJx) / nEle
-                inyi = ((nEle - i2) * inNodeIy + i2 * inNodeJy) / nEle
-                totalOutNodeList.append((outxi, outyi))
-                totalInNodeList.append((inxi, inyi))
-            totalOutNodeList.append((outNodeJx, outNodeJy))
-            totalInNodeList.append((inNodeJx, inNodeJy))
-            inLength = math.sqrt((totalInNodeList[1][0] - totalInNodeList[0][0]) ** 2 \
-                                 + (totalInNodeList[1][1] - totalInNodeList[0][1]) ** 2)
-            outLength = math.sqrt((totalOutNodeList[1][0] - totalOutNodeList[0][0]) ** 2 + \
-                                  (totalOutNodeList[1][1] - totalOutNodeList[0][1]) ** 2)
+            outNodeI, outNodeJ = np.array(outNodeDict[nodeI][:2]), np.array(outNodeDict[nodeJ][:2])
+            inNodeI, inNodeJ = np.array(inNodeDict[nodeI][:2]), np.array(inNodeDict[nodeJ][:2])
+            length = math.sqrt(np.sum((outNodeJ - outNodeI) ** 2))
+            nEle = max(int(length / float(eleSize)), 1)
+            ratio = (np.arange(nEle + 1) / nEle)[:, None]  # n等分点公式
+            totalOutNode = (1.0 - ratio) * outNodeI + ratio * outNodeJ
+            totalInNode = (1.0 - ratio) * inNodeI + ratio * inNodeJ
+            totalOutNode[-1], totalInNode[-1] = outNodeJ, inNodeJ
+            inLength = math.sqrt(np.sum((totalInNode[1] - totalInNode[0]) ** 2))
+            outLength = math.sqrt(np.sum((totalOutNode[1] - totalOutNode[0]) ** 2))
             eleArea = (inLength + outLength) * coverThick / 2.0
-            for j2 in range(len(totalOutNodeList) - 1):
-                outPlotNode.append(totalOutNodeList[j2])
-                inPlotNode.append(totalInNodeList[j2])
-            for i3 in range(len(totalOutNodeList) - 1):
-                outI = totalOutNodeList[i3]
-                outJ = totalOutNodeList[i3 + 1]
-                inI = totalInNodeList[i3]
-                inJ = totalInNodeList[i3 + 1]
-                outCenter = ((outI[0] + outJ[0]) / 2.0, (outI[1] + outJ[1]) / 2.0)
-                inCenter = ((inI[0] + inJ[0]) / 2.0, (inI[1] + inJ[1]) / 2.0)
-                centerCoord = (
-                (outCenter[0] + inCenter[0]) / 2.0, (outCenter[1] + inCenter[1]) / 2.0, eleArea)  # 纤维中心坐标及其面积
-                centerCoordList.append(centerCoord)
+            outPlotNode += [tuple(each) for each in totalOutNode[:-1]]
+            inPlotNode += [tuple(each) for each in totalInNode[:-1]]
+            outCenter = (totalOutNode[:-1] + totalOutNode[1:]) / 2.0
+            inCenter = (totalInNode[:-1] + totalInNode[1:]) / 2.0
+            # 纤维中心坐标及其面积
+            centerCoordList.append(np.column_stack(((outCenter + inCenter) / 2.0, np.full(nEle, eleArea))))
+        centerCoordList = fiberArray(np.vstack(centerCoordList))
         return centerCoordList, outPlotNode, inPlotNode
     ####################################################
     def coverMesh(self, eleSize, coverThick):
@@ -688,7 +808,7 @@ class PolygonSection():
             for i4 in range(nInhole):
                 Innerfiber, innerOut, innerIn = self._coverDivide(nodeInDict[i4],\
                         nodeNewInDict[i4], eleInDict[i4],eleSize,coverThick)
-                coverFiberInfo = coverFiberInfo + Innerfiber
+                coverFiberInfo = np.vstack((coverFiberInfo, Innerfiber))
                 innerOut.append(innerOut[0])
                 innerIn.append(innerIn[0])
                 outNodeReturn = outNodeReturn + innerOut
@@ -739,27 +859,18 @@ class PolygonSection():
         area = np.pi * barD ** 2 / 4.0
         nLine = len(lineEleDict)
         barFiberList = []
-        xReturnList = []
-        yReturnList = []
         for i1 in range(1, nLine + 1):
             nodeI = lineEleDict[i1][0]
             nodeJ = lineEleDict[i1][1]
-            nodeIx = nodeDict[nodeI][0]
-            nodeIy = nodeDict[nodeI][1]
-            nodeJx = nodeDict[nodeJ][0]
-            nodeJy = nodeDict[nodeJ][1]
-            length = math.sqrt((nodeJx - nodeIx) ** 2 + (nodeJy - nodeIy) ** 2)
-            nEle = int(length / barDist)
-            lineBarCoorList = []
-            lineBarCoorList.append((nodeIx, nodeIy))
-            for i2 in range(1, nEle):
-                outxi = ((nEle - i2) * nodeIx + i2 * nodeJx) / nEle  # n等分点公式
-                outyi = ((nEle - i2) * nodeIy + i2 * nodeJy) / nEle
-                lineBarCoorList.append((outxi, outyi))
-            for i3 in range(len(lineBarCoorList)):
-                barFiberList.append((lineBarCoorList[i3][0], lineBarCoorList[i3][1], area))
-                xReturnList.append(lineBarCoorList[i3][0])
-                yReturnList.append(lineBarCoorList[i3][1])
+            nodeIxy, nodeJxy = np.array(nodeDict[nodeI][:2]), np.array(nodeDict[nodeJ][:2])
+            length = math.sqrt(np.sum((nodeJxy - nodeIxy) ** 2))
+            nEle = max(int(length / barDist), 1)
+            ratio = (np.arange(nEle) / nEle)[:, None]  # n等分点公式
+            lineBarCoor = (1.0 - ratio) * nodeIxy + ratio * nodeJxy
+            barFiberList.append(np.column_stack((lineBarCoor, np.full(nEle, area))))
+        barFiberList = fiberArray(np.vstack(barFiberList)) if barFiberList else fiberArray([])
+        xReturnList = list(barFiberList[:, 0])
+        yReturnList = list(barFiberList[:, 1])
         return barFiberList, xReturnList, yReturnList
     ###################################################
     def barMesh(self, coverThick, outBarD=None, outBarDist=None, inBarD=None, inBarDist=None):
@@ -773,7 +884,7 @@ class PolygonSection():
         Output:
             barFiberInfo: bar fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
-        barFiberInfo = []
+        barFiberInfo = fiberArray([])
         outXList = []
         outYList = []
         if outBarD != None:
@@ -781,7 +892,7 @@ class PolygonSection():
             outBarListEle=self.outEle
             # 外侧钢筋纤维的划分
             outBarFiber, outXList, outYList = self._barDivide(outBarD, outBarDist, outBarLineDict, outBarListEle)
-            barFiberInfo = barFiberInfo + outBarFiber
+            barFiberInfo = np.vstack((barFiberInfo, outBarFiber))
         #内侧额钢筋纤维的划分
         if inBarD != None:
             inBarLineDict = self._innerBarLineNode(coverThick+inBarD/2.0) #计算内侧钢筋所在直线交点坐标
@@ -789,7 +900,7 @@ class PolygonSection():
             nEle = len(inBarLineEle)
             for i1 in range(nEle):
                 inBarFiber, inXList, inYList = self._barDivide(inBarD, inBarDist, inBarLineDict[i1], inBarLineEle[i1])
-                barFiberInfo = barFiberInfo + inBarFiber
+                barFiberInfo = np.vstack((barFiberInfo, inBarFiber))
                 outXList = outXList + inXList
                 outYList = outYList + inYList
         return barFiberInfo,outXList,outYList
@@ -801,12 +912,12 @@ class PolygonSection():
               barEleDict:各个钢筋段单元信息字典{1:(nodeI,nodeJ,barD,barDist)},barD-钢筋直径，barDist-钢筋间距
         输出：barFiberInfo: bar fiber infomation [(xc1,yc1,area1),(xc2,yc2,area2)]
         """
-        barFiberInfo =[]
+        barFiberInfo = fiberArray([])
         XListInfo=[]
         YListInfo=[]
         for each in barEleDict.values():
             BarFiber, XList, YList = self._barDivide(each[2], each[3], barControlNodeDict, {1:(each[0],each[1])})
-            barFiberInfo+=BarFiber
+            barFiberInfo = np.vstack((barFiberInfo, BarFiber))
             XListInfo+=XList
             YListInfo+=YList
         return barFiberInfo, XListInfo,YListInfo
@@ -0,0 +1,112 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : fiberLumping.py
+# @Software : PyCharm
+
+import numpy as np
+
+
+def extremeFibers(fibers, axis, tol=1e-3):
+	"""
+	Fibers at the largest and smallest coordinate along the bending direction. Under monotonic bending in that
+	direction the largest tensile and compressive strains, and so the first fiber passing a strain limit, are found
+	among them.
+	:param fibers: fibers [(y1,z1,area1),...]
+	:param axis: coordinate along the bending direction, 0 for y ('X' bending), 1 for z ('Y' bending)
+	:param tol: fibers within tol*(extent of the group) of the extreme coordinates are selected
+	:return: indices of the selected fibers
+	"""
+	fibers = np.atleast_2d(np.asarray(fibers, dtype=np.float64)).reshape(-1, 3)
+	if len(fibers) == 0:
+		return np.zeros(0, dtype=np.int64)
+	u = fibers[:, axis]
+	band = tol*max(np.ptp(u), 1e-12)
+	return np.flatnonzero((u >= u.max()-band) | (u <= u.min()+band))
+
+
+def lumpStrips(fibers, axis, width):
+	"""
+	Lump fibers into strips perpendicular to the bending direction.
+	Every strip becomes two fibers of half the strip area at the strip centroid along the bending direction,
+	placed symmetrically about the strip centroid in the other direction so that the area, both first moments and
+	the second moment in the other direction are preserved (one fiber if the strip has no extent in it).
+	:param fibers: fibers [(y1,z1,area1),...]
+	:param axis: coordinate along the bending direction, 0 for y, 1 for z
+	:param width: strip width, fibers closer than width*1e-9 are lumped if width is 0
+	:return: lumped fibers and the second moment along the bending direction that is lost by lumping
+	"""
+	fibers = np.atleast_2d(np.asarray(fibers, dtype=np.float64)).reshape(-1, 3)
+	if len(fibers) == 0:
+		return fibers, 0.0
+	other = 1-axis
+	u, v, A = fibers[:, axis], fibers[:, other], fibers[:, 2]
+	if width > 0:
+		strip = np.floor((u-u.min())/width)
+	else:
+		strip = np.round(u/max(np.ptp(u)*1e-9, 1e-12))
+	strip = np.unique(strip, return_inverse=True)[1]
+	area = np.bincount(strip, weights=A)
+	uc = np.bincount(strip, weights=A*u)/area
+	vc = np.bincount(strip, weights=A*v)/area
+	offset = np.sqrt(np.bincount(strip, weights=A*(v-vc[strip])**2)/area)
+	lostInertia = np.sum(A*(u-uc[strip])**2)
+	split = offset > 1e-9*max(np.ptp(v), 1e-12)
+	lumped = np.zeros((len(area)+np.count_nonzero(split), 3))
+	lumped[:len(area), axis] = uc
+	lumped[:len(area), other] = vc+offset*split
+	lumped[:len(area), 2] = np.where(split, 0.5*area, area)
+	lumped[len(area):, axis] = uc[split]
+	lumped[len(area):, other] = vc[split]-offset[split]
+	lumped[len(area):, 2] = 0.5*area[split]
+	return lumped, lostInertia
+
+
+def lumpSection(coverFiber, coreFiber, barFiber, axis, tol=1e-3, maxIter=30):
+	"""
+	Strip-lumping reduction of the concrete fibers for uniaxial bending.
+	Concrete fibers of the same material are lumped into strips (see lumpStrips) whose width is chosen so that the
+	relative error of the second moment along the bending direction is below tol; area, first moments and the
+	second moment in the other direction are preserved exactly.
+	The extreme cover and core fibers along the bending direction (see extremeFibers) are kept as they are, so that
+	core crushing, cover spalling and the other strain limit states are still detected at the outermost concrete
+	and not at a strip centroid further inside. Bars are lumped only where they share the same coordinate along the
+	bending direction, so that the bar strain limit states still see the outermost bars.
+	:param coverFiber: cover concrete fibers [(y1,z1,area1),...]
+	:param coreFiber: core concrete fibers
+	:param barFiber: bar fibers
+	:param axis: coordinate along the bending direction, 0 for y ('X' bending), 1 for z ('Y' bending)
+	:param tol: tolerance of the relative second moment error
+	:param maxIter: maximum number of strip width reductions
+	:return: lumped cover, core and bar fibers (the kept extreme fibers first in each concrete group) and a report
+		{'fibers': (before, after), 'reduction': before/after, 'secondMomentError': relative error,
+		'stripWidth': width, 'tol': tol}
+	"""
+	groups = [np.atleast_2d(np.asarray(each, dtype=np.float64)).reshape(-1, 3) for each in (coverFiber, coreFiber, barFiber)]
+	allFiber = np.vstack(groups)
+	totalArea = np.sum(allFiber[:, 2])
+	centroid = np.sum(allFiber[:, 2]*allFiber[:, axis])/totalArea
+	inertia = np.sum(allFiber[:, 2]*(allFiber[:, axis]-centroid)**2)
+	width = np.sqrt(12.0*tol*inertia/totalArea)
+	lumpedBar, barLost = lumpStrips(groups[2], axis, 0.0)
+	kept, inner = [], []
+	for group in groups[:2]:
+		extreme = np.zeros(len(group), dtype=bool)
+		extreme[extremeFibers(group, axis)] = True
+		kept.append(group[extreme])
+		inner.append(group[~extreme])
+	for i in range(maxIter):
+		lumpedCover, coverLost = lumpStrips(inner[0], axis, width)
+		lumpedCore, coreLost = lumpStrips(inner[1], axis, width)
+		error = (coverLost+coreLost+barLost)/inertia
+		if error <= tol:
+			break
+		width *= 0.5
+	lumpedCover = np.vstack((kept[0], lumpedCover))
+	lumpedCore = np.vstack((kept[1], lumpedCore))
+	before = len(allFiber)
+	after = len(lumpedCover)+len(lumpedCore)+len(lumpedBar)
+	report = {'fibers': (before, after), 'reduction': before/after, 'secondMomentError': error,
+			  'stripWidth': width, 'tol': tol}
+	return lumpedCover, lumpedCore, lumpedBar, report
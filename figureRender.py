@@ -0,0 +1,177 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : figureRender.py
+# @Software : PyCharm
+
+import os
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+
+# 'interactive' draws with pyplot and shows the figure, 'headless' renders on Agg in worker processes without
+# showing it, 'off' skips the figures, set MCANALYSIS_RENDER or call setRenderMode
+renderMode = os.environ.get('MCANALYSIS_RENDER', 'interactive')
+# file formats and resolution of all figures, None keeps the defaults of each figure
+figureFormats = None
+figureDpi = None
+# number of rendering processes in headless mode, 0 renders in the calling process
+nWorkers = 1
+renderModes = ('interactive', 'headless', 'off')
+
+_pool = None
+_pending = []
+
+
+def setRenderMode(mode, formats=None, dpi=None, workers=None):
+	"""
+	Select how the section and moment-curvature figures are rendered
+	:param mode: 'interactive', 'headless' or 'off'
+	:param formats: file formats of every figure, e.g. ('png',) (None keeps the defaults of each figure)
+	:param dpi: resolution of every figure (None keeps the defaults of each figure)
+	:param workers: number of rendering processes in headless mode, 0 renders in the calling process
+	"""
+	global renderMode, figureFormats, figureDpi, nWorkers
+	if mode not in renderModes:
+		raise ValueError("mode should be one of "+", ".join(renderModes))
+	renderMode, figureFormats, figureDpi = mode, formats, dpi
+	if workers is not None:
+		waitFigures()
+		nWorkers = workers
+
+
+def renderFigure(draw, args, fileStem, figsize, formats, dpi=None, bbox=None):
+	"""
+	Draw one figure on the Agg canvas and save it, without pyplot
+	:param draw: module level function draw(ax, *args)
+	:param args: arguments of draw
+	:param fileStem: file name without extension
+	:param figsize: figure size in inches (w, h)
+	:param formats: file formats, e.g. ('png', 'eps')
+	:param dpi: resolution (None for the matplotlib default)
+	:param bbox: bbox_inches of savefig
+	:return: names of the saved files
+	"""
+	from matplotlib.figure import Figure
+	from matplotlib.backends.backend_agg import FigureCanvasAgg
+	fig = Figure(figsize=figsize)
+	FigureCanvasAgg(fig)
+	draw(fig.add_subplot(111), *args)
+	fileNames = [fileStem+'.'+each for each in formats]
+	for fileName in fileNames:
+		fig.savefig(fileName, dpi=dpi, bbox_inches=bbox)
+	return fileNames
+
+
+def submitFigure(draw, args, fileStem, figsize, formats=('png',), dpi=None, bbox=None):
+	"""
+	Render a figure in the current render mode
+	:param draw: module level function draw(ax, *args), the arguments are sent to the rendering process
+	:param args: arguments of draw
+	:param fileStem: file name without extension, the folder is created if missing
+	:param figsize: figure size in inches (w, h)
+	:param formats: default file formats of the figure
+	:param dpi: default resolution of the figure
+	:param bbox: bbox_inches of savefig
+	:return: names of the saved files ('interactive', headless with 0 workers), a future of them (headless)
+		or None ('off')
+	"""
+	if renderMode not in renderModes:
+		raise ValueError("renderMode should be one of "+", ".join(renderModes))
+	if renderMode == 'off':
+		return None
+	formats = figureFormats if figureFormats is not None else formats
+	dpi = figureDpi if figureDpi is not None else dpi
+	fileStem = os.path.abspath(fileStem)
+	if not os.path.exists(os.path.dirname(fileStem)):
+		os.makedirs(os.path.dirname(fileStem), exist_ok=True)
+	if renderMode == 'interactive':
+		import matplotlib.pyplot as plt
+		fig = plt.figure(figsize=figsize)
+		draw(fig.add_subplot(111), *args)
+		fileNames = [fileStem+'.'+each for each in formats]
+		for fileName in fileNames:
+			plt.savefig(fileName, dpi=dpi, bbox_inches=bbox)
+		plt.show()
+		return fileNames
+	if nWorkers == 0:
+		return renderFigure(draw, args, fileStem, figsize, formats, dpi, bbox)
+	global _pool
+	if _pool is None:
+		_pool = ProcessPoolExecutor(max_workers=nWorkers)
+	future = _pool.submit(renderFigure, draw, args, fileStem, figsize, formats, dpi, bbox)
+	_pending.append(future)
+	return future
+
+
+def waitFigures():
+	"""
+	Wait until all queued figures are rendered and stop the rendering processes
+	:return: names of the saved files
+	"""
+	global _pool
+	fileNames = []
+	while _pending:
+		fileNames += _pending.pop(0).result()
+	if _pool is not None:
+		_pool.shutdown()
+		_pool = None
+	return fileNames
+
+
+atexit.register(waitFigures)
+
+
+def drawCircleSection(ax, xListPlot, yListPlot, pointsPlot, trianglesPlot, coverXListPlot, coverYListPlot,
+					  xBorderPlot, yBorderPlot, barXListPlot, barYListPlot):
+	"""
+	Fibers of a circle section, see sectionFiberMain.circleSection
+	"""
+	for eachx, eachy in zip(xListPlot, yListPlot):
+		ax.plot(eachx, eachy, "r", linewidth=1, zorder=2)
+	ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot)
+	for coverx, covery in zip(coverXListPlot, coverYListPlot):
+		ax.plot(coverx, covery, "r", linewidth=1, zorder=2)
+	for borderx, bordery in zip(xBorderPlot, yBorderPlot):
+		ax.plot(borderx, bordery, "r", linewidth=1, zorder=2)
+	for barx, bary in zip(barXListPlot, barYListPlot):
+		ax.scatter(barx, bary, s=10, c="k", zorder=3)
+
+
+def drawPolygonSection(ax, originalNodeListPlot, lineListPlot, pointsPlot, trianglesPlot, outNodeReturnPlot,
+					   inNodeReturnPlot, barXListPlot, barYListPlot):
+	"""
+	Fibers of a polygon section, see sectionFiberMain.polygonSection
+	:param lineListPlot: cover lines of the outline and of the holes
+	"""
+	coverColor = "r"
+	coreColor = "b"
+	lineWid = 1
+	barMarkSize = 20
+	barColor = "k"
+	for each1 in originalNodeListPlot:
+		ax.plot(each1[0], each1[1], coverColor, lineWid, zorder=0)
+	for each2 in lineListPlot:
+		ax.plot(each2[0], each2[1], coverColor, lineWid, zorder=1)
+	ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot, c=coreColor, lw=lineWid)
+	for i1 in range(len(outNodeReturnPlot) - 1):
+		ax.plot([inNodeReturnPlot[i1][0], outNodeReturnPlot[i1][0]],
+				[inNodeReturnPlot[i1][1], outNodeReturnPlot[i1][1]],
+				coverColor, linewidth=lineWid, zorder=0)
+	ax.scatter(barXListPlot, barYListPlot, s=barMarkSize, c=barColor, linewidth=lineWid, zorder=2)
+
+
+def drawMomentCurvature(ax, x1, y1, x2, y2, xyield, yyield, xmax, ymax, title):
+	"""
+	Moment-curvature curve with its equivalent bilinear curve, see MC.plotLinearRegre
+	"""
+	ax.plot(x1, y1, linewidth=1, color='g')
+	ax.plot(x2, y2, color='r', linestyle='--', linewidth=1)
+	ax.plot(xyield, yyield, "o")
+	ax.plot(xmax, ymax, "o")
+	ax.grid(c='k', linestyle='--', linewidth=0.3)
+	ax.set_xlabel("curvature")
+	ax.set_ylabel("moment(kN.m)")
+	ax.set_xlim(0.0, 1.01*max(x1))
+	ax.set_ylim(3, 1.3*max(y1))
+	ax.set_title(title)
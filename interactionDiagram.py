@@ -0,0 +1,68 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : interactionDiagram.py
+# @Software : PyCharm
+
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from MCAnalysis import MC
+
+# columns of the P-M table
+PMColumns = ['axialLoad', 'yieldCurvature', 'yieldMoment', 'effectiveCurvature', 'effectiveMoment',
+			 'ultimateCurvature', 'ultimateMoment', 'maxCurvature', 'maxMoment']
+
+
+def _interactionPoint(task):
+	"""
+	Moment curvature analysis of one axial load in its own scratch directory (runs in a worker process)
+	:param task: (sectName, sectPath, direction, axialLoad, moment, maxMu, numIncr, backend)
+	:return: one row of the P-M table, NaN moments if the analysis failed
+	"""
+	sectName, sectPath, direction, axialLoad, moment, maxMu, numIncr, backend = task
+	workDir = tempfile.mkdtemp(prefix=sectName+'-'+str(axialLoad)+'-')
+	currentDir = os.getcwd()
+	os.chdir(workDir)
+	try:
+		mcInstance = MC(sectName, direction, sectPath)
+		mcInstance.MCAnalysis(axialLoad, moment, maxMu, numIncr, recordMode='memory', backend=backend)
+		mcInstance.MCCurve(plot=False)
+		return [axialLoad]+[float(mcInstance.curveResult[name]) for name in PMColumns[1:]]
+	except Exception as error:
+		print('Axial load', axialLoad, 'failed:', error)
+		return [axialLoad]+[np.nan]*(len(PMColumns)-1)
+	finally:
+		os.chdir(currentDir)
+		shutil.rmtree(workDir, ignore_errors=True)
+
+
+def interactionDiagram(sectName, axialLoads, direction='X', moment=0, maxMu=30, numIncr=100, backend='opensees',
+					   nWorkers=None, save=True):
+	"""
+	P-M interaction diagram from moment curvature analyses at a series of axial loads.
+	Every axial load runs in a separate worker process with its own scratch directory, so the analyses
+	do not share the openseespy model or the working directory files.
+	On Windows call it under if __name__ == "__main__":
+	:param sectName: section name (folder generated by circleSection/polygonSection and Material)
+	:param axialLoads: axial loads (compression positive)
+	:param direction: calculated direction ('X' or 'Y')
+	:param moment: moment in the other direction
+	:param maxMu: target ductility for analysis
+	:param numIncr: number of analysis increments
+	:param backend: 'opensees' or 'numpy', see MC.MCAnalysis
+	:param nWorkers: number of worker processes (default: number of CPUs)
+	:param save: save the table to sectName/PMInteraction-direction.txt
+	:return: P-M table (nLoads x len(PMColumns)), columns as in PMColumns
+	"""
+	sectPath = os.path.abspath(sectName)
+	tasks = [(sectName, sectPath, direction, float(axialLoad), moment, maxMu, numIncr, backend)
+			 for axialLoad in axialLoads]
+	with ProcessPoolExecutor(max_workers=nWorkers) as pool:
+		pmTable = np.array(list(pool.map(_interactionPoint, tasks)))
+	if save:
+		np.savetxt(os.path.join(sectPath, 'PMInteraction-'+str(direction)+'.txt'), pmTable, header=' '.join(PMColumns))
+	return pmTable
@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : jobJournal.py
+# @Software : PyCharm
+
+import os
+import json
+import time
+import hashlib
+
+
+def inputsHash(inputs):
+	"""
+	Hash of the inputs of a job, a journal entry is only reused for the same inputs
+	:param inputs: JSON serializable inputs
+	"""
+	return hashlib.sha256(json.dumps(inputs, sort_keys=True, default=repr).encode('utf-8')).hexdigest()[:16]
+
+
+class JobJournal():
+	def __init__(self, fileName, maxAttempts=3):
+		"""
+		Append-only JSON-lines journal of the jobs of a batch, so that an interrupted batch resumes where it stopped.
+		Every state change is one line {'key', 'status', 'inputs', 'time', ...} written with a single write and
+		fsync, so a crash leaves at most one truncated last line, which is ignored. A job is 'started' before it
+		runs and 'finished' or 'failed' after; a job that is still 'started' when the journal is read again was
+		interrupted and counts as a failed attempt. A job stopped through no fault of its own (e.g. another job
+		broke the worker pool) is recorded as 'interrupted', which gives its attempt back.
+		:param fileName: journal file (created if missing)
+		:param maxAttempts: number of attempts of a job with the same inputs before it is given up
+		"""
+		self.fileName = fileName
+		self.maxAttempts = maxAttempts
+		self.jobs = {}  # key: last record of the job
+		self.attempts = {}  # key: number of started attempts with the inputs of the last record
+		folder = os.path.dirname(os.path.abspath(fileName))
+		if not os.path.exists(folder):
+			os.makedirs(folder, exist_ok=True)
+		if os.path.exists(fileName):
+			with open(fileName) as f:
+				lines = f.read().split('\n')
+			for line in lines:
+				try:
+					self._apply(json.loads(line))
+				except ValueError:
+					continue
+			if lines[-1]:
+				# terminate the line truncated by a crash so that the next record starts on a new line
+				self._append('\n')
+
+	def _apply(self, entry):
+		key = entry['key']
+		last = self.jobs.get(key)
+		if last is None or last.get('inputs') != entry.get('inputs'):
+			self.attempts[key] = 0
+		if entry['status'] == 'started':
+			self.attempts[key] += 1
+		elif entry['status'] == 'interrupted':
+			self.attempts[key] = max(self.attempts[key]-1, 0)
+		self.jobs[key] = entry
+
+	def record(self, key, status, inputs=None, **fields):
+		"""
+		Append a state change of a job
+		:param key: job key, e.g. 'CircularPier|Y|200'
+		:param status: 'started', 'finished', 'failed' or 'interrupted'
+		:param inputs: inputs hash of the job (see inputsHash)
+		:param fields: JSON serializable values stored with the state, e.g. resultDir, result, error
+		"""
+		entry = dict(fields, key=key, status=status, inputs=inputs, time=time.strftime('%Y-%m-%dT%H:%M:%S'))
+		self._append(json.dumps(entry)+'\n')
+		self._apply(entry)
+
+	def _append(self, text):
+		"""
+		Append text with one write and flush it to the disk
+		"""
+		handle = os.open(self.fileName, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+		try:
+			os.write(handle, text.encode('utf-8'))
+			os.fsync(handle)
+		finally:
+			os.close(handle)
+
+	def isFinished(self, key, inputs=None):
+		"""
+		Whether the job finished with the same inputs
+		"""
+		last = self.jobs.get(key)
+		return last is not None and last['status'] == 'finished' and last.get('inputs') == inputs
+
+	def canRun(self, key, inputs=None):
+		"""
+		Whether the job still has to run: not finished and fewer than maxAttempts attempts with the same inputs
+		"""
+		if self.isFinished(key, inputs):
+			return False
+		last = self.jobs.get(key)
+		return last is None or last.get('inputs') != inputs or self.attempts[key] < self.maxAttempts
+
+	def last(self, key):
+		"""
+		Last record of the job (None if it never ran)
+		"""
+		return self.jobs.get(key)
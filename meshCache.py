@@ -0,0 +1,108 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : meshCache.py
+# @Software : PyCharm
+
+import os
+import hashlib
+import pickle
+import tempfile
+
+# folder of the cached meshes, set MCANALYSIS_MESH_CACHE or change meshCache.cacheDir
+cacheDir = os.environ.get('MCANALYSIS_MESH_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'MCAnalysis', 'mesh'))
+# total size of the cache folder in bytes, the least recently used meshes are removed beyond it
+maxCacheSize = 512*1024**2
+# increase when the fiber generators or the geometry tests they use change so that older meshes are not reused
+# (2: orientation independent point-in-polygon test)
+cacheVersion = 2
+
+
+def _normalize(value):
+	"""
+	Hashable, order independent representation of the geometry inputs
+	"""
+	if isinstance(value, dict):
+		return tuple(sorted((repr(key), _normalize(each)) for key, each in value.items()))
+	if isinstance(value, (list, tuple)):
+		return tuple(_normalize(each) for each in value)
+	if hasattr(value, 'tolist'):
+		return _normalize(value.tolist())
+	return repr(value)
+
+
+def meshKey(component, inputs):
+	"""
+	Content address of one mesh component
+	:param component: 'core', 'cover' or 'bar'
+	:param inputs: geometry inputs the component depends on (nested dicts, lists, numbers)
+	:return: sha256 hex digest
+	"""
+	return hashlib.sha256(repr((cacheVersion, component, _normalize(inputs))).encode('utf-8')).hexdigest()
+
+
+def cachedMesh(component, inputs, build, cache=True):
+	"""
+	Return a mesh component from the cache, or build and store it
+	:param component: 'core', 'cover' or 'bar', stored separately so that the concrete meshes are reused
+		when only the bars change
+	:param inputs: geometry inputs the component depends on
+	:param build: function without arguments that generates the component
+	:param cache: use the cache or always build
+	:return: the value returned by build
+	"""
+	if not cache:
+		return build()
+	fileName = os.path.join(cacheDir, component+'-'+meshKey(component, inputs)+'.pkl')
+	try:
+		with open(fileName, 'rb') as f:
+			result = pickle.load(f)
+		os.utime(fileName)
+		return result
+	except (OSError, pickle.UnpicklingError, EOFError):
+		pass
+	result = build()
+	try:
+		if not os.path.exists(cacheDir):
+			os.makedirs(cacheDir, exist_ok=True)
+		handle, tempName = tempfile.mkstemp(dir=cacheDir, suffix='.tmp')
+		with os.fdopen(handle, 'wb') as f:
+			pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tempName, fileName)
+		evictMeshCache()
+	except OSError as error:
+		print('Mesh cache is not written:', error)
+	return result
+
+
+def evictMeshCache(maxSize=None):
+	"""
+	Remove the least recently used meshes until the cache folder is not larger than maxSize
+	:param maxSize: size limit in bytes (default: maxCacheSize)
+	"""
+	maxSize = maxCacheSize if maxSize is None else maxSize
+	entries = []
+	for name in os.listdir(cacheDir) if os.path.isdir(cacheDir) else []:
+		if name.endswith('.pkl'):
+			try:
+				stat = os.stat(os.path.join(cacheDir, name))
+			except OSError:
+				continue
+			entries.append((stat.st_mtime, stat.st_size, name))
+	totalSize = sum(each[1] for each in entries)
+	for mtime, size, name in sorted(entries):
+		if totalSize <= maxSize:
+			break
+		try:
+			os.remove(os.path.join(cacheDir, name))
+		except OSError:
+			pass
+		totalSize -= size
+
+
+def clearMeshCache():
+	"""
+	Remove all cached meshes
+	"""
+	evictMeshCache(0)
@@ -7,45 +7,61 @@
 ######################################################################################
 ######################################################################################
 import numpy as np
-import math
-def is_in_2d_polygon(point, vertices):
-    px = point[0]
-    py = point[1]
-    angle_sum = 0
-
-    size = len(vertices)
-    if size < 3:
+def _polygonEdges(vertices):
+    """
+    Start and end points of the edges of a polygon, a repeated closing vertex is dropped
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)[:, :2]
+    if len(vertices) > 1 and np.array_equal(vertices[0], vertices[-1]):
+        vertices = vertices[:-1]
+    if len(vertices) < 3:
         raise ValueError("len of vertices < 3")
-    j = size - 1
-    for i in range(0, size):
-        sx = vertices[i][0]
-        sy = vertices[i][1]
-        tx = vertices[j][0]
-        ty = vertices[j][1]
+    return vertices, np.roll(vertices, 1, axis=0)
 
-        # ͨжϵ㵽ֱͨߵľǷΪ0жϵǷڱ
-        # y = kx + b, -y + kx + b = 0
-        k = (sy - ty) / (sx - tx + 0.000000000001)  # 0
-        b = sy - k * sx
-        dis = np.abs(k * px - 1 * py + b) / np.sqrt(k * k + 1)
-        if dis < 0.000001:  # õֱ
-            if sx <= px <= tx or tx <= px <= sx:  # õڱߵ֮䣬˵ڱ
-                return True
+def _crossingInside(points, vertices):
+    """
+    Crossing-number test of all points against one polygon (either orientation)
+    """
+    s, t = _polygonEdges(vertices)
+    px, py = points[:, 0:1], points[:, 1:2]
+    sx, sy, tx, ty = s[:, 0], s[:, 1], t[:, 0], t[:, 1]
+    straddle = (sy > py) != (ty > py)
+    dy = np.where(ty == sy, 1.0, ty - sy)
+    xCross = sx + (py - sy) * (tx - sx) / dy
+    return np.count_nonzero(straddle & (px < xCross), axis=1) % 2 == 1
 
-        # н
-        angle = math.atan2(sy - py, sx - px) - math.atan2(ty - py, tx - px)
-        # angleҪ-е֮
-        if angle >= math.pi:
-            angle = angle - math.pi * 2
-        elif angle <= -math.pi:
-            angle = angle + math.pi * 2
+def _onEdge(points, vertices, tol):
+    """
+    Points whose distance to an edge of the polygon is smaller than tol
+    """
+    s, t = _polygonEdges(vertices)
+    edge = t - s
+    length2 = np.maximum(np.sum(edge ** 2, axis=1), 1e-300)
+    relative = points[:, None, :] - s[None, :, :]
+    ratio = np.clip(np.sum(relative * edge[None, :, :], axis=2) / length2, 0.0, 1.0)
+    distance2 = np.sum((relative - ratio[:, :, None] * edge[None, :, :]) ** 2, axis=2)
+    return np.any(distance2 < tol * tol, axis=1)
 
-        # ۻ
-        angle_sum += angle
-        j = i
+def pointsInPolygon(points, vertices, holes=None, tol=1e-6):
+    """
+    Classify many points against a polygon with holes in one vectorized crossing-number pass
+    Input: points-[(x1,y1),(x2,y2),...]
+         vertices-polygon vertices [(x1,y1),(x2,y2),...], closed or not, either orientation
+         holes-vertices of each hole [[(x1,y1),...],...] or None
+         tol-points closer than tol to an edge of the polygon or of a hole belong to the region
+    Output: boolean array, True for the points inside the region or on its border
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=np.float64))[:, :2]
+    inside = _crossingInside(points, vertices) | _onEdge(points, vertices, tol)
+    for eachHole in (holes if holes is not None else []):
+        inside &= ~_crossingInside(points, eachHole) | _onEdge(points, eachHole, tol)
+    return inside
 
-    # нǺ2*pi֮СһǳСΪ
-    return np.abs(angle_sum - math.pi * 2) < 0.00000000001
+def is_in_2d_polygon(point, vertices):
+    """
+    Single point version of pointsInPolygon (points on the edges are inside)
+    """
+    return bool(pointsInPolygon([point], vertices)[0])
 ########################################################################################
 #
 # closedNodeValues=[[0,0],[2,0],[2,1],[1,1],[1,2],[2,2],[2,3],[0,3],[0,0]]
@@ -0,0 +1,142 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : sectionBundle.py
+# @Software : PyCharm
+
+import os
+import json
+import time
+import tempfile
+import contextlib
+import numpy as np
+from jobJournal import inputsHash
+
+# version of the bundle layout, increased when the stored arrays change (2: metadata)
+bundleVersion = 2
+bundleName = 'section.npz'
+# units of the stored arrays, those of Material and of the fiber generators
+bundleUnits = {'length': 'm', 'area': 'm2', 'stress': 'kPa', 'force': 'kN', 'moment': 'kN.m', 'curvature': '1/m'}
+# seconds a writer waits for the lock of a bundle, and age after which a lock left by a killed process is removed
+lockTimeout = 120.0
+staleLockAge = 60.0
+# arrays of a section and the text files of the former layout
+bundleFields = {'coverFiber': 'coverDivide.txt', 'coreFiber': 'coreDivide.txt', 'barFiber': 'barDivide.txt',
+				'coverParameter': 'coverParameter.txt', 'coreParameter': 'coreParameter.txt',
+				'barParameter': 'barParameter.txt', 'yieldCurvature': 'yieldCurvature.txt'}
+
+
+def bundlePath(sectPath):
+	"""
+	Path of the section bundle in a section folder
+	"""
+	return os.path.join(sectPath, bundleName)
+
+
+def loadSection(sectPath):
+	"""
+	Read all arrays of a section bundle at full precision.
+	Sections written before the bundle existed are read from their text files.
+	:param sectPath: folder of the section
+	:return: dict {field: float64 array}, fibers are (n,3) arrays [[y,z,area],...]
+	"""
+	section = {}
+	fileName = bundlePath(sectPath)
+	if os.path.exists(fileName):
+		with np.load(fileName) as bundle:
+			version = int(bundle['version'])
+			if version > bundleVersion:
+				raise ValueError(fileName+" was written by a newer version (bundle version "+str(version)+")")
+			section = {key: bundle[key] for key in bundle.files if key not in ('version', 'metadata')}
+	for key, textFile in bundleFields.items():
+		if key not in section and os.path.exists(os.path.join(sectPath, textFile)):
+			section[key] = np.loadtxt(os.path.join(sectPath, textFile))
+	for key in ('coverFiber', 'coreFiber', 'barFiber'):
+		if key in section:
+			section[key] = section[key].reshape(-1, 3)
+	return section
+
+
+def sectionMetadata(sectPath):
+	"""
+	Metadata of a section bundle
+	:param sectPath: folder of the section
+	:return: {'name', 'units', 'inputs': {field: hash of the source inputs of the field}, 'inputsHash': hash of all
+		of them}, None for a bundle without metadata
+	"""
+	fileName = bundlePath(sectPath)
+	if not os.path.exists(fileName):
+		return None
+	with np.load(fileName) as bundle:
+		return json.loads(str(bundle['metadata'])) if 'metadata' in bundle.files else None
+
+
+@contextlib.contextmanager
+def _bundleLock(sectPath):
+	"""
+	Lock file of a section bundle, so that concurrent writers of the same section merge their arrays one after the
+	other instead of replacing each other's writes
+	"""
+	lockName = bundlePath(sectPath)+'.lock'
+	start = time.time()
+	while True:
+		try:
+			handle = os.open(lockName, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+			break
+		except FileExistsError:
+			try:
+				if time.time()-os.path.getmtime(lockName) > staleLockAge:
+					os.remove(lockName)
+					continue
+			except OSError:
+				continue
+			if time.time()-start > lockTimeout:
+				raise TimeoutError(lockName+" is held by another process, remove it if no other process writes the section")
+			time.sleep(0.01)
+	os.close(handle)
+	try:
+		yield
+	finally:
+		os.remove(lockName)
+
+
+def saveSection(sectPath, inputs=None, **arrays):
+	"""
+	Add or replace arrays of a section bundle, e.g. saveSection('CircularPier', yieldCurvature=[kx, ky]).
+	The other arrays of the bundle are kept, concurrent writers of the same section wait for each other (lock file
+	section.npz.lock) and the file is replaced atomically. The bundle also stores the section name, the units
+	(bundleUnits) and a hash of the source inputs of every field, see sectionMetadata.
+	:param sectPath: folder of the section (created if missing)
+	:param inputs: JSON serializable inputs the arrays were generated from, e.g. the geometry of the mesh or the
+		material grade (None uses the arrays themselves)
+	:param arrays: fields of bundleFields
+	"""
+	unknown = set(arrays)-set(bundleFields)
+	if unknown:
+		raise ValueError("Unknown section fields: "+", ".join(sorted(unknown)))
+	if not os.path.exists(sectPath):
+		os.makedirs(sectPath, exist_ok=True)
+	arrays = {key: np.asarray(value, dtype=np.float64) for key, value in arrays.items()}
+	fieldHash = inputsHash(inputs if inputs is not None else {key: value.tolist() for key, value in arrays.items()})
+	fileName = bundlePath(sectPath)
+	with _bundleLock(sectPath):
+		section = {}
+		metadata = {}
+		if os.path.exists(fileName):
+			with np.load(fileName) as bundle:
+				section = {key: bundle[key] for key in bundle.files if key not in ('version', 'metadata')}
+				if 'metadata' in bundle.files:
+					metadata = json.loads(str(bundle['metadata']))
+		section.update(arrays)
+		fieldInputs = dict(metadata.get('inputs', {}), **{key: fieldHash for key in arrays})
+		metadata = {'name': os.path.basename(os.path.abspath(sectPath)), 'units': bundleUnits, 'inputs': fieldInputs,
+					'inputsHash': inputsHash(fieldInputs)}
+		handle, tempName = tempfile.mkstemp(dir=sectPath, suffix='.npz.tmp')
+		try:
+			with os.fdopen(handle, 'wb') as f:
+				np.savez(f, version=bundleVersion, metadata=json.dumps(metadata), **section)
+			os.replace(tempName, fileName)
+		except BaseException:
+			os.remove(tempName)
+			raise
@@ -4,15 +4,18 @@
 #    Date: 05/02/2020
 #  Environemet: Successfully excucted in python 3.6
 ######################################################################################
-import os
 import numpy as np
-import matplotlib.pyplot as plt
-from fiberGenerate import CircleSection,PolygonSection,figureSize
+from fiberGenerate import CircleSection,PolygonSection,figureSize,fiberArray
+from sectionBundle import saveSection
+from meshCache import cachedMesh
+from figureRender import submitFigure,drawCircleSection,drawPolygonSection
 ######################################################################################
-def circleSection(sectName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None):
+def circleSection(sectName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None,\
+                  cache=True,mesher="gmsh"):
     """
     #####################################################################
-    def circleSection(SectName, outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None)
+    def circleSection(SectName, outD,coverThick,outbarD,outbarDist,coreSize,coverSize,plot=False,inD=None,inBarD=None,inBarDist=None,
+                      cache=True,mesher="gmsh")
     Input:
     ---outD # the diameter of the outside circle
     ---coverThick # the thinckness of the cover concrete
@@ -20,13 +23,15 @@ def circleSection(sectName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize
     ---outbarDist # outside bar space
     ---coreSize # the size of core concrete fiber
     ---coverSize # the size of cover concrete fiber
-    ---plot #plot the fiber or not plot=True or False
+    ---plot #plot the fiber or not plot=True or False, rendered in the mode of figureRender.setRenderMode
     ---inD # the diameter of the inner circle,if not inD=None
     ---inBarD # inside bar diameter, if not inBarD=None
     ---inBarDist # inside bar space,if not inBarDist=None
+    ---cache # reuse the core, cover and bar fibers of identical inputs from the mesh cache (see meshCache)
+    ---mesher # core concrete mesher, "gmsh" triangles or "polar" ring-sector cells without gmsh
     Output:
     ---coreFiber,coverFiber,barFiber #core concrete, cover concrete anb bar fibers information
-       for eaxample coreFiber=[(y1,z1,area1),(y2,y2,area2),...], y1,z1 is the fiber coordinate values in loacal y-z plane
+       for eaxample coreFiber=array([[y1,z1,area1],[y2,y2,area2],...]) of shape (n,3), y1,z1 is the fiber coordinate values in loacal y-z plane
        area1 is the fiber area
     #####################################################################
     #######################---solid circle example---#####################
@@ -56,49 +61,49 @@ def circleSection(sectName,outD,coverThick,outbarD,outbarDist,coreSize,coverSize
     """
     circleInstance = CircleSection(coverThick, outD, inD)  # call the circle section generate class
     xListPlot, yListPlot = circleInstance.initSectionPlot()  # plot profile of the circle
+    geometry = {'section': 'circle', 'outD': outD, 'inD': inD, 'coverThick': coverThick}
     # generate core concrete fiber elements
-    coreFiber, pointsPlot, trianglesPlot = circleInstance.coreMesh(coreSize)
+    coreFiber, pointsPlot, trianglesPlot = cachedMesh('core', dict(geometry, coreSize=coreSize, mesher=mesher),
+                                                      lambda: circleInstance.coreMesh(coreSize, mesher), cache)
     # generate cover concrete fiber elements
-    coverFiber, coverXListPlot, coverYListPlot, xBorderPlot, yBorderPlot = circleInstance.coverMesh(coverSize)
+    coverFiber, coverXListPlot, coverYListPlot, xBorderPlot, yBorderPlot = cachedMesh('cover',
+        dict(geometry, coverSize=coverSize), lambda: circleInstance.coverMesh(coverSize), cache)
     # generate the bar fiber elements
-    barFiber, barXListPlot, barYListPlot = circleInstance.barMesh(outbarD, outbarDist, inBarD, inBarDist)
-    if not os.path.exists(sectName):
-        os.makedirs(sectName)
-    np.savetxt(sectName + "/coreDivide.txt", coreFiber, fmt="%0.6f %0.6f %0.6f")
-    np.savetxt(sectName + "/coverDivide.txt", coverFiber, fmt="%0.6f %0.6f %0.6f")
-    np.savetxt(sectName + "/barDivide.txt", barFiber, fmt="%0.6f %0.6f %0.6f")
+    barFiber, barXListPlot, barYListPlot = cachedMesh('bar',
+        dict(geometry, outbarD=outbarD, outbarDist=outbarDist, inBarD=inBarD, inBarDist=inBarDist),
+        lambda: circleInstance.barMesh(outbarD, outbarDist, inBarD, inBarDist), cache)
+    coreFiber, coverFiber, barFiber = fiberArray(coreFiber), fiberArray(coverFiber), fiberArray(barFiber)
+    saveSection(sectName, dict(geometry, coreSize=coreSize, coverSize=coverSize, mesher=mesher, outbarD=outbarD,
+                               outbarDist=outbarDist, inBarD=inBarD, inBarDist=inBarDist),
+                coreFiber=coreFiber, coverFiber=coverFiber, barFiber=barFiber)
 
     if plot==True:
-        if not os.path.exists('SectionFig/'):
-            os.makedirs('SectionFig/')
         outSideNode = {1: (-outD,-outD), 2: (outD,outD)}
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        for eachx, eachy in zip(xListPlot, yListPlot):
-            ax.plot(eachx, eachy, "r", linewidth=1, zorder=2)
-
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot)
-
-        for coverx, covery in zip(coverXListPlot, coverYListPlot):
-            ax.plot(coverx, covery, "r", linewidth=1, zorder=2)
-        for borderx, bordery in zip(xBorderPlot, yBorderPlot):
-            ax.plot(borderx, bordery, "r", linewidth=1, zorder=2)
-
-        for barx, bary in zip(barXListPlot, barYListPlot):
-            ax.scatter(barx, bary, s=10, c="k", zorder=3)
-        plt.savefig("SectionFig/"+sectName+".png")
-        plt.savefig("SectionFig/"+sectName+".eps")
-        plt.show()
-    else:
-        pass
+        submitFigure(drawCircleSection, (xListPlot, yListPlot, pointsPlot, trianglesPlot, coverXListPlot, coverYListPlot,
+                     xBorderPlot, yBorderPlot, barXListPlot, barYListPlot), "SectionFig/"+sectName,
+                     figureSize(outSideNode), ("png", "eps"))
     return coreFiber,coverFiber,barFiber
 ######################################################################################
 ######################################################################################
 ######################################################################################
+def _polygonBarMesh(sectInstance,coverThick,outBarD,outBarDist,autoBarMesh,userBarNodeDict,userBarEleDict,\
+                    inBarD=None,inBarDist=None):
+    """
+    Bar fibers of a polygon section, generated automatically or with the user bar lines added
+    """
+    barFiber, barXListPlot, barYListPlot = sectInstance.barMesh(coverThick, outBarD, outBarDist, inBarD, inBarDist)
+    if autoBarMesh==False:
+        barFiber2, barXListPlot2, barYListPlot2 = sectInstance.userBarMesh(userBarNodeDict,userBarEleDict)
+        barFiber = np.vstack((barFiber, barFiber2))
+        barXListPlot = barXListPlot + barXListPlot2
+        barYListPlot = barYListPlot + barYListPlot2
+    elif autoBarMesh!=True:
+        print("Please input True or False!")
+    return barFiber, barXListPlot, barYListPlot
+######################################################################################
 def polygonSection(sectName,outSideNode,outSideEle,coverThick,coreSize,coverSize,outBarD=None,outBarDist=None,\
                    plot=False,autoBarMesh=True,userBarNodeDict=None,userBarEleDict=None,inSideNode=None,\
-                   inSideEle=None,inBarD=None,inBarDist=None):
+                   inSideEle=None,inBarD=None,inBarDist=None,cache=True,mesher="gmsh"):
     """
     Input:
     ---outSideNode # the outside vertexes consecutively numbering and coordinate values in local y-z plane in dict container
@@ -116,9 +121,11 @@ def polygonSection(sectName,outSideNode,outSideEle,coverThick,coreSize,coverSize
     ---inSideEle # the inside vertexes loop consecutively numbering in list container
     ---inBarD #inside bar diameter
     ---inBarDist #inside bar space
+    ---cache # reuse the core, cover and bar fibers of identical inputs from the mesh cache (see meshCache)
+    ---mesher # core concrete mesher, "gmsh" triangles or "grid" clipped structured grid cells without gmsh
     Output:
     ---coreFiber,coverFiber,barFiber #core concrete, cover concrete anb bar fibers information
-       for eaxample coreFiber=[(y1,z1,area1),(y2,y2,area2),...], y1,z1 is the fiber coordinate values in loacal y-z plane
+       for eaxample coreFiber=array([[y1,z1,area1],[y2,y2,area2],...]) of shape (n,3), y1,z1 is the fiber coordinate values in loacal y-z plane
        area1 is the fiber area
 
     #####################################################################
@@ -203,99 +210,44 @@ def polygonSection(sectName,outSideNode,outSideEle,coverThick,coreSize,coverSize
 			 inSideNode,inSideEle,inBarD,inBarDist)
     ######################################################################
     """
+    geometry = {'section': 'polygon', 'outSideNode': outSideNode, 'outSideEle': outSideEle, 'inSideNode': inSideNode,
+                'inSideEle': inSideEle, 'coverThick': coverThick}
+    barInputs = dict(geometry, outBarD=outBarD, outBarDist=outBarDist, autoBarMesh=autoBarMesh,
+                     userBarNodeDict=userBarNodeDict, userBarEleDict=userBarEleDict, inBarD=inBarD, inBarDist=inBarDist)
     if inSideNode==None:
         sectInstance = PolygonSection(outSideNode, outSideEle)
         originalNodeListPlot = sectInstance.sectPlot()  # [([x1,x2],[y1,y2]),([].[])]
         outLineList, coverlineListPlot = sectInstance.coverLinePlot(coverThick)
-        coreFiber, pointsPlot, trianglesPlot = sectInstance.coreMesh(coreSize, outLineList)
-        coverFiber, outNodeReturnPlot, inNodeReturnPlot = sectInstance.coverMesh(coverSize, coverThick)
-        if autoBarMesh==True:
-            barFiber, barXListPlot, barYListPlot = sectInstance.barMesh(coverThick, outBarD, outBarDist)
-        elif autoBarMesh==False:
-            barFiber1, barXListPlot1, barYListPlot1 = sectInstance.barMesh(coverThick, outBarD, outBarDist)
-            barFiber2, barXListPlot2, barYListPlot2 = sectInstance.userBarMesh(userBarNodeDict,userBarEleDict)
-            barFiber = barFiber1 + barFiber2
-            barXListPlot = barXListPlot1 + barXListPlot2
-            barYListPlot = barYListPlot1 + barYListPlot2
-        else:
-            print("Please input True or False!")
+        coreFiber, pointsPlot, trianglesPlot = cachedMesh('core', dict(geometry, coreSize=coreSize, mesher=mesher),
+            lambda: sectInstance.coreMesh(coreSize, outLineList, mesher=mesher), cache)
+        coverFiber, outNodeReturnPlot, inNodeReturnPlot = cachedMesh('cover', dict(geometry, coverSize=coverSize),
+            lambda: sectInstance.coverMesh(coverSize, coverThick), cache)
+        barFiber, barXListPlot, barYListPlot = cachedMesh('bar', barInputs,
+            lambda: _polygonBarMesh(sectInstance, coverThick, outBarD, outBarDist, autoBarMesh,
+                                    userBarNodeDict, userBarEleDict), cache)
 
     else:
         sectInstance = PolygonSection(outSideNode, outSideEle, inSideNode, inSideEle)
         originalNodeListPlot = sectInstance.sectPlot()
         outLineList, coverlineListPlot = sectInstance.coverLinePlot(coverThick)
         inLineList, innerLineListPlot = sectInstance.innerLinePlot(coverThick)
-        coreFiber, pointsPlot, trianglesPlot = sectInstance.coreMesh(coreSize, outLineList, inLineList)
-        coverFiber, outNodeReturnPlot, inNodeReturnPlot = sectInstance.coverMesh(coverSize, coverThick)
-        if autoBarMesh==True:
-            barFiber, barXListPlot, barYListPlot = sectInstance.barMesh(coverThick, outBarD, outBarDist, inBarD, inBarDist)
-        elif autoBarMesh==False:
-            barFiber1, barXListPlot1, barYListPlot1 = sectInstance.barMesh(coverThick, outBarD, outBarDist, inBarD, inBarDist)
-            barFiber2, barXListPlot2, barYListPlot2 = sectInstance.userBarMesh(userBarNodeDict,userBarEleDict)
-            barFiber = barFiber1 + barFiber2
-            barXListPlot = barXListPlot1 + barXListPlot2
-            barYListPlot = barYListPlot1 + barYListPlot2
-        else:
-            print("Please input True or False!")
+        coreFiber, pointsPlot, trianglesPlot = cachedMesh('core', dict(geometry, coreSize=coreSize, mesher=mesher),
+            lambda: sectInstance.coreMesh(coreSize, outLineList, inLineList, mesher), cache)
+        coverFiber, outNodeReturnPlot, inNodeReturnPlot = cachedMesh('cover', dict(geometry, coverSize=coverSize),
+            lambda: sectInstance.coverMesh(coverSize, coverThick), cache)
+        barFiber, barXListPlot, barYListPlot = cachedMesh('bar', barInputs,
+            lambda: _polygonBarMesh(sectInstance, coverThick, outBarD, outBarDist, autoBarMesh,
+                                    userBarNodeDict, userBarEleDict, inBarD, inBarDist), cache)
+    coreFiber, coverFiber, barFiber = fiberArray(coreFiber), fiberArray(coverFiber), fiberArray(barFiber)
 
-    if not os.path.exists(sectName):
-        os.makedirs(sectName)
-    np.savetxt(sectName + "/coreDivide.txt", coreFiber, fmt="%0.6f %0.6f %0.6f")
-    np.savetxt(sectName + "/coverDivide.txt", coverFiber, fmt="%0.6f %0.6f %0.6f")
-    np.savetxt(sectName + "/barDivide.txt", barFiber, fmt="%0.6f %0.6f %0.6f")
+    saveSection(sectName, dict(barInputs, coreSize=coreSize, coverSize=coverSize, mesher=mesher),
+                coreFiber=coreFiber, coverFiber=coverFiber, barFiber=barFiber)
 
-    if inSideNode==None and plot==True:
-        if not os.path.exists('SectionFig/'):
-            os.makedirs('SectionFig/')
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        coverColor = "r"
-        coreColor = "b"
-        lineWid = 1
-        barMarkSize = 20
-        barColor = "k"
-        for each1 in originalNodeListPlot:
-            ax.plot(each1[0], each1[1], coverColor, lineWid, zorder=0)
-        for each2 in coverlineListPlot:
-            ax.plot(each2[0], each2[1], coverColor, lineWid, zorder=1)
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot, c=coreColor, lw=lineWid)
-        for i1 in range(len(outNodeReturnPlot) - 1):
-            ax.plot([inNodeReturnPlot[i1][0], outNodeReturnPlot[i1][0]],
-                    [inNodeReturnPlot[i1][1], outNodeReturnPlot[i1][1]],
-                    coverColor, linewidth=lineWid, zorder=0)
-        ax.scatter(barXListPlot, barYListPlot, s=barMarkSize, c=barColor, linewidth=lineWid, zorder=2)
-        plt.savefig("SectionFig/"+sectName+".png")
-        plt.savefig("SectionFig/"+sectName+".eps")
-        plt.show()
-    elif inSideNode!=None and plot==True:
-        if not os.path.exists('SectionFig/'):
-            os.makedirs('SectionFig/')
-        w, h = figureSize(outSideNode)
-        fig = plt.figure(figsize=(w, h))
-        ax = fig.add_subplot(111)
-        coverColor = "r"
-        coreColor = "b"
-        lineWid = 1
-        barMarkSize = 20
-        barColor = "k"
-        for each1 in originalNodeListPlot:
-            ax.plot(each1[0], each1[1], coverColor, lineWid, zorder=0)
-        for each2 in coverlineListPlot:
-            ax.plot(each2[0], each2[1], coverColor, lineWid, zorder=1)
-        for each3 in innerLineListPlot:
-            ax.plot(each3[0], each3[1], coverColor, lineWid, zorder=1)
-        ax.triplot(pointsPlot[:, 0], pointsPlot[:, 1], trianglesPlot, c=coreColor, lw=lineWid)
-        for i1 in range(len(outNodeReturnPlot) - 1):
-            ax.plot([inNodeReturnPlot[i1][0], outNodeReturnPlot[i1][0]],
-                    [inNodeReturnPlot[i1][1], outNodeReturnPlot[i1][1]],
-                    coverColor, linewidth=lineWid, zorder=0)
-        ax.scatter(barXListPlot, barYListPlot, s=barMarkSize, c=barColor, linewidth=lineWid, zorder=2)
-        plt.savefig("SectionFig/"+sectName+".png")
-        plt.savefig("SectionFig/"+sectName+".eps")
-        plt.show()
-    else:
-        pass
+    if plot==True:
+        lineListPlot = list(coverlineListPlot) if inSideNode==None else list(coverlineListPlot)+list(innerLineListPlot)
+        submitFigure(drawPolygonSection, (originalNodeListPlot, lineListPlot, pointsPlot, trianglesPlot,
+                     outNodeReturnPlot, inNodeReturnPlot, barXListPlot, barYListPlot), "SectionFig/"+sectName,
+                     figureSize(outSideNode), ("png", "eps"))
     return coreFiber,coverFiber,barFiber
 ######################################################################################
 # if __name__ == "__main__":
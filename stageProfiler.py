@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : stageProfiler.py
+# @Software : PyCharm
+
+import json
+import time
+import functools
+import tracemalloc
+
+
+class StageProfiler():
+	def __init__(self, logFile=None, memory=True):
+		"""
+		Wall time, CPU time and peak memory of the consecutive stages of a run
+		:param logFile: JSON-lines file, every finished run is appended as one line (None keeps the reports only)
+		:param memory: trace the peak memory of the Python and numpy allocations of every stage with tracemalloc,
+			which slows down allocation heavy stages. Python 3.8 has no tracemalloc.reset_peak: the tracing is then
+			restarted at every stage, so the peak only counts the memory allocated during the stage and not the
+			memory still held from the earlier stages, and if the tracing was started by the caller it is left
+			running and every stage reports the peak since it started
+		"""
+		self.logFile = logFile
+		self.memory = memory
+		self._run = None
+		self._stage = None
+		self._startedTracing = False
+
+	def begin(self, run, **context):
+		"""
+		Start a run, the first stage starts with lap
+		:param run: name of the run, e.g. 'MCAnalysis'
+		:param context: values stored with the report, e.g. sectName='CircularPier'
+		"""
+		self._run = dict(context, run=run, stages=[])
+		self._run['start'] = (time.perf_counter(), time.process_time())
+		self._stage = None
+		if self.memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self._startedTracing = True
+
+	def lap(self, stage):
+		"""
+		End the current stage and start the next one
+		:param stage: name of the next stage
+		"""
+		if self._run is None:
+			return
+		self._endStage()
+		if self.memory:
+			if hasattr(tracemalloc, 'reset_peak'):
+				tracemalloc.reset_peak()
+			elif self._startedTracing:
+				tracemalloc.stop()
+				tracemalloc.start()
+		self._stage = (stage, time.perf_counter(), time.process_time())
+
+	def _endStage(self):
+		if self._stage is None:
+			return
+		stage, wallStart, cpuStart = self._stage
+		record = {'stage': stage, 'wall': time.perf_counter()-wallStart, 'cpu': time.process_time()-cpuStart}
+		if self.memory:
+			record['peakMemory'] = tracemalloc.get_traced_memory()[1]
+		self._run['stages'].append(record)
+		self._stage = None
+
+	def finish(self):
+		"""
+		End the run and append it to the log file
+		:return: report {'run', context..., 'stages': [{'stage', 'wall', 'cpu' (seconds), 'peakMemory' (bytes)}],
+			'wall', 'cpu', 'peakMemory'}
+		"""
+		self._endStage()
+		report, self._run = self._run, None
+		wallStart, cpuStart = report.pop('start')
+		report['wall'] = time.perf_counter()-wallStart
+		report['cpu'] = time.process_time()-cpuStart
+		if self.memory:
+			report['peakMemory'] = max([each['peakMemory'] for each in report['stages']], default=0)
+			if self._startedTracing:
+				tracemalloc.stop()
+				self._startedTracing = False
+		report['time'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+		if self.logFile is not None:
+			with open(self.logFile, 'a') as f:
+				f.write(json.dumps(report)+'\n')
+		return report
+
+
+def profiled(method):
+	"""
+	Profile a method of an object with a profiler attribute (None disables it) and append the report to its
+	profileReport list, the method marks its stages with self.profiler.lap
+	"""
+	@functools.wraps(method)
+	def wrapper(self, *args, **kwargs):
+		if self.profiler is None:
+			return method(self, *args, **kwargs)
+		self.profiler.begin(method.__name__, **self.profileContext())
+		try:
+			return method(self, *args, **kwargs)
+		finally:
+			self.profileReport.append(self.profiler.finish())
+	return wrapper
@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : conftest.py
+# @Software : PyCharm
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+coverParameter = [-26800.0, -0.002, -0.004, 3.25e7]
+coreParameter = [-35000.0, -0.004, -0.015, 3.25e7]
+barParameter = [400e3, 510e3, 2e8, 2e6, 0.045, 0.1]
+
+
+def rectangle(b, h, ny, nz, y0=0.0, z0=0.0):
+	"""
+	Regular fibers [(y,z,area),...] of a b x h rectangle centred at (y0,z0)
+	"""
+	y = (np.arange(ny)+0.5)/ny*b-b/2+y0
+	z = (np.arange(nz)+0.5)/nz*h-h/2+z0
+	Y, Z = np.meshgrid(y, z)
+	return np.column_stack((Y.ravel(), Z.ravel(), np.full(Y.size, b*h/ny/nz)))
+
+
+@pytest.fixture
+def squareFibers():
+	"""
+	Cover, core and bar fibers of a 0.6 x 0.6 section with 0.05 cover and six bars
+	"""
+	core = rectangle(0.5, 0.5, 10, 10)
+	cover = np.vstack((rectangle(0.6, 0.05, 12, 1, 0, 0.275), rectangle(0.6, 0.05, 12, 1, 0, -0.275),
+					   rectangle(0.05, 0.5, 1, 10, 0.275, 0), rectangle(0.05, 0.5, 1, 10, -0.275, 0)))
+	bar = np.array([(y, z, 3.14e-4) for y in (-0.22, 0.0, 0.22) for z in (-0.22, 0.22)])
+	return cover, core, bar
+
+
+@pytest.fixture
+def squareSection(squareFibers, tmp_path):
+	"""
+	Section bundle of the square section in a scratch folder, the working directory is moved there
+	:return: section folder
+	"""
+	from sectionBundle import saveSection
+	cover, core, bar = squareFibers
+	sectPath = str(tmp_path/'Square')
+	yieldCurvature = 2*barParameter[0]/barParameter[2]/0.6
+	saveSection(sectPath, coverFiber=cover, coreFiber=core, barFiber=bar, coverParameter=coverParameter,
+				coreParameter=coreParameter, barParameter=barParameter, yieldCurvature=[yieldCurvature, yieldCurvature])
+	cwd = os.getcwd()
+	os.chdir(tmp_path)
+	yield sectPath
+	os.chdir(cwd)
@@ -0,0 +1,150 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_batchJournal.py
+# @Software : PyCharm
+
+import os
+import json
+import multiprocessing
+import pytest
+
+import batchRunner
+from jobJournal import JobJournal, inputsHash
+
+# the stand-in jobs are passed to the workers by forking the test process
+forkOnly = pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='needs forked workers')
+
+
+def fakeSection(task):
+	spec, workDir, plot = task
+	sectPath = os.path.join(workDir, spec['name'])
+	os.makedirs(sectPath, exist_ok=True)
+	with open(os.path.join(workDir, 'calls.txt'), 'a') as f:
+		f.write(spec['name']+'|section\n')
+	return spec['name'], sectPath, None
+
+
+def fakeAnalysis(task):
+	spec, sectPath, axialLoad, workDir, plot = task
+	key = batchRunner.unitKey(spec['name'], spec['direction'], axialLoad)
+	with open(os.path.join(workDir, 'calls.txt'), 'a') as f:
+		f.write(key+'\n')
+	if spec['name'] == 'Crash' and axialLoad == 2.0:
+		os._exit(9)
+	return {'name': spec['name'], 'axialLoad': axialLoad, 'direction': spec['direction'], 'status': 'finished',
+			'resultDir': os.path.join(workDir, key), 'yieldMoment': 10*axialLoad}
+
+
+@pytest.fixture
+def fakeJobs(monkeypatch, tmp_path):
+	monkeypatch.setattr(batchRunner, '_sectionJob', fakeSection)
+	monkeypatch.setattr(batchRunner, '_analysisJob', fakeAnalysis)
+	workDir = str(tmp_path/'batchRuns')
+	os.makedirs(workDir)
+
+	def calls():
+		with open(os.path.join(workDir, 'calls.txt')) as f:
+			return f.read().split()
+	return workDir, calls
+
+
+def section(name, axialLoads):
+	return dict(batchRunner.sectionDefaults, name=name, axialLoads=axialLoads, outD=1.0, outBarD=0.02, outBarDist=0.1)
+
+
+def test_journalReplay(tmp_path):
+	fileName = str(tmp_path/'journal.jsonl')
+	journal = JobJournal(fileName, maxAttempts=2)
+	journal.record('A', 'started', 'x')
+	journal.record('A', 'failed', 'x', error='diverged')
+	journal.record('B', 'started', 'y')
+	journal.record('B', 'finished', 'y', result={'value': 1})
+	journal.record('C', 'started', 'z')
+	with open(fileName, 'a') as f:
+		f.write('{"key": "C", "status": "fin')  # killed during the write
+	journal = JobJournal(fileName, maxAttempts=2)
+	assert journal.isFinished('B', 'y') and not journal.isFinished('B', 'other inputs')
+	assert journal.attempts['A'] == 1 and journal.canRun('A', 'x')
+	# C was started when the process was killed, the truncated record is ignored
+	assert journal.last('C')['status'] == 'started' and journal.attempts['C'] == 1
+	journal.record('C', 'interrupted', 'z')
+	assert journal.attempts['C'] == 0
+	journal.record('A', 'started', 'x')
+	journal = JobJournal(fileName, maxAttempts=2)
+	assert journal.last('C')['status'] == 'interrupted'
+	assert not journal.canRun('A', 'x') and journal.canRun('A', 'new inputs')
+	with open(fileName) as f:
+		lines = f.read().split('\n')
+	# the records after the truncated one start on their own line
+	truncated = lines.index('{"key": "C", "status": "fin')
+	assert [json.loads(line)['status'] for line in lines[truncated+1:] if line] == ['interrupted', 'started']
+
+
+def test_analysisInputsIgnoreOtherAxialLoads():
+	spec = section('A', [1.0, 2.0])
+	inputs = inputsHash([dict(spec, axialLoads=None), 'A', 1.0])
+	assert inputs == inputsHash([dict(section('A', [1.0, 2.0, 3.0]), axialLoads=None), 'A', 1.0])
+	assert inputs != inputsHash([dict(section('A', [1.0, 2.0]), moment=5.0, axialLoads=None), 'A', 1.0])
+
+
+@forkOnly
+def test_killAndResume(fakeJobs):
+	workDir, calls = fakeJobs
+	table = [section('A', [1.0, 2.0]), section('B', [3.0])]
+	journalFile = os.path.join(workDir, 'journal.jsonl')
+	rows = batchRunner.runBatch(table, workDir, 2, journal=JobJournal(journalFile))
+	assert [row['status'] for row in rows] == ['finished']*3
+	# the batch is killed while B|X|3 runs after its inputs changed, the last record is cut short
+	table[1]['moment'] = 1.0
+	journal = JobJournal(journalFile)
+	journal.record('B|section', 'started', inputsHash(dict(table[1], axialLoads=None)))
+	with open(journalFile, 'a') as f:
+		f.write('{"key": "B|sect')
+	os.remove(os.path.join(workDir, 'calls.txt'))
+	# a restart with one more axial load only runs B and the new analysis of A
+	table[0]['axialLoads'] = [1.0, 2.0, 4.0]
+	rows = batchRunner.runBatch(table, workDir, 2, journal=JobJournal(journalFile))
+	assert sorted(calls()) == ['A|X|4.0', 'B|X|3.0', 'B|section']
+	assert [(row['axialLoad'], row['status']) for row in rows] == [(1.0, 'finished'), (2.0, 'finished'),
+																	(4.0, 'finished'), (3.0, 'finished')]
+	assert JobJournal(journalFile).attempts['B|section'] == 2
+
+
+@forkOnly
+def test_brokenPoolChargesTheCrashingUnit(fakeJobs):
+	workDir, calls = fakeJobs
+	table = [section('Crash', [1.0, 2.0, 3.0]), section('Other', [4.0, 5.0])]
+	journalFile = os.path.join(workDir, 'journal.jsonl')
+	rows = batchRunner.runBatch(table, workDir, 3, journal=JobJournal(journalFile))
+	status = {(row['name'], row['axialLoad']): row['status'] for row in rows}
+	assert status == {('Crash', 1.0): 'finished', ('Crash', 2.0): 'failed', ('Crash', 3.0): 'finished',
+					  ('Other', 4.0): 'finished', ('Other', 5.0): 'finished'}
+	journal = JobJournal(journalFile)
+	assert journal.attempts['Crash|X|2.0'] == 1
+	assert all(journal.attempts[key] == 1 for key in journal.jobs if key != 'Crash|X|2.0')
+	# the crashing unit is charged on every restart until it is given up
+	for i in range(2):
+		rows = batchRunner.runBatch(table, workDir, 3, journal=JobJournal(journalFile))
+	assert JobJournal(journalFile).attempts['Crash|X|2.0'] == 3
+	rows = batchRunner.runBatch(table, workDir, 3, journal=JobJournal(journalFile))
+	assert rows[1]['error'].startswith('given up after 3 attempts')
+
+
+@forkOnly
+def test_closeAxialLoadsHaveTheirOwnKeys(fakeJobs):
+	workDir, calls = fakeJobs
+	table = [section('A', [12345.67, 12345.68])]
+	journalFile = os.path.join(workDir, 'journal.jsonl')
+	rows = batchRunner.runBatch(table, workDir, 2, journal=JobJournal(journalFile))
+	assert [(row['axialLoad'], row['status']) for row in rows] == [(12345.67, 'finished'), (12345.68, 'finished')]
+	assert sorted(calls()) == ['A|X|12345.67', 'A|X|12345.68', 'A|section']
+	journal = JobJournal(journalFile)
+	assert journal.last('A|X|12345.67')['result']['yieldMoment'] == 123456.7
+	assert journal.last('A|X|12345.68')['result']['yieldMoment'] == 123456.8
+	# both analyses are taken from the journal on a restart
+	os.remove(os.path.join(workDir, 'calls.txt'))
+	rows = batchRunner.runBatch(table, workDir, 2, journal=JobJournal(journalFile))
+	assert [row['yieldMoment'] for row in rows] == [123456.7, 123456.8]
+	assert not os.path.exists(os.path.join(workDir, 'calls.txt'))
@@ -0,0 +1,22 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_batchRunner.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+
+import batchRunner
+
+
+def test_unitDirKeepsTheFullAxialLoad(tmp_path):
+	workDir = str(tmp_path/'batchRuns')
+	first = batchRunner.unitDir(workDir, 'Pier', 'X', 12345.67)
+	second = batchRunner.unitDir(workDir, 'Pier', 'X', 12345.68)
+	assert first != second
+	assert os.path.basename(first) == 'X-12345.67' and os.path.basename(second) == 'X-12345.68'
+	# the same load as int, float or numpy float gives the same folder
+	assert batchRunner.unitDir(workDir, 'Pier', 'Y', 1000) == batchRunner.unitDir(workDir, 'Pier', 'Y', np.float64(1000.0))
+	assert os.path.dirname(first) == os.path.join(workDir, 'Pier')
@@ -0,0 +1,86 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_bilinearIdealization.py
+# @Software : PyCharm
+
+import numpy as np
+import pytest
+
+from bilinearIdealization import bilinearIdealize
+
+
+def baselineLoop(sectCurvature, sectMoment, barYieldIndex, crackIndex):
+	"""
+	Equivalent yield moment of the former MC.MCCurve, copied from it
+	"""
+	barYieldCurvature = sectCurvature[barYieldIndex]
+	barYieldMoment = sectMoment[barYieldIndex]
+	ultimateCurvature = sectCurvature[crackIndex]
+	momentMaxMoment = max(sectMoment[:crackIndex+1])
+	totArea=np.trapz(sectMoment[:crackIndex], sectCurvature[:crackIndex])
+	barYieldX=barYieldCurvature
+	barYieldY=barYieldMoment
+	tanXY=barYieldY/barYieldX
+
+	epsilon=0.001*totArea
+	low=0.0
+	high=momentMaxMoment
+	momentEffictive=(low+high)/2.0
+	while abs(momentEffictive*ultimateCurvature-momentEffictive*0.5*momentEffictive/float(tanXY)-totArea)>=epsilon:
+		if momentEffictive*ultimateCurvature-momentEffictive/float(tanXY)*momentEffictive*0.5<totArea:
+			low=momentEffictive
+		else:
+			high=momentEffictive
+		momentEffictive=(high+low)/2.0
+
+	curvatureEffective=momentEffictive/float(tanXY)
+	return momentEffictive, curvatureEffective, totArea
+
+
+def curve(nSteps, maxCurvature=0.03, peak=1000.0):
+	"""
+	Smooth moment curvature curve with hardening up to the peak and softening after, fixed steps
+	"""
+	curvature = np.linspace(0.0, maxCurvature, nSteps+1)
+	moment = peak*(1.0-np.exp(-curvature/0.003))*(1.0-4.0*(curvature/maxCurvature-0.5).clip(0.0)**2)
+	return curvature, moment
+
+
+@pytest.mark.parametrize('nSteps', [20, 100, 400])
+def test_matchesBaselineLoop(nSteps):
+	curvature, moment = curve(nSteps)
+	yieldIndex = nSteps//10
+	for crackIndex in (2, nSteps//2, nSteps-3, nSteps):
+		result = bilinearIdealize(curvature, moment, yieldIndex, crackIndex)
+		assert result['ultimateCurvature'] == curvature[crackIndex] and result['yieldMoment'] == moment[yieldIndex]
+		assert result['maxMoment'] == max(moment[:crackIndex+1])
+		effectiveMoment, effectiveCurvature, area = baselineLoop(curvature, moment, yieldIndex, crackIndex)
+		# bit-for-bit
+		assert result['effectiveMoment'] == effectiveMoment
+		assert result['effectiveCurvature'] == effectiveCurvature
+
+
+def test_closedForm():
+	for nSteps in (20, 100, 400):
+		curvature, moment = curve(nSteps)
+		yieldIndex, crackIndex = nSteps//10, nSteps-1
+		effectiveMoment, effectiveCurvature, area = baselineLoop(curvature, moment, yieldIndex, crackIndex)
+		result = bilinearIdealize(curvature, moment, yieldIndex, crackIndex, tol=None)
+		Me, ku, k = result['effectiveMoment'], result['ultimateCurvature'], moment[yieldIndex]/curvature[yieldIndex]
+		assert abs(Me*ku-Me**2/(2*k)-area) < 1e-10*area
+		# the bisection stops within 0.1% of the area
+		assert abs(effectiveMoment-Me)*(ku-Me/k) <= 1e-3*area
+
+
+def test_batchedCurves():
+	curves = [curve(100, maxCurvature, peak) for maxCurvature, peak in ((0.02, 800.0), (0.03, 1000.0), (0.05, 1500.0))]
+	curvature, moment = np.array([each[0] for each in curves]), np.array([each[1] for each in curves])
+	yieldIndex, ultimateIndex = [8, 10, 12], [90, 100, 70]
+	for tol in (0.001, None):
+		results = bilinearIdealize(curvature, moment, yieldIndex, ultimateIndex, tol=tol)
+		for i in range(3):
+			single = bilinearIdealize(curvature[i], moment[i], yieldIndex[i], ultimateIndex[i], tol=tol)
+			for key, value in single.items():
+				assert results[key][i] == value
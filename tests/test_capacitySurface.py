@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_capacitySurface.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+
+from MCAnalysis import MC, rotateFibers
+from capacitySurface import capacitySurface, sectionSymmetry, canonicalAngle
+from sectionBundle import saveSection, loadSection
+
+
+def resultRows(sectPath):
+	with open(os.path.join(sectPath, 'capacitySurface.txt')) as f:
+		lines = f.read().splitlines()
+	return [line for line in lines if not line.startswith('#')], [line for line in lines if line.startswith('#')]
+
+
+def test_rotateFibers():
+	fibers = np.array([[1.0, 0.0, 0.1], [0.0, 2.0, 0.2]])
+	np.testing.assert_allclose(rotateFibers(fibers, 90), [[0.0, 1.0, 0.1], [-2.0, 0.0, 0.2]], atol=1e-15)
+	np.testing.assert_array_equal(rotateFibers(fibers, 0), fibers)
+
+
+def test_symmetry(squareSection, squareFibers):
+	assert sectionSymmetry(squareSection) == (True, True)
+	assert [canonicalAngle(angle, True, True) for angle in (30, 150, 210, 330)] == [30]*4
+	assert canonicalAngle(150, False, True) == 150 and canonicalAngle(210, False, True) == 150
+	assert canonicalAngle(150, True, False) == 30 and canonicalAngle(330, True, False) == 210
+	cover, core, bar = squareFibers
+	# moving the two bars at y=-0.22 breaks the symmetry about the z axis (y to -y) only
+	bar = bar.copy()
+	bar[:2, 0] += 0.01
+	saveSection(squareSection, barFiber=bar)
+	assert sectionSymmetry(squareSection) == (False, True)
+
+
+def test_mirroredDirections(squareSection):
+	results = []
+	for angle in (30, 150, 330):
+		mc = MC('Square', angle, sectPath=squareSection)
+		mc.MCAnalysis(1000, 0, numIncr=50, recordMode='memory', backend='numpy')
+		mc.MCCurve(plot=False)
+		results.append(mc.curveResult)
+	for name, value in results[0].items():
+		np.testing.assert_allclose([results[1][name], results[2][name]], value, rtol=1e-9)
+
+
+def test_resume(squareSection):
+	axialLoads = [0.0, 1000.0]
+	surface = capacitySurface('Square', axialLoads, nAngles=8, numIncr=50, backend='numpy', nWorkers=2)
+	rows, header = resultRows(squareSection)
+	# 0, 45 and 90 degrees represent all eight directions of the doubly symmetric section
+	assert len(rows) == 2*3
+	capacity = np.hypot(surface[:, :, 1], surface[:, :, 2])
+	np.testing.assert_array_equal(capacity[:, [0, 1, 2, 1, 0, 1, 2, 1]], capacity)
+	# interrupted after four points: only the two missing points run again
+	with open(os.path.join(squareSection, 'capacitySurface.txt'), 'w') as f:
+		f.write('\n'.join(header+rows[:4])+'\n')
+	resumed = capacitySurface('Square', axialLoads, nAngles=8, numIncr=50, backend='numpy', nWorkers=2)
+	resumedRows, resumedHeader = resultRows(squareSection)
+	assert resumedHeader == header and resumedRows[:4] == rows[:4] and sorted(resumedRows) == sorted(rows)
+	np.testing.assert_array_equal(resumed, surface)
+	# a complete file is reused as it is
+	capacitySurface('Square', axialLoads, nAngles=8, numIncr=50, backend='numpy', nWorkers=2)
+	assert resultRows(squareSection) == (resumedRows, header)
+
+
+def test_changedInputs(squareSection):
+	axialLoads = [1000.0]
+	capacitySurface('Square', axialLoads, nAngles=4, numIncr=50, backend='numpy', nWorkers=1)
+	rows, header = resultRows(squareSection)
+	# another analysis setting
+	capacitySurface('Square', axialLoads, nAngles=4, numIncr=40, backend='numpy', nWorkers=1)
+	changedRows, changedHeader = resultRows(squareSection)
+	assert changedHeader != header and len(changedRows) == len(rows)
+	assert not set(changedRows) & set(rows)
+	# an edited section bundle
+	yieldCurvature = loadSection(squareSection)['yieldCurvature']
+	saveSection(squareSection, yieldCurvature=1.1*yieldCurvature)
+	capacitySurface('Square', axialLoads, nAngles=4, numIncr=40, backend='numpy', nWorkers=1)
+	editedRows, editedHeader = resultRows(squareSection)
+	assert editedHeader not in (header, changedHeader) and len(editedRows) == len(rows)
+	assert not set(editedRows) & set(changedRows)
+	# an older file without inputs hash is not reused either
+	with open(os.path.join(squareSection, 'capacitySurface.txt'), 'w') as f:
+		f.write('\n'.join(editedRows)+'\n')
+	capacitySurface('Square', axialLoads, nAngles=4, numIncr=40, backend='numpy', nWorkers=1)
+	assert resultRows(squareSection) == (editedRows, editedHeader)
@@ -0,0 +1,43 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_fiberLumping.py
+# @Software : PyCharm
+
+import numpy as np
+
+from FiberSection import FiberSection
+from fiberLumping import lumpSection, extremeFibers
+from conftest import rectangle, coverParameter, coreParameter, barParameter
+
+
+def test_lumpingKeepsMomentsAndExtremeFibers(squareFibers):
+	cover, core, bar = squareFibers
+	core = rectangle(0.5, 0.5, 40, 40)
+	for axis in (0, 1):
+		lumpedCover, lumpedCore, lumpedBar, report = lumpSection(cover, core, bar, axis, 1e-3)
+		assert report['secondMomentError'] <= 1e-3 and report['fibers'][1] < len(core)
+		for before, after in ((cover, lumpedCover), (core, lumpedCore), (bar, lumpedBar)):
+			assert abs(np.sum(after[:, 2])-np.sum(before[:, 2])) < 1e-12
+			for k in (0, 1):
+				assert abs(np.sum(after[:, 2]*after[:, k])-np.sum(before[:, 2]*before[:, k])) < 1e-12
+		for before, after in ((cover, lumpedCover), (core, lumpedCore)):
+			# the extreme fibers are kept unchanged, in front of the strips
+			extreme = before[extremeFibers(before, axis)]
+			np.testing.assert_array_equal(after[:len(extreme)], extreme)
+			np.testing.assert_array_equal(np.sort(after[extremeFibers(after, axis), axis]), np.sort(extreme[:, axis]))
+
+
+def test_lumpedLimitStrains(squareFibers):
+	cover, core, bar = squareFibers
+	core = rectangle(0.5, 0.5, 40, 40)
+	full = FiberSection(cover, core, bar, coverParameter, coreParameter, barParameter)
+	lumped = FiberSection(*lumpSection(cover, core, bar, 0, 1e-3)[:3], coverParameter, coreParameter, barParameter)
+	fullStrain = full.MCAnalysis(2000, 0, 'X', 2e-4, 100)[1][:, :, 1]
+	lumpedStrain = lumped.MCAnalysis(2000, 0, 'X', 2e-4, 100)[1][:, :, 1]
+	# the outermost core and bar strains, which decide the limit states, follow the full section
+	for fullSlice, lumpedSlice in ((full.coreSlice, lumped.coreSlice), (full.barSlice, lumped.barSlice)):
+		for extreme in (np.min, np.max):
+			reference = extreme(fullStrain[:, fullSlice], axis=1)
+			assert np.all(np.abs(extreme(lumpedStrain[:, lumpedSlice], axis=1)-reference) <= 0.02*np.abs(reference)+1e-6)
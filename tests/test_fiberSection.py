@@ -0,0 +1,83 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_fiberSection.py
+# @Software : PyCharm
+
+import numpy as np
+import pytest
+
+from FiberSection import FiberSection
+from MCAnalysis import MC
+from conftest import coverParameter, coreParameter, barParameter
+
+
+def squareSection(fibers):
+	return FiberSection(*fibers, coverParameter, coreParameter, barParameter)
+
+
+def test_elasticBranch(squareFibers):
+	# without concrete area the section is the six bars, linear elastic up to the yield strain
+	cover, core, bar = [each.copy() for each in squareFibers]
+	cover[:, 2] = core[:, 2] = 0.0
+	momentCurvature, stressStrain = squareSection((cover, core, bar)).MCAnalysis(500, 0, 'X', 1e-4, 20)
+	Es = barParameter[2]
+	assert np.max(np.abs(stressStrain[:, -6:, 1])) < barParameter[0]/Es
+	EI = Es*np.sum(bar[:, 2]*bar[:, 0]**2)
+	np.testing.assert_allclose(momentCurvature[1:, 0], EI*momentCurvature[1:, 1], rtol=1e-9)
+	np.testing.assert_allclose(stressStrain[:, -6:, 1].mean(axis=1), -500/(Es*np.sum(bar[:, 2])), rtol=1e-9)
+
+
+def test_matchesOpenSees(squareSection):
+	pytest.importorskip('openseespy.opensees')
+	results = {}
+	for backend in ('opensees', 'numpy'):
+		mc = MC('Square', 'X', sectPath=squareSection)
+		mc.MCAnalysis(1000, 0, recordMode='memory', backend=backend)
+		mc.MCCurve(plot=False)
+		results[backend] = mc
+	openseesRun, numpyRun = results['opensees'], results['numpy']
+	dK = openseesRun.momentCurvature[1, 1]
+	for name in ('barYield', 'barRupture', 'coreCrush'):
+		if openseesRun.limitStateIndex[name] is None:
+			assert numpyRun.limitStateIndex[name] is None
+		else:
+			assert abs(numpyRun.limitStateIndex[name]-openseesRun.limitStateIndex[name]) <= 1
+	for name in ('yieldMoment', 'effectiveMoment', 'ultimateMoment'):
+		np.testing.assert_allclose(numpyRun.curveResult[name], openseesRun.curveResult[name], rtol=0.03)
+	for name in ('yieldCurvature', 'ultimateCurvature'):
+		assert abs(numpyRun.curveResult[name]-openseesRun.curveResult[name]) <= dK*(1+1e-9)
+
+
+def test_regressionSnapshot(squareFibers):
+	momentCurvature, stressStrain = squareSection(squareFibers).MCAnalysis(1000, 0, 'X', 2e-4, 100)
+	assert momentCurvature.shape == (101, 2)
+	assert stressStrain.shape == (101, 44+100+6, 2)
+	steps = [1, 5, 10, 20, 40, 70, 100]
+	# moment (kN.m) and curvature (1/m) of the numpy engine when it was added, this only detects changes of its
+	# results, the accuracy is checked by test_elasticBranch and test_matchesOpenSees
+	reference = [[70.390058885, 2e-4], [200.14993867, 1e-3], [250.85047238, 2e-3], [322.72883399, 4e-3],
+				 [395.46090350, 8e-3], [428.71351244, 1.4e-2], [432.92624658, 2e-2]]
+	np.testing.assert_allclose(momentCurvature[steps], reference, rtol=1e-6)
+
+
+def test_axialEquilibrium(squareFibers):
+	section = squareSection(squareFibers)
+	section.setDirection('Y')
+	for kappa in (0.0, 1e-3, 1e-2):
+		assert section.solveStep(kappa, 2000, 0.0)
+		section.commit()
+		assert abs(np.sum(section.stress*section.area)+2000) < 1e-6*2000
+
+
+def test_bisectionRequiresOrthogonalEquilibrium(squareFibers):
+	section = squareSection(squareFibers)
+	section.setDirection('X')
+	assert section.solveStep(1e-3, 1000, 0.0)
+	state = section.e0, section.moment
+	# the axial strain alone balances the axial force but not an orthogonal moment
+	assert not section._bisectAxialStrain(2e-3, 1000, 100.0, 1e-6, 1e-6)
+	assert (section.e0, section.moment) == state
+	assert section._bisectAxialStrain(2e-3, 1000, 0.0, 1e-3, 1e-3)
+	assert abs(np.sum(section.stress*section.area)+1000) < 1e-3
@@ -0,0 +1,56 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_fiberTracking.py
+# @Software : PyCharm
+
+import numpy as np
+
+import MCAnalysis
+from MCAnalysis import MC
+
+# additional limit states checked in both fiber groups
+limitStates = {'coverSpalling': ('core', -0.005), 'barBuckling': ('bar', -0.02)}
+
+
+def limitStateRun(sectPath, direction, axialLoad, moment=0, **kwargs):
+	mc = MC('Square', direction, sectPath=sectPath)
+	mc.MCAnalysis(axialLoad, moment, recordMode='memory', backend='numpy', **kwargs)
+	mc.MCCurve(limitStates, plot=False)
+	return mc
+
+
+def test_extremeMatchesAll(squareSection):
+	for direction in ('X', 'Y'):
+		for axialLoad in (0, 4000):
+			full = limitStateRun(squareSection, direction, axialLoad)
+			extreme = limitStateRun(squareSection, direction, axialLoad, trackFibers='extreme')
+			assert extreme.trackFibers == 'extreme'
+			assert extreme.coreResponse.shape[1] < full.coreResponse.shape[1]
+			assert extreme.limitStateIndex == full.limitStateIndex
+			assert extreme.curveResult == full.curveResult
+			verify = limitStateRun(squareSection, direction, axialLoad, trackFibers='verify')
+			assert all(fullIndex == trackedIndex for fullIndex, trackedIndex in verify.trackingCheck.values())
+
+
+def test_verifyFlagsMismatch(squareSection, monkeypatch, capsys):
+	# fibers nearest to the centroid instead of the extreme ones
+	def innerFibers(fibers, axis):
+		distance = np.abs(fibers[:, axis]-np.mean(fibers[:, axis]))
+		return np.flatnonzero(distance == distance.min())
+	monkeypatch.setattr(MCAnalysis, 'extremeFibers', innerFibers)
+	mc = limitStateRun(squareSection, 'X', 4000, trackFibers='verify')
+	mismatch = [name for name, (full, tracked) in mc.trackingCheck.items() if full != tracked]
+	assert 'barYield' in mismatch and 'coreCrush' in mismatch
+	assert 'Warning: the extreme fibers miss the limit states' in capsys.readouterr().out
+
+
+def test_extremeFallsBackUnderBiaxialBending(squareSection, capsys):
+	for direction, moment in (('X', 100.0), (30, 0)):
+		full = limitStateRun(squareSection, direction, 2000, moment)
+		extreme = limitStateRun(squareSection, direction, 2000, moment, trackFibers='extreme')
+		assert "Warning: trackFibers='extreme' needs uniaxial bending" in capsys.readouterr().out
+		assert extreme.trackFibers == 'all'
+		assert extreme.coreResponse.shape == full.coreResponse.shape
+		assert extreme.limitStateIndex == full.limitStateIndex
@@ -0,0 +1,84 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_figureRender.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+import pytest
+
+import figureRender
+from figureRender import setRenderMode, submitFigure, waitFigures, drawMomentCurvature
+from MCAnalysis import MC
+
+pngSignature = b'\x89PNG\r\n\x1a\n'
+
+
+@pytest.fixture
+def renderState(monkeypatch):
+	"""
+	Restore the render settings of figureRender after the test, the queued figures are awaited
+	"""
+	for name in ('renderMode', 'figureFormats', 'figureDpi', 'nWorkers'):
+		monkeypatch.setattr(figureRender, name, getattr(figureRender, name))
+	yield
+	waitFigures()
+
+
+def curveArgs(title):
+	x = np.linspace(0.0, 0.1, 20)
+	return x, 100*np.tanh(50*x), [0.0, 0.02, 0.1], [0.0, 95.0, 99.0], 0.02, 95.0, 0.1, 99.0, title
+
+
+def isPng(fileName):
+	with open(fileName, 'rb') as file:
+		return file.read(8) == pngSignature
+
+
+def test_headlessInProcess(renderState, tmp_path):
+	setRenderMode('headless', workers=0)
+	fileNames = submitFigure(drawMomentCurvature, curveArgs('inProcess'), str(tmp_path/'MCFig'/'inProcess'), (3, 2))
+	assert fileNames == [str(tmp_path/'MCFig'/'inProcess.png')]
+	assert isPng(fileNames[0])
+
+
+def test_headlessFormatsAndDpi(renderState, tmp_path):
+	setRenderMode('headless', formats=('png', 'pdf'), dpi=50, workers=0)
+	fileNames = submitFigure(drawMomentCurvature, curveArgs('formats'), str(tmp_path/'formats'), (3, 2), ('eps',), 600)
+	assert fileNames == [str(tmp_path/'formats.png'), str(tmp_path/'formats.pdf')]
+	assert all(os.path.getsize(each) > 0 for each in fileNames)
+	import matplotlib.image
+	assert matplotlib.image.imread(fileNames[0]).shape[:2] == (100, 150)
+
+
+def test_waitFigures(renderState, tmp_path):
+	setRenderMode('headless', workers=2)
+	futures = [submitFigure(drawMomentCurvature, curveArgs(str(i)), str(tmp_path/str(i)), (3, 2)) for i in range(4)]
+	assert len(figureRender._pending) == 4
+	fileNames = waitFigures()
+	# every queued figure is rendered, in the order of submission, and the rendering processes are stopped
+	assert fileNames == [str(tmp_path/(str(i)+'.png')) for i in range(4)]
+	assert all(future.done() for future in futures)
+	assert all(isPng(each) for each in fileNames)
+	assert figureRender._pending == [] and figureRender._pool is None
+	assert waitFigures() == []
+
+
+def test_off(renderState, tmp_path):
+	setRenderMode('off')
+	assert submitFigure(drawMomentCurvature, curveArgs('off'), str(tmp_path/'MCFig'/'off'), (3, 2)) is None
+	assert not os.path.exists(tmp_path/'MCFig')
+	with pytest.raises(ValueError):
+		setRenderMode('window')
+
+
+def test_MCCurveFigure(renderState, squareSection):
+	setRenderMode('headless', workers=1)
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0, recordMode='memory', backend='numpy')
+	mc.MCCurve()
+	fileNames = waitFigures()
+	assert len(fileNames) == 1 and os.path.dirname(fileNames[0]) == os.path.abspath('MCFig')
+	assert isPng(fileNames[0])
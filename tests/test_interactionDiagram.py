@@ -0,0 +1,28 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_interactionDiagram.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+
+from MCAnalysis import MC
+from interactionDiagram import interactionDiagram, PMColumns
+
+
+def test_workersAndOrder(squareSection):
+	axialLoads = [3000.0, 0.0, 1500.0, 500.0]
+	serial = interactionDiagram('Square', axialLoads, numIncr=50, backend='numpy', nWorkers=1, save=False)
+	parallel = interactionDiagram('Square', axialLoads, numIncr=50, backend='numpy', nWorkers=2)
+	assert serial.shape == (len(axialLoads), len(PMColumns))
+	np.testing.assert_array_equal(serial, parallel)
+	np.testing.assert_array_equal(parallel[:, 0], axialLoads)
+	assert not np.isnan(parallel).any()
+	# every row is the analysis of its own axial load
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1500.0, 0, numIncr=50, recordMode='memory', backend='numpy')
+	mc.MCCurve(plot=False)
+	assert list(parallel[2, 1:]) == [mc.curveResult[name] for name in PMColumns[1:]]
+	np.testing.assert_array_equal(np.loadtxt(os.path.join(squareSection, 'PMInteraction-X.txt')), parallel)
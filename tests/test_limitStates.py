@@ -0,0 +1,52 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_limitStates.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+import pytest
+
+from MCAnalysis import MC, firstExceedance
+
+
+def test_firstExceedance():
+	steps = np.arange(20.0)
+	# fiber 0 is stretched by 1e-3 per step, fiber 1 compressed by 2e-3 per step, fiber 2 only from step 10
+	strain = np.column_stack((1e-3*steps, -2e-3*steps, np.where(steps >= 10, 5e-3*(steps-9), 0.0)))
+	limits = [2e-3, 0.012, 0.03, -0.005, -0.0201, -0.05, 1.0]
+	# 0.012 is reached at step 12 by fibers 0 and 2, 0.03 only by fiber 2 at step 15
+	np.testing.assert_array_equal(firstExceedance(strain, limits), [2, 12, 15, 3, 11, -1, -1])
+	# a limit equal to the strain counts as reached
+	assert firstExceedance(strain, 5e-3)[0] == 5
+	assert firstExceedance(strain, -0.038)[0] == 19
+
+
+def test_missingResults(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	mc = MC('Square', 'X', sectPath=str(tmp_path))
+	with pytest.raises(FileNotFoundError, match='run MCAnalysis first'):
+		mc._strainHistory()
+	os.makedirs('barRecorder')
+	os.makedirs('coreRecorder')
+	np.savetxt('MomentCurvature.txt', np.zeros((3, 2)))
+	with pytest.raises(ValueError, match='are empty'):
+		mc._strainHistory()
+
+
+def test_MCCurveLimitStates(squareSection):
+	# synthetic history: bar yield strain 2e-3, bar rupture 0.1, core crushing -0.015 of the squareSection bundle
+	steps = np.arange(41.0)
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.momentCurvature = np.column_stack((100*np.minimum(steps, 10), 1e-3*steps))
+	barStrain = np.column_stack((6e-4*steps, -3e-4*steps, 2.6e-3*steps))
+	coreStrain = np.column_stack((-4e-4*steps, 1e-4*steps))
+	mc.barResponse = np.stack((np.zeros_like(barStrain), barStrain), axis=2)
+	mc.coreResponse = np.stack((np.zeros_like(coreStrain), coreStrain), axis=2)
+	mc.MCCurve({'coverSpalling': ('core', -0.005), 'barBuckling': ('bar', -0.02)}, plot=False)
+	assert mc.limitStateIndex == {'barYield': 1, 'barRupture': 39, 'coreCrush': 38, 'coverSpalling': 13,
+								  'barBuckling': None}
+	assert mc.curveResult['ultimateCurvature'] == 1e-3*38
+	assert mc.curveResult['yieldMoment'] == 100
@@ -0,0 +1,140 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/30 18:04
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_mander.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+import pytest
+
+import Mander
+
+
+@pytest.fixture
+def tableFile(tmp_path, monkeypatch):
+	"""
+	Interpolation table in a scratch folder with an empty cache
+	"""
+	fileName = str(tmp_path/'confinedStrengthRatioTable.npz')
+	monkeypatch.setattr(Mander, 'tableFile', fileName)
+	monkeypatch.setattr(Mander, '_tableCache', {})
+	return fileName
+
+
+def test_confinedStrengthRatioMatchesBrentq():
+	optimize = pytest.importorskip('scipy.optimize')
+	mander = Mander.Mander()
+	for ratio1, ratio2 in [(0.0, 0.0), (0.05, 0.05), (0.02, 0.1), (0.15, 0.03), (0.3, 0.3), (0.0, 0.25)]:
+		sigma1, sigma2 = -min(ratio1, ratio2), -max(ratio1, ratio2)
+		root = optimize.brentq(lambda sigma3: mander.william_warnke(sigma1, sigma2, sigma3), -4.0, -1.0, xtol=1e-14)
+		assert abs(mander.confinedStrengthRatio(ratio1, ratio2, 1e-12)+root) < 1e-10
+
+
+def test_tableMatchesSolver(tableFile):
+	mander = Mander.Mander()
+	rng = np.random.default_rng(0)
+	for ratio1, ratio2 in rng.uniform(0.0, 0.3, (50, 2)):
+		exact = mander.confinedStrengthRatio(ratio1, ratio2, 1e-10)
+		assert abs(mander.lookupConfinedStrengthRatio(ratio1, ratio2)-exact) < 1e-4*exact
+	with np.load(tableFile) as data:
+		np.testing.assert_array_equal(data['table'], Mander._tableCache[(mander.tableStep, mander.tableMax)][1])
+
+
+def test_corruptTableIsRebuilt(tableFile):
+	with open(tableFile, 'wb') as f:
+		f.write(b'PK\x03\x04 truncated')
+	mander = Mander.Mander()
+	grid, table = mander.confinedStrengthRatioTable()
+	assert table.shape == (len(grid), len(grid))
+	with np.load(tableFile) as data:
+		np.testing.assert_array_equal(data['grid'], grid)
+	assert os.listdir(os.path.dirname(tableFile)) == [os.path.basename(tableFile)]
+
+
+def test_tableOfOtherGridIsRebuilt(tableFile):
+	np.savez(tableFile, grid=np.arange(0.0, 0.31, 0.01), table=np.zeros((31, 31)))
+	mander = Mander.Mander()
+	grid, table = mander.confinedStrengthRatioTable()
+	assert len(grid) == 121 and np.all(table >= 1.0)
+
+
+def test_tableInUserCache(tmp_path, monkeypatch):
+	monkeypatch.setattr(Mander, 'tableFile', None)
+	monkeypatch.setattr(Mander, '_tableCache', {})
+	monkeypatch.setattr(Mander.meshCache, 'cacheDir', str(tmp_path/'cache'))
+	Mander.Mander().confinedStrengthRatioTable()
+	assert os.listdir(str(tmp_path/'cache')) == ['confinedStrengthRatioTable.npz']
+
+
+def test_unwritableTableFolder(tmp_path, monkeypatch):
+	# the parent of the table folder is a file, so the folder cannot be created
+	(tmp_path/'file').write_text('')
+	monkeypatch.setattr(Mander, 'tableFile', str(tmp_path/'file'/'confinedStrengthRatioTable.npz'))
+	monkeypatch.setattr(Mander, '_tableCache', {})
+	mander = Mander.Mander()
+	grid, table = mander.confinedStrengthRatioTable()
+	assert mander.confinedStrengthRatioTable()[1] is table
+	assert abs(mander.lookupConfinedStrengthRatio(0.1, 0.2)-mander.confinedStrengthRatio(0.1, 0.2, 1e-10)) < 1e-4
+
+
+def test_toleranceOutsideTable(tableFile, monkeypatch):
+	mander = Mander.Mander()
+	tolerances = []
+	solver = Mander.Mander.confinedStrengthRatio
+
+	def confinedStrengthRatio(self, ratio1, ratio2, tol=1e-6):
+		tolerances.append(tol)
+		return solver(self, ratio1, ratio2, tol)
+	monkeypatch.setattr(Mander.Mander, 'confinedStrengthRatio', confinedStrengthRatio)
+	fco = 30.0
+	# confining stress ratios of about 0.77 and 0.58, beyond the table
+	mander.rectangular(1.6, 3.2, 0.06, 0.02, 0.1, 0.028, 0.06, 0.045, 0.1, 0.012, 400, fco)
+	assert tolerances == [mander.stressTol/fco]
+
+
+
+def decimalWilliamWarnke(sigma1, sigma2, sigma3):
+	"""
+	Former 30-digit Decimal evaluation of the William-Warnke surface
+	"""
+	from decimal import Decimal, localcontext
+	with localcontext() as context:
+		context.prec = 30
+		sigma1, sigma2, sigma3 = Decimal(sigma1), Decimal(sigma2), Decimal(sigma3)
+		sigmaa = (sigma1+sigma2+sigma3)/Decimal(3)
+		squares = (sigma1-sigma2)**2+(sigma2-sigma3)**2+(sigma3-sigma1)**2
+		taoa = squares.sqrt()/Decimal(15).sqrt()
+		r1 = Decimal(0.053627)-Decimal(0.512079)*sigmaa-Decimal(0.038226)*sigmaa**2
+		r2 = Decimal(0.095248)-Decimal(0.891175)*sigmaa-Decimal(0.244420)*sigmaa**2
+		r21 = r2**2-r1**2
+		cosxita = (2*sigma1-sigma2-sigma3)/(Decimal(2).sqrt()*squares.sqrt())
+		rxita = (2*r2*r21*cosxita+r2*(2*r1-r2)*(4*r21*cosxita**2+5*r1**2-4*r1*r2).sqrt()) / \
+				(4*r21*cosxita**2+(r2-2*r1)**2)
+		return float(taoa/rxita-1)
+
+
+def test_williamWarnkeMatchesDecimal():
+	mander = Mander.Mander()
+	rng = np.random.default_rng(2)
+	sigma = -np.sort(rng.uniform(0.0, 0.3, (40, 2)), axis=1)
+	sigma3 = rng.uniform(-4.0, -1.0, 40)
+	surface = mander.william_warnke(sigma[:, 0], sigma[:, 1], sigma3)
+	for i in range(40):
+		expected = decimalWilliamWarnke(sigma[i, 0], sigma[i, 1], sigma3[i])
+		assert abs(surface[i]-expected) < 1e-12
+		assert mander.william_warnke(sigma[i, 0], sigma[i, 1], sigma3[i]) == surface[i]
+
+
+def test_brent():
+	optimize = pytest.importorskip('scipy.optimize')
+	for fun, a, b in [(lambda x: x**3-2*x-5, 2.0, 3.0), (np.cos, 0.0, 3.0), (lambda x: np.exp(x)-10, -5.0, 5.0),
+					  (lambda x: np.sign(x-0.3)*abs(x-0.3)**0.2, 0.0, 1.0)]:
+		assert abs(Mander.brent(fun, a, b, xtol=1e-13)-optimize.brentq(fun, a, b, xtol=1e-13)) < 1e-11
+	with pytest.raises(ValueError):
+		Mander.brent(np.cos, 0.0, 1.0)
+	# a fixed number of iterations bounds the number of evaluations
+	calls = []
+	Mander.brent(lambda x: calls.append(x) or np.sign(x-0.3)*abs(x-0.3)**0.2, 0.0, 1.0, xtol=0.0, maxIter=5)
+	assert len(calls) == 2+5
@@ -0,0 +1,60 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_meshCache.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+import pytest
+
+import meshCache
+
+
+@pytest.fixture
+def cacheDir(tmp_path, monkeypatch):
+	folder = str(tmp_path/'mesh')
+	monkeypatch.setattr(meshCache, 'cacheDir', folder)
+	return folder
+
+
+def counter(builds):
+	def build():
+		builds.append(1)
+		return np.arange(3.0)*len(builds)
+	return build
+
+
+def test_meshIsReused(cacheDir):
+	builds = []
+	inputs = {'outD': 2.0, 'coverThick': 0.06, 'nodes': [[0, 0], [1, 0]]}
+	first = meshCache.cachedMesh('core', inputs, counter(builds))
+	# the key does not depend on the order of the dict entries
+	second = meshCache.cachedMesh('core', dict(reversed(list(inputs.items()))), counter(builds))
+	assert len(builds) == 1 and np.array_equal(first, second)
+	meshCache.cachedMesh('cover', inputs, counter(builds))
+	meshCache.cachedMesh('core', dict(inputs, outD=2.5), counter(builds))
+	meshCache.cachedMesh('core', inputs, counter(builds), cache=False)
+	assert len(builds) == 4
+
+
+def test_versionBumpRebuilds(cacheDir, monkeypatch):
+	builds = []
+	key = meshCache.meshKey('core', {'outD': 2.0})
+	meshCache.cachedMesh('core', {'outD': 2.0}, counter(builds))
+	monkeypatch.setattr(meshCache, 'cacheVersion', meshCache.cacheVersion+1)
+	assert meshCache.meshKey('core', {'outD': 2.0}) != key
+	meshCache.cachedMesh('core', {'outD': 2.0}, counter(builds))
+	assert len(builds) == 2
+
+
+def test_corruptEntryAndEviction(cacheDir):
+	builds = []
+	meshCache.cachedMesh('core', {'outD': 2.0}, counter(builds))
+	fileName = os.path.join(cacheDir, 'core-'+meshCache.meshKey('core', {'outD': 2.0})+'.pkl')
+	with open(fileName, 'wb') as f:
+		f.write(b'\x80\x05 truncated')
+	assert np.array_equal(meshCache.cachedMesh('core', {'outD': 2.0}, counter(builds)), np.arange(3.0)*2)
+	meshCache.clearMeshCache()
+	assert os.listdir(cacheDir) == []
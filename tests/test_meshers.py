@@ -0,0 +1,72 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_meshers.py
+# @Software : PyCharm
+
+import math
+import numpy as np
+import pytest
+
+from fiberGenerate import CircleSection, PolygonSection
+
+octagon = {1: (3.5, 3), 2: (1.5, 5), 3: (-1.5, 5), 4: (-3.5, 3), 5: (-3.5, -3), 6: (-1.5, -5), 7: (1.5, -5),
+		   8: (3.5, -3)}
+octagonEle = {1: (1, 2), 2: (2, 3), 3: (3, 4), 4: (4, 5), 5: (5, 6), 6: (6, 7), 7: (7, 8), 8: (8, 1)}
+octagonHole = {1: (1.9, 2.4), 2: (1.1, 3.2), 3: (-1.1, 3.2), 4: (-1.9, 2.4), 5: (-1.9, -2.4), 6: (-1.1, -3.2),
+			   7: (1.1, -3.2), 8: (1.9, -2.4)}
+
+
+def shoelace(vertices):
+	"""
+	Area and centroid of a polygon (either orientation)
+	"""
+	x, y = np.asarray(vertices, dtype=np.float64)[:, 0], np.asarray(vertices, dtype=np.float64)[:, 1]
+	cross = x*np.roll(y, -1)-np.roll(x, -1)*y
+	area = 0.5*np.sum(cross)
+	return abs(area), np.sum((x+np.roll(x, -1))*cross)/(6*area), np.sum((y+np.roll(y, -1))*cross)/(6*area)
+
+
+@pytest.mark.parametrize('outD, inD, coverThick, size', [(2.0, None, 0.06, 0.1), (2.0, None, 0.06, 0.37),
+														  (3.0, 1.0, 0.1, 0.15), (1.2, 0.8, 0.05, 0.3)])
+def test_polarMeshArea(outD, inD, coverThick, size):
+	fibers = CircleSection(coverThick, outD, inD).coreMesh(size, mesher='polar')[0]
+	outRadius = outD/2-coverThick
+	inRadius = 0.0 if inD is None else inD/2+coverThick
+	assert abs(np.sum(fibers[:, 2])-math.pi*(outRadius**2-inRadius**2)) < 1e-12*outRadius**2
+	assert abs(np.sum(fibers[:, 2]*fibers[:, 0])) < 1e-12 and abs(np.sum(fibers[:, 2]*fibers[:, 1])) < 1e-12
+	# the second moment converges with the fiber size
+	inertia = math.pi/4*(outRadius**4-inRadius**4)
+	assert abs(np.sum(fibers[:, 2]*fibers[:, 0]**2)-inertia) < 0.05*inertia
+	radius = np.hypot(fibers[:, 0], fibers[:, 1])
+	assert np.all((radius > inRadius) & (radius < outRadius))
+
+
+def test_gridMeshOfPolygonWithHole():
+	section = PolygonSection(octagon, octagonEle, [octagonHole], [octagonEle])
+	outLine = section.coverLinePlot(0.06)[0]
+	inLines = section.innerLinePlot(0.06)[0]
+	fibers = section.coreMesh(0.2, outLine, inLines, mesher='grid')[0]
+	outArea, outX, outY = shoelace(outLine)
+	holeArea, holeX, holeY = shoelace(inLines[0])
+	area = outArea-holeArea
+	assert abs(np.sum(fibers[:, 2])-area) < 1e-9*area
+	assert abs(np.sum(fibers[:, 2]*fibers[:, 0])-(outArea*outX-holeArea*holeX)) < 1e-9*area
+	assert abs(np.sum(fibers[:, 2]*fibers[:, 1])-(outArea*outY-holeArea*holeY)) < 1e-9*area
+	assert np.all(fibers[:, 2] > 0) and np.all(fibers[:, 2] <= 0.2*0.2*(1+1e-9))
+
+
+@pytest.mark.parametrize('reverse', [False, True])
+def test_gridMeshOfConcavePolygon(reverse):
+	# L-shaped outline and two holes, in either orientation
+	outLine = [(0, 0), (3, 0), (3, 1), (1, 1), (1, 3), (0, 3)]
+	holes = [[(0.2, 0.2), (0.6, 0.2), (0.6, 0.6), (0.2, 0.6)], [(2.0, 0.3), (2.5, 0.3), (2.25, 0.7)]]
+	if reverse:
+		outLine, holes = outLine[::-1], [each[::-1] for each in holes]
+	fibers = PolygonSection({}, {}).coreMesh(0.23, outLine, holes, mesher='grid')[0]
+	area = shoelace(outLine)[0]-sum(shoelace(each)[0] for each in holes)
+	assert abs(np.sum(fibers[:, 2])-area) < 1e-12*area
+	for k in (0, 1):
+		firstMoment = shoelace(outLine)[0]*shoelace(outLine)[1+k]-sum(shoelace(each)[0]*shoelace(each)[1+k] for each in holes)
+		assert abs(np.sum(fibers[:, 2]*fibers[:, k])-firstMoment) < 1e-12*area
@@ -0,0 +1,71 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_pointInPolygon.py
+# @Software : PyCharm
+
+import math
+import numpy as np
+import pytest
+
+from pointInPolygon import pointsInPolygon, is_in_2d_polygon
+
+# L-shaped polygon, counter-clockwise, with the closing vertex repeated
+lShape = [[0, 0], [2, 0], [2, 1], [1, 1], [1, 2], [0, 2], [0, 0]]
+square = [[-1, -1], [1, -1], [1, 1], [-1, 1]]
+hole = [[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5]]
+
+
+def angleSum(point, vertices):
+	"""
+	Former angle-sum test of is_in_2d_polygon for points off the edges
+	"""
+	angleTotal = 0.0
+	j = len(vertices)-1
+	for i in range(len(vertices)):
+		angle = math.atan2(vertices[i][1]-point[1], vertices[i][0]-point[0]) - \
+				math.atan2(vertices[j][1]-point[1], vertices[j][0]-point[0])
+		if angle >= math.pi:
+			angle -= 2*math.pi
+		elif angle <= -math.pi:
+			angle += 2*math.pi
+		angleTotal += angle
+		j = i
+	return abs(angleTotal-2*math.pi) < 1e-11
+
+
+@pytest.mark.parametrize('vertices', [lShape, lShape[::-1], lShape[:-1], lShape[-2::-1]])
+def test_orientation(vertices):
+	points = [[0.5, 0.5], [1.5, 0.5], [0.5, 1.5], [1.5, 1.5], [3, 0.5], [-0.1, 1], [1.01, 1.01]]
+	expected = [True, True, True, False, False, False, False]
+	assert pointsInPolygon(points, vertices).tolist() == expected
+	assert [is_in_2d_polygon(point, vertices) for point in points] == expected
+
+
+def test_matchesFormerCounterClockwiseTest():
+	rng = np.random.default_rng(1)
+	points = rng.uniform(-0.5, 2.5, (500, 2))
+	expected = [angleSum(point, lShape[:-1]) for point in points]
+	assert pointsInPolygon(points, lShape).tolist() == expected
+	# the former test rejected every point of a clockwise polygon
+	assert not any(angleSum(point, lShape[-2::-1]) for point in points)
+
+
+def test_onEdge():
+	points = [[1, -1], [1, 0], [-1, 0.3], [1+1e-7, 0.5], [1+1e-5, 0.5], [0.5, 0], [0, 0.5-1e-7]]
+	assert pointsInPolygon(points, square, [hole]).tolist() == [True, True, True, True, False, True, True]
+	assert pointsInPolygon([[1+1e-5, 0.5]], square, tol=1e-4).tolist() == [True]
+
+
+def test_holes():
+	points = [[0, 0], [0.75, 0], [0.25, 0.25], [0, 0.9], [2, 0]]
+	assert pointsInPolygon(points, square, [hole]).tolist() == [False, True, False, True, False]
+	assert pointsInPolygon(points, square[::-1], [hole[::-1]]).tolist() == [False, True, False, True, False]
+	second = [[0.6, 0.6], [0.9, 0.6], [0.9, 0.9], [0.6, 0.9]]
+	assert pointsInPolygon([[0.75, 0.75], [0.75, 0]], square, [hole, second]).tolist() == [False, True]
+
+
+def test_degeneratePolygon():
+	with pytest.raises(ValueError):
+		pointsInPolygon([[0, 0]], [[0, 0], [1, 0], [0, 0]])
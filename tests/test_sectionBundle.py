@@ -0,0 +1,89 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_sectionBundle.py
+# @Software : PyCharm
+
+import os
+import time
+import multiprocessing
+import numpy as np
+
+import sectionBundle
+from sectionBundle import saveSection, loadSection, sectionMetadata, bundlePath
+from Material import Material
+
+
+def writeField(sectPath, field, count):
+	for i in range(count):
+		saveSection(sectPath, **{field: [i, i]})
+
+
+def test_concurrentWriters(tmp_path):
+	sectPath = str(tmp_path/'Pier')
+	saveSection(sectPath, coreFiber=np.ones((100000, 3)))
+	context = multiprocessing.get_context('fork')
+	writers = [context.Process(target=writeField, args=(sectPath, field, 30))
+			   for field in ('yieldCurvature', 'barParameter', 'coverParameter')]
+	for each in writers:
+		each.start()
+	for each in writers:
+		each.join()
+	assert [each.exitcode for each in writers] == [0, 0, 0]
+	section = loadSection(sectPath)
+	# no writer lost the arrays of the others
+	for field in ('yieldCurvature', 'barParameter', 'coverParameter'):
+		np.testing.assert_array_equal(section[field], [29, 29])
+	assert section['coreFiber'].shape == (100000, 3)
+	assert os.listdir(sectPath) == ['section.npz']
+
+
+def test_staleLock(tmp_path, monkeypatch):
+	sectPath = str(tmp_path/'Pier')
+	os.makedirs(sectPath)
+	lockName = bundlePath(sectPath)+'.lock'
+	open(lockName, 'w').close()
+	old = time.time()-2*sectionBundle.staleLockAge
+	os.utime(lockName, (old, old))
+	saveSection(sectPath, yieldCurvature=[1.0, 2.0])
+	assert not os.path.exists(lockName)
+	# a lock held by a live writer makes the others wait
+	open(lockName, 'w').close()
+	monkeypatch.setattr(sectionBundle, 'lockTimeout', 0.1)
+	try:
+		saveSection(sectPath, yieldCurvature=[3.0, 4.0])
+		raise AssertionError('the lock was ignored')
+	except TimeoutError:
+		pass
+	np.testing.assert_array_equal(loadSection(sectPath)['yieldCurvature'], [1.0, 2.0])
+
+
+def test_metadata(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	material = Material('Pier')
+	material.barParameter('HRB400')
+	material.coverParameter('C40')
+	metadata = sectionMetadata('Pier')
+	assert metadata['name'] == 'Pier' and metadata['units']['stress'] == 'kPa'
+	assert sorted(metadata['inputs']) == ['barParameter', 'coverParameter']
+	# the same source inputs give the same hashes, other inputs another one
+	Material('Pier').barParameter('HRB400')
+	assert sectionMetadata('Pier') == metadata
+	Material('Pier').coverParameter('C50')
+	changed = sectionMetadata('Pier')
+	assert changed['inputs']['barParameter'] == metadata['inputs']['barParameter']
+	assert changed['inputs']['coverParameter'] != metadata['inputs']['coverParameter']
+	assert changed['inputsHash'] != metadata['inputsHash']
+	assert set(loadSection('Pier')) == {'barParameter', 'coverParameter'}
+
+
+def test_bundleWithoutMetadata(tmp_path):
+	sectPath = str(tmp_path/'Pier')
+	os.makedirs(sectPath)
+	np.savez(bundlePath(sectPath), version=1, yieldCurvature=np.array([1.0, 2.0]))
+	assert sectionMetadata(sectPath) is None
+	np.testing.assert_array_equal(loadSection(sectPath)['yieldCurvature'], [1.0, 2.0])
+	saveSection(sectPath, barParameter=np.arange(6.0))
+	assert sorted(loadSection(sectPath)) == ['barParameter', 'yieldCurvature']
+	assert list(sectionMetadata(sectPath)['inputs']) == ['barParameter']
@@ -0,0 +1,47 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_stageProfiler.py
+# @Software : PyCharm
+
+import json
+import tracemalloc
+import numpy as np
+import pytest
+
+from stageProfiler import StageProfiler
+
+
+def runStages(profiler):
+	profiler.begin('run', sectName='Square')
+	profiler.lap('large')
+	data = np.ones(2**20)
+	profiler.lap('small')
+	small = np.ones(2**10)
+	return profiler.finish(), data, small
+
+
+@pytest.mark.parametrize('resetPeak', [True, False])
+def test_stagePeaks(monkeypatch, tmp_path, resetPeak):
+	if not resetPeak:
+		# Python 3.8
+		monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+	logFile = str(tmp_path/'profile.jsonl')
+	report = runStages(StageProfiler(logFile))[0]
+	assert not tracemalloc.is_tracing()
+	assert [each['stage'] for each in report['stages']] == ['large', 'small']
+	large, small = [each['peakMemory'] for each in report['stages']]
+	assert large >= 8*2**20 and report['peakMemory'] == max(large, small)
+	if resetPeak:
+		# the array of the first stage is still held
+		assert 8*2**20 <= small < 8*2**20+2**16
+	else:
+		assert small < 2**16
+	with open(logFile) as f:
+		assert json.loads(f.readline())['sectName'] == 'Square'
+
+
+def test_withoutMemory():
+	report = runStages(StageProfiler(memory=False))[0]
+	assert 'peakMemory' not in report and all('peakMemory' not in each for each in report['stages'])
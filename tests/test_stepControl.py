@@ -0,0 +1,40 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_stepControl.py
+# @Software : PyCharm
+
+from MCAnalysis import MC
+
+
+def runCurve(sectPath, **kwargs):
+	"""
+	Moment curvature analysis of the square section about Y with the numpy backend
+	:return: number of steps and MCCurve results
+	"""
+	mc = MC('Square', 'Y', sectPath=sectPath)
+	mc.MCAnalysis(1000, 0, recordMode='memory', backend='numpy', **kwargs)
+	mc.MCCurve(plot=False)
+	return len(mc.momentCurvature)-1, mc.curveResult
+
+
+def test_adaptiveAgainstFineReference(squareSection):
+	reference = runCurve(squareSection, numIncr=3000, recovery=False)[1]
+	fixedSteps, fixed = runCurve(squareSection, recovery=False)
+	# the adaptive steps need the recovery of two increments near the peak moment
+	adaptiveSteps, adaptive = runCurve(squareSection, stepControl='adaptive', recovery=True)
+
+	def error(result, key):
+		return abs(result[key]/reference[key]-1)
+
+	# the post-yield plateau is run with longer steps than the fixed increment
+	assert fixedSteps == 100
+	assert adaptiveSteps < fixedSteps
+	# first yield falls on an adaptive step, the fixed steps overshoot it by up to one increment
+	for key in ('yieldCurvature', 'yieldMoment'):
+		assert error(adaptive, key) < 0.01
+		assert error(adaptive, key) < error(fixed, key)
+	for key in ('effectiveMoment', 'effectiveCurvature'):
+		assert error(adaptive, key) < 0.02
+		assert error(adaptive, key) <= error(fixed, key)
@@ -0,0 +1,229 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_stepRecovery.py
+# @Software : PyCharm
+
+import os
+import numpy as np
+import pytest
+
+import MCAnalysis
+from FiberSection import FiberSection
+from MCAnalysis import MC
+
+# yield curvature of the squareSection bundle and nominal increment of maxMu=30, numIncr=100
+yieldCurvature = 2*400e3/2e8/0.6
+dK = 0.3*yieldCurvature
+
+
+def failFirstIncrement(solveStep, ductility, failures, count=1):
+	"""
+	Make FiberSection.solveStep fail count times, for the first full increment beyond ductility times the yield
+	curvature of each analysis
+	"""
+	def failing(self, kappa, *args, **kwargs):
+		if len(failures) < count and kappa > ductility*yieldCurvature and kappa-self.kappa > 0.9*dK and \
+				(not failures or np.isclose(kappa, failures[-1])):
+			failures.append(kappa)
+			return False
+		return solveStep(self, kappa, *args, **kwargs)
+	return failing
+
+
+def failBeyond(solveStep, ductility):
+	"""
+	Make FiberSection.solveStep fail for every curvature beyond ductility times the yield curvature
+	"""
+	def failing(self, kappa, *args, **kwargs):
+		if kappa > ductility*yieldCurvature:
+			return False
+		return solveStep(self, kappa, *args, **kwargs)
+	return failing
+
+
+def test_numpyRecoveryHalvesTheIncrement(squareSection, monkeypatch):
+	reference = MC('Square', 'X', sectPath=squareSection)
+	reference.MCAnalysis(1000, 0, recordMode='memory', backend='numpy')
+	assert reference.recoveryLog == []
+	failures = []
+	# the fixed-step analysis fails, and the same increment fails again when it is run step by step
+	monkeypatch.setattr(FiberSection, 'solveStep', failFirstIncrement(FiberSection.solveStep, 5, failures, 2))
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0, recordMode='memory', backend='numpy')
+	assert len(failures) == 2 and np.isclose(failures[0], failures[1])
+	actions = [action for curvature, action, succeeded in mc.recoveryLog]
+	assert actions[0].startswith('default settings, step ') and mc.recoveryLog[0][2]
+	assert actions[-1] == 'restore default settings'
+	# the failed increment is replaced by two half steps
+	assert len(mc.momentCurvature) == len(reference.momentCurvature)+1
+	assert np.any(np.isclose(mc.momentCurvature[:, 1], failures[0]-0.5*dK))
+	np.testing.assert_allclose(mc.momentCurvature[-1], reference.momentCurvature[-1], rtol=1e-6)
+
+
+def test_numpyRecoveryTruncatesPermanentFailure(squareSection, monkeypatch):
+	monkeypatch.setattr(FiberSection, 'solveStep', failBeyond(FiberSection.solveStep, 16.001*0.3))
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0, recordMode='memory', backend='numpy')
+	assert len(mc.momentCurvature) == 17
+	actions = [action.split(',')[0] for curvature, action, succeeded in mc.recoveryLog]
+	assert actions == ['default settings']*4+['relaxed tolerance 1e-6']*4
+	assert not any(succeeded for curvature, action, succeeded in mc.recoveryLog)
+
+
+class FakeOpenSees():
+	"""
+	Linear elastic stand-in for openseespy.opensees that records the solver commands and fails the increments
+	ending in a curvature window unless one of the given algorithms is active
+	"""
+	def __init__(self, failWindow, convergingAlgorithms, fibers):
+		self.calls = []
+		self.failWindow = failWindow
+		self.convergingAlgorithms = convergingAlgorithms
+		self.fiberY = fibers[:, 0]
+		self.fiberArea = fibers[:, 2]
+		self.disp = 0.0
+		self.increment = 0.0
+		self.algorithmName = None
+
+	def __getattr__(self, name):
+		def command(*args):
+			self.calls.append((name,)+args)
+		return command
+
+	def wipe(self):
+		self.calls.append(('wipe',))
+		self.disp = 0.0
+
+	def algorithm(self, name):
+		self.calls.append(('algorithm', name))
+		self.algorithmName = name
+
+	def test(self, *args):
+		self.calls.append(('test',)+args)
+
+	def integrator(self, name, *args):
+		self.calls.append(('integrator', name)+args)
+		self.increment = args[-1] if name == 'DisplacementControl' else 0.0
+
+	def analyze(self, numIncr):
+		target = self.disp+self.increment
+		if self.failWindow[0] < target <= self.failWindow[1] and self.algorithmName not in self.convergingAlgorithms:
+			self.calls.append(('analyze', numIncr, 'failed'))
+			return -3
+		self.calls.append(('analyze', numIncr, 'converged'))
+		self.disp = target
+		return 0
+
+	def nodeDisp(self, node, dof):
+		return self.disp
+
+	def getTime(self):
+		return 1e5*self.disp
+
+	def eleResponse(self, *args):
+		strain = -self.fiberY*self.disp
+		return np.column_stack((self.fiberY, 0*self.fiberY, self.fiberArea, 3e7*strain, strain)).ravel()
+
+
+def test_openseesRecoverySequence(squareSection, squareFibers, monkeypatch):
+	fake = FakeOpenSees((10.01*dK, 11.01*dK), ('KrylovNewton',), np.vstack(squareFibers))
+	monkeypatch.setattr(MCAnalysis, '_opensees', lambda: fake)
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0, recordMode='memory')
+	actions = [action.split(',')[0] for curvature, action, succeeded in mc.recoveryLog]
+	# halving with the default settings and ModifiedNewton reaches no converged sub-step in the window,
+	# KrylovNewton converges and the defaults are restored at the end of the increment
+	assert actions == ['default settings']*4+['algorithm ModifiedNewton']*4+['algorithm KrylovNewton']*2+[
+		'restore default settings']
+	assert [succeeded for curvature, action, succeeded in mc.recoveryLog[:8]] == [False]*8
+	# the fixed-step analysis fails at the window and the model is built again for the step-by-step analysis
+	assert ('analyze', 1, 'failed') in fake.calls[:fake.calls.index(('wipe',), 1)]
+	solver = [call for call in fake.calls if call[0] in ('algorithm', 'test')]
+	assert solver[:4] == [('test', 'NormUnbalance', 1e-9, 10), ('algorithm', 'Newton')]*2
+	assert solver[4:] == [('algorithm', 'ModifiedNewton'), ('algorithm', 'KrylovNewton'), ('algorithm', 'Newton'),
+						  ('test', 'NormUnbalance', 1e-9, 10)]
+	assert len(mc.momentCurvature) == 100+1+1
+	assert abs(mc.momentCurvature[-1, 1]-30*yieldCurvature) < 1e-12
+
+
+def test_openseesDefaultRunsInOneCall(squareSection, squareFibers, monkeypatch):
+	fake = FakeOpenSees((1.0, 1.0), (), np.vstack(squareFibers))
+	monkeypatch.setattr(MCAnalysis, '_opensees', lambda: fake)
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0)
+	# axial load step and one call for all the curvature increments, the fibers are recorded by the recorders
+	assert [call for call in fake.calls if call[0] == 'analyze'] == [('analyze', 1, 'converged'),
+																	 ('analyze', 100, 'converged')]
+	assert len([call for call in fake.calls if call[0] == 'recorder']) == 1+100+6
+	assert mc.recoveryLog == []
+
+
+def baselineRecorderRun(sectPath, axialLoad, moment, maxMu=30, numIncr=100):
+	"""
+	Opensees commands of the former MC.MCAnalysis in the 'X' direction, copied from it with the fibers of the bundle
+	"""
+	import openseespy.opensees as ops
+	from sectionBundle import loadSection
+	section = loadSection(sectPath)
+	coverParameter, coreParameter, barParameter = [section[key] for key in ('coverParameter', 'coreParameter', 'barParameter')]
+	coverfibers, corefibers, barfibers = [section[key] for key in ('coverFiber', 'coreFiber', 'barFiber')]
+	flagx, flagy = 1, 0
+	ops.wipe()
+	ops.model('basic', '-ndm', 3, '-ndf', 6)
+	ops.node(1, 0.0, 0.0, 0.0)
+	ops.node(2, 0.0, 0.0, 0.0)
+	ops.fix(1, 1, 1, 1, 1, 1, 1)
+	ops.fix(2, 0, 1, 1, 1, 0, 0)
+	ops.uniaxialMaterial('Concrete04', 1, coverParameter[0], coverParameter[1], coverParameter[2], coverParameter[3])
+	ops.uniaxialMaterial('Concrete04', 2, coreParameter[0], coreParameter[1], coreParameter[2], coreParameter[3])
+	ops.uniaxialMaterial('ReinforcingSteel', 3, barParameter[0], barParameter[1], barParameter[2], barParameter[3], barParameter[4], barParameter[5])
+	ops.section('Fiber', 1, '-GJ', 1E10)
+	for coverfiber in coverfibers:
+		ops.fiber(coverfiber[0], coverfiber[1], coverfiber[2], 1)
+	for corefiber in corefibers:
+		ops.fiber(corefiber[0], corefiber[1], corefiber[2], 2)
+	for barfiber in barfibers:
+		ops.fiber(barfiber[0], barfiber[1], barfiber[2], 3)
+	ops.element('zeroLengthSection', 1, 1, 2, 1, '-oirent', 1, 0, 0, 0, 1, 0)
+	os.makedirs('coreRecorder')
+	os.makedirs('barRecorder')
+	ops.setMaxOpenFiles(2000)
+	ops.recorder('Node','-file','MomentCurvature.txt','-time','-node',2,'-dof',6-flagy,'disp')
+	for i in range(len(corefibers)):
+		ops.recorder('Element','-file','coreRecorder/'+str(i+1)+'.txt','-time','-ele',1,'section','fiber',str(corefibers[i,0]),str(corefibers[i,1]),'stressStrain')
+	for j in range(len(barfibers)):
+		ops.recorder('Element','-file','barRecorder/'+str(j+1)+'.txt','-time','-ele',1,'section','fiber',str(barfibers[j,0]),str(barfibers[j,1]),'stressStrain')
+	ops.timeSeries('Constant', 1)
+	ops.pattern('Plain', 1, 1)
+	ops.load(2, -axialLoad, 0.0, 0.0, 0.0, moment*flagx, moment*flagy)
+	ops.integrator('LoadControl', 0.0)
+	ops.system('SparseGeneral', '-piv')
+	ops.test('NormUnbalance', 1e-9, 10)
+	ops.numberer('Plain')
+	ops.constraints('Plain')
+	ops.algorithm('Newton')
+	ops.analysis('Static')
+	ops.analyze(1)
+	ops.loadConst('-time', 0.0)
+	ops.timeSeries('Linear', 2)
+	ops.pattern('Plain', 2, 2)
+	ops.load(2, 0.0, 0.0, 0.0, 0.0, flagy, flagx)
+	dK = section['yieldCurvature'][0]*maxMu/numIncr
+	ops.integrator('DisplacementControl', 2, 6-flagy, dK)
+	ops.analyze(numIncr)
+	ops.wipe()
+
+
+def test_defaultMatchesRecorderOutput(squareSection, tmp_path):
+	pytest.importorskip('openseespy.opensees')
+	mc = MC('Square', 'X', sectPath=squareSection)
+	mc.MCAnalysis(1000, 0)
+	assert mc.recoveryLog == []
+	os.makedirs(tmp_path/'baseline')
+	os.chdir(tmp_path/'baseline')
+	baselineRecorderRun(squareSection, 1000, 0)
+	for fileName in ['MomentCurvature.txt']+['coreRecorder/'+str(i+1)+'.txt' for i in range(100)]+[
+			'barRecorder/'+str(j+1)+'.txt' for j in range(6)]:
+		np.testing.assert_array_equal(np.loadtxt(tmp_path/fileName), np.loadtxt(tmp_path/'baseline'/fileName))
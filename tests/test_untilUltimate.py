@@ -0,0 +1,60 @@
+# -*- coding:utf-8 -*-
+# @Time     : 2020/11/26 16:25
+# @Author   : Penghui Zhang
+# @Email    : penghui@tongji.edu.cn
+# @File     : test_untilUltimate.py
+# @Software : PyCharm
+
+import numpy as np
+
+from MCAnalysis import MC
+
+# yield curvature of the squareSection bundle, bar rupture and core crushing strains
+yieldCurvature = 2*400e3/2e8/0.6
+eult, ecu = 0.1, -0.015
+
+
+def runUntilUltimate(sectPath, axialLoad, **kwargs):
+	mc = MC('Square', 'X', sectPath=sectPath)
+	mc.MCAnalysis(axialLoad, 0, recordMode='memory', backend='numpy', untilUltimate=True, **kwargs)
+	return mc
+
+
+def ultimateStrains(mc):
+	"""
+	Largest bar tension and core compression of every step
+	"""
+	return np.max(mc.barResponse[:, :, 1], axis=1), np.min(mc.coreResponse[:, :, 1], axis=1)
+
+
+def test_stopsBeforeMaxMu(squareSection):
+	mc = runUntilUltimate(squareSection, 4000)
+	barStrain, coreStrain = ultimateStrains(mc)
+	assert mc.ultimateReached
+	assert mc.momentCurvature[-1, 1] < 30*yieldCurvature
+	# the last step is the first one past core crushing
+	assert coreStrain[-1] <= ecu and np.all(coreStrain[:-1] > ecu) and np.all(barStrain < eult)
+	# same steps as the full fixed-step analysis up to there
+	full = MC('Square', 'X', sectPath=squareSection)
+	full.MCAnalysis(4000, 0, recordMode='memory', backend='numpy', recovery=False)
+	steps = len(mc.momentCurvature)
+	assert len(full.momentCurvature) > steps
+	np.testing.assert_allclose(mc.momentCurvature, full.momentCurvature[:steps], rtol=1e-9, atol=1e-9)
+
+
+def test_extendsUntilUltimate(squareSection):
+	mc = runUntilUltimate(squareSection, 0)
+	barStrain, coreStrain = ultimateStrains(mc)
+	assert mc.ultimateReached
+	# bar rupture lies beyond maxMu=30 and within the first extension
+	assert 30*yieldCurvature < mc.momentCurvature[-1, 1] < 60*yieldCurvature
+	assert barStrain[-1] >= eult and np.all(barStrain[:-1] < eult)
+
+
+def test_maxExtension(squareSection):
+	mc = runUntilUltimate(squareSection, 0, maxMu=10, maxExtension=2.0)
+	barStrain, coreStrain = ultimateStrains(mc)
+	assert not mc.ultimateReached
+	assert np.all(barStrain < eult) and np.all(coreStrain > ecu)
+	np.testing.assert_allclose(mc.momentCurvature[-1, 1], 20*yieldCurvature, rtol=1e-9)
+	np.testing.assert_allclose(np.diff(mc.momentCurvature[1:, 1]), 0.1*yieldCurvature, rtol=1e-6)